@@ -10,14 +10,8 @@
 from ctypes import *
 from dwfconstants import *
 import time
-import sys
-
-if sys.platform.startswith("win"):
-    dwf = cdll.dwf
-elif sys.platform.startswith("darwin"):
-    dwf = cdll.LoadLibrary("/Library/Frameworks/dwf.framework/dwf")
-else:
-    dwf = cdll.LoadLibrary("libdwf.so")
+
+from dwfbind import dwf
 
 hdwf = c_int()
 sts = c_byte()
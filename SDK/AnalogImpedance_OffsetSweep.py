@@ -11,16 +11,11 @@ from ctypes import *
 from dwfconstants import *
 import math
 import time
-import sys
 import numpy
 import matplotlib.pyplot as plt
 
-if sys.platform.startswith("win"):
-    dwf = cdll.LoadLibrary("dwf.dll")
-elif sys.platform.startswith("darwin"):
-    dwf = cdll.LoadLibrary("/Library/Frameworks/dwf.framework/dwf")
-else:
-    dwf = cdll.LoadLibrary("libdwf.so")
+from dwfbind import dwf
+from dwfconfig import device_config
 
 version = create_string_buffer(16)
 dwf.FDwfGetVersion(version)
@@ -58,12 +53,15 @@ dwf.FDwfAnalogImpedanceAmplitudeSet(hdwf, c_double(0.5)) # 0.5V amplitude = 1V p
 dwf.FDwfAnalogImpedanceOffsetSet(hdwf, c_double(start)) # sets analog out and in channels to this offset
 dwf.FDwfAnalogImpedanceConfigure(hdwf, c_int(0)) # configure 
 
+# the impedance setup wrote the input offsets, the cache reads them back from here on
+cfg = device_config(dwf, hdwf)
+
 if fOverride:
-    dwf.FDwfAnalogInChannelOffsetSet(hdwf, c_int(0), c_double(start)) # set C1 offset to start
-    dwf.FDwfAnalogInChannelOffsetSet(hdwf, c_int(1), c_double(0.0)) # set C2 offset
+    cfg.channel(0, offset=start) # set C1 offset to start
+    cfg.channel(1, offset=0.0) # set C2 offset
     dwf.FDwfAnalogInConfigure(hdwf, c_int(0)) # re-configure
 
-time.sleep(1) # wait for the device, specially for the offsets to stabilize
+cfg.settle(1) # wait for the device, specially for the offsets to stabilize
 
 rgOff = [0.0]*steps
 rgRs = [0.0]*steps
@@ -77,14 +75,14 @@ for i in range(steps):
     if fOverride:
         dwf.FDwfAnalogOutOffsetSet(hdwf, c_int(0), c_double(vOff)) # adjust analog out offset
         dwf.FDwfAnalogOutConfigure(hdwf, c_int(0), c_int(1)) # configure and start analog out
-        dwf.FDwfAnalogInChannelOffsetSet(hdwf, c_int(0), c_double(vOff)) # set C1 offset to start
-        dwf.FDwfAnalogInChannelOffsetSet(hdwf, c_int(1), c_double(0.0)) # set C2 offset
+        cfg.channel(0, offset=vOff) # set C1 offset to start
+        cfg.channel(1, offset=0.0) # set C2 offset, sent only when it moved
         dwf.FDwfAnalogInConfigure(hdwf, c_int(1)) # re-configure and start
+        cfg.settle(0.01) # settle time depends on the offset step and DUT
     else:
         dwf.FDwfAnalogImpedanceOffsetSet(hdwf, c_double(vOff)) # adjust offset
         dwf.FDwfAnalogImpedanceConfigure(hdwf, c_int(1))
-    
-    time.sleep(0.01) # settle time depends on the offset step and DUT
+        time.sleep(0.01) # settle time depends on the offset step and DUT
     
     dwf.FDwfAnalogImpedanceStatus(hdwf, None) # ignore last capture 
     while True:
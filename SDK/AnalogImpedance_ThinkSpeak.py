@@ -13,18 +13,12 @@ from ctypes import *
 from dwfconstants import *
 import math
 import time
-import sys
 import numpy
 import requests 
 
 url = "https://api.thingspeak.com/update?api_key=8C############BU"
 
-if sys.platform.startswith("win"):
-    dwf = cdll.LoadLibrary("dwf.dll")
-elif sys.platform.startswith("darwin"):
-    dwf = cdll.LoadLibrary("/Library/Frameworks/dwf.framework/dwf")
-else:
-    dwf = cdll.LoadLibrary("libdwf.so")
+from dwfbind import dwf
 
 version = create_string_buffer(16)
 dwf.FDwfGetVersion(version)
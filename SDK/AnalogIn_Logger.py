@@ -11,17 +11,14 @@
 """
 
 from ctypes import *
-import math
+try:
+    from SDK.dwfbind import dwf
+    from SDK.dwfstats import as_array, channel_stats
+except ImportError:
+    from dwfbind import dwf
+    from dwfstats import as_array, channel_stats
 import time
 import matplotlib.pyplot as plt
-import sys
-
-if sys.platform.startswith("win"):
-    dwf = cdll.dwf
-elif sys.platform.startswith("darwin"):
-    dwf = cdll.LoadLibrary("/Library/Frameworks/dwf.framework/dwf")
-else:
-    dwf = cdll.LoadLibrary("libdwf.so")
 
 hdwf = c_int()
 sts = c_byte()
@@ -77,20 +74,8 @@ try:
         dwf.FDwfAnalogInStatusSamplesValid(hdwf, byref(cValid))
         for iChannel in range(2):
             dwf.FDwfAnalogInStatusData(hdwf, c_int(iChannel), byref(rgdSamples), cValid) # get channel 1 data
-            dc = 0
-            for i in range(nSamples):
-                dc += rgdSamples[i]
-            dc /= nSamples
-            dcrms = 0
-            acrms = 0
-            for i in range(nSamples):
-                dcrms += rgdSamples[i] ** 2
-                acrms += (rgdSamples[i]-dc) ** 2
-            dcrms /= nSamples
-            dcrms = math.sqrt(dcrms)
-            acrms /= nSamples
-            acrms = math.sqrt(acrms)
-            print(f"CH:{iChannel+1} DC:{dc:.3f}V DCRMS:{dcrms:.3f}V ACRMS:{acrms:.3f}V")
+            stats = channel_stats(as_array(rgdSamples, cValid))
+            print(f"CH:{iChannel+1} DC:{stats.mean:.3f}V DCRMS:{stats.rms:.3f}V ACRMS:{stats.acrms:.3f}V")
 except KeyboardInterrupt:
     pass
 
@@ -12,15 +12,10 @@ from dwfconstants import *
 import math
 import time
 import matplotlib.pyplot as plt
-import sys
 import numpy
 
-if sys.platform.startswith("win"):
-    dwf = cdll.dwf
-elif sys.platform.startswith("darwin"):
-    dwf = cdll.LoadLibrary("/Library/Frameworks/dwf.framework/dwf")
-else:
-    dwf = cdll.LoadLibrary("libdwf.so")
+from dwfbind import dwf
+from dwfgaps import GapIndex, GapWriter
 
 #declare ctype variables
 hdwf = c_int()
@@ -71,6 +66,8 @@ print("Starting oscilloscope")
 dwf.FDwfAnalogInConfigure(hdwf, c_int(0), c_int(1))
 
 cSamples = 0
+# where samples were lost or corrupted, next to record.csv; lost ones keep their place in rgdSamples
+gaps = GapWriter("record.csv", True, hzAcq.value)
 
 while cSamples < nSamples:
     dwf.FDwfAnalogInStatus(hdwf, c_int(1), byref(sts))
@@ -81,6 +78,7 @@ while cSamples < nSamples:
     dwf.FDwfAnalogInStatusRecord(hdwf, byref(cAvailable), byref(cLost), byref(cCorrupted))
     
     cSamples += cLost.value
+    gaps.add(cSamples, cAvailable.value, cLost.value, cCorrupted.value)
 
     if cLost.value :
         fLost = 1
@@ -99,19 +97,24 @@ while cSamples < nSamples:
 
 dwf.FDwfAnalogOutReset(hdwf, c_int(0))
 dwf.FDwfDeviceCloseAll()
+gaps.close()
 
 print("Recording done")
 if fLost:
     print("Samples were lost! Reduce frequency")
 if fCorrupted:
     print("Samples could be corrupted! Reduce frequency")
+if gaps.cEntries:
+    print(gaps.summary())
 
 f = open("record.csv", "w")
 for v in rgdSamples:
     f.write("%s\n" % v)
 f.close()
   
-plt.plot(numpy.fromiter(rgdSamples, dtype = numpy.single))
+# lost and corrupted samples are left out of the plot as NaN
+iFirst, values = GapIndex("record.csv").timeline(numpy.ctypeslib.as_array(rgdSamples))
+plt.plot(values)
 plt.show()
 
 
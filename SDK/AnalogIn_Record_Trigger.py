@@ -12,23 +12,21 @@ from dwfconstants import *
 import math
 import time
 import matplotlib.pyplot as plt
-import sys
 import numpy
 
-if sys.platform.startswith("win"):
-    dwf = cdll.LoadLibrary("dwf.dll")
-elif sys.platform.startswith("darwin"):
-    dwf = cdll.LoadLibrary("/Library/Frameworks/dwf.framework/dwf")
-else:
-    dwf = cdll.LoadLibrary("libdwf.so")
+from dwfbind import dwf
+from dwfbuffers import RingBuffer
+from dwfrecord import ChannelFetch
 
 #declare ctype variables
 hdwf = c_int()
 sts = c_byte()
 hzAcq = c_double(100000)
 nSamples = 200000
-rgdSamples1 = (c_double*nSamples)()
-rgdSamples2 = (c_double*nSamples)()
+# circular sample buffer, channel 1 and 2 rows
+ring = RingBuffer(nSamples, numpy.float64, 2)
+# both channels of a chunk are read straight into the ring rows
+fetch = ChannelFetch(dwf, hdwf, (0, 1), nSamples, numpy.float64)
 cAvailable = c_int()
 cLost = c_int()
 cCorrupted = c_int()
@@ -83,14 +81,11 @@ time.sleep(2)
 print("Starting oscilloscope")
 dwf.FDwfAnalogInConfigure(hdwf, c_int(0), c_int(1))
 
-iSample = 0
-
 while True:
     dwf.FDwfAnalogInStatus(hdwf, c_int(1), byref(sts))
     dwf.FDwfAnalogInStatusRecord(hdwf, byref(cAvailable), byref(cLost), byref(cCorrupted))
-    #print(str(iSample),str(sts.value),str(cAvailable.value))
-    iSample += cLost.value
-    iSample %= nSamples
+    #print(str(ring.iWrite),str(sts.value),str(cAvailable.value))
+    ring.advance(cLost.value)
 
     if cLost.value :
         fLost = 1
@@ -99,16 +94,12 @@ while True:
 
     iBuffer = 0
     while cAvailable.value>0:
-        cSamples = cAvailable.value
         # we are using circular sample buffer, make sure to not overflow
-        if iSample+cAvailable.value > nSamples:
-            cSamples = nSamples-iSample
-        dwf.FDwfAnalogInStatusData2(hdwf, c_int(0), byref(rgdSamples1, sizeof(c_double)*iSample), c_int(iBuffer), c_int(cSamples)) # get channel 1 data
-        dwf.FDwfAnalogInStatusData2(hdwf, c_int(1), byref(rgdSamples2, sizeof(c_double)*iSample), c_int(iBuffer), c_int(cSamples)) # get channel 2 data
+        cSamples = min(cAvailable.value, ring.cContiguous)
+        fetch.fetch(cSamples, iBuffer, ring.array[:, ring.iWrite:]) # get channel 1 and 2 data
         iBuffer += cSamples
         cAvailable.value -= cSamples
-        iSample += cSamples
-        iSample %= nSamples
+        ring.advance(cSamples)
 
     if sts.value == 2 : # done
         break
@@ -116,9 +107,8 @@ while True:
 dwf.FDwfAnalogOutReset(hdwf, c_int(0))
 dwf.FDwfDeviceCloseAll()
 
-if iSample != 0 :
-    rgdSamples1 = rgdSamples1[iSample:]+rgdSamples1[:iSample]
-    rgdSamples2 = rgdSamples2[iSample:]+rgdSamples2[:iSample]
+# oldest sample first, rotated in place
+rgdSamples1, rgdSamples2 = ring.unwrap()
 
 print("Recording done")
 if fLost:
@@ -126,18 +116,19 @@ if fLost:
 if fCorrupted:
     print("Samples could be corrupted! Reduce frequency")
 
+# formatted in C, one value per line
 f = open("record1.csv", "w")
-for v in rgdSamples1:
-    f.write("%s\n" % v)
+rgdSamples1.tofile(f, sep="\n", format="%s")
+f.write("\n")
 f.close()
 
 f = open("record2.csv", "w")
-for v in rgdSamples2:
-    f.write("%s\n" % v)
+rgdSamples2.tofile(f, sep="\n", format="%s")
+f.write("\n")
 f.close()
 
-plt.plot(numpy.fromiter(rgdSamples1, dtype = numpy.float), color='orange')
-plt.plot(numpy.fromiter(rgdSamples2, dtype = numpy.float), color='blue')
+plt.plot(rgdSamples1, color='orange')
+plt.plot(rgdSamples2, color='blue')
 plt.show()
 
 
@@ -12,15 +12,9 @@ from dwfconstants import *
 import math
 import time
 import matplotlib.pyplot as plt
-import sys
 import numpy
 
-if sys.platform.startswith("win"):
-    dwf = cdll.dwf
-elif sys.platform.startswith("darwin"):
-    dwf = cdll.LoadLibrary("/Library/Frameworks/dwf.framework/dwf")
-else:
-    dwf = cdll.LoadLibrary("libdwf.so")
+from dwfbind import dwf
 
 #declare ctype variables
 hdwf = c_int()
@@ -8,7 +8,7 @@
    Desciption:
    - generates sine on AWG1
    - records data on Scope 1
-   - writes data to 16 bit WAV file
+   - writes data to 16 bit WAV file, RF64 past 4 GiB
 """
 
 from ctypes import *
@@ -16,19 +16,16 @@ from dwfconstants import *
 import math
 import time
 import matplotlib.pyplot as plt
-import sys
 import numpy
-import wave
 import datetime
 import os
 import array
 
-if sys.platform.startswith("win"):
-    dwf = cdll.dwf
-elif sys.platform.startswith("darwin"):
-    dwf = cdll.LoadLibrary("/Library/Frameworks/dwf.framework/dwf")
-else:
-    dwf = cdll.LoadLibrary("libdwf.so")
+from dwfbind import dwf
+from dwfbuffers import BufferPool
+from dwfwriter import ChunkWriter
+from dwfwave import WaveWriter
+from dwfgaps import GapWriter, gap_path
 
 #declare ctype variables
 hdwf = c_int()
@@ -79,11 +76,18 @@ dwf.FDwfAnalogInRecordLengthSet(hdwf, c_double(-1)) # -1 infinite record length
 #wait at least 2 seconds for the offset to stabilize
 time.sleep(2)
 
-print("Starting oscilloscope")
-dwf.FDwfAnalogInConfigure(hdwf, c_int(0), c_int(1))
-
 cSamples = 0
 
+# the poll loop only drains the device into a pool of page-aligned buffers,
+# a writer thread writes the filled ones, so a slow disk flush does not delay the next poll
+cBufferMin = c_int()
+cBufferMax = c_int()
+dwf.FDwfAnalogInBufferSizeInfo(hdwf, byref(cBufferMin), byref(cBufferMax))
+cChunkMax = max(cBufferMax.value, 1 << 14) # most samples one status can report
+pool = BufferPool(max(16*cChunkMax, 1 << 20), numpy.int16, count=8) # 8 x 2 MiB, seconds of slack at the highest record rate
+secHandOver = 0.25 # a partly filled buffer is written after this long
+secReport = 1.0
+
 print("Generating "+str(hzSignal.value)+"Hz, recording "+str(hzAcq.value)+"Hz for "+str(nSamples/hzAcq.value)+"s, press Ctrl+C to stop...");
 #get the proper file name
 
@@ -91,14 +95,47 @@ print("Generating "+str(hzSignal.value)+"Hz, recording "+str(hzAcq.value)+"Hz fo
 starttime = datetime.datetime.now();
 startfilename = "AD2_" + "{:04d}".format(starttime.year) + "{:02d}".format(starttime.month) + "{:02d}".format(starttime.day) + "_" + "{:02d}".format(starttime.hour) + "{:02d}".format(starttime.minute) + "{:02d}".format(starttime.second) + ".wav";
 print("Writing WAV file '" + startfilename + "'");
-waveWrite = wave.open(startfilename, "wb");
-waveWrite.setnchannels(1);				# 1 channels 
-waveWrite.setsampwidth(2);				# 16 bit / sample
-waveWrite.setframerate(hzAcq.value);
-waveWrite.setcomptype("NONE","No compression");
+# 1 channel, 16 bit / sample, header updated every second so a cut-off file stays readable
+# policy=RotationPolicy(secMax=3600) from dwfrotate would split the record into hourly files
+waveWrite = WaveWriter(startfilename, hzAcq.value, 1, secPatch=1.0)
+
+writer = ChunkWriter(waveWrite.writeframes, pool)
+# where samples were lost or corrupted; the WAV holds only the samples that arrived, across all segments
+gaps = GapWriter(startfilename, False, hzAcq.value)
+buffer = writer.acquire()
+
+# start once the file and buffers are ready, the device buffer holds only milliseconds at high rates
+print("Starting oscilloscope")
+dwf.FDwfAnalogInConfigure(hdwf, c_int(0), c_int(1))
+
+cFill = 0
+tStart = time.perf_counter()
+tFill = tStart
+tReport = tStart
+cSamplesReport = 0
+cLostReport = 0
+cCorruptedReport = 0
+
+def report(now):
+    # once per second: record rate, lost/corrupted samples and how far the writer is behind
+    global tReport, cSamplesReport, cLostReport, cCorruptedReport
+    stats = writer.interval_stats()
+    print("%6.1fs %6.3f MS/s  lost %d  corrupted %d  queue max %d/%d  waits %d (%.0f ms)  write max %.1f ms" % (
+        now - tStart, (cSamples - cSamplesReport) / (now - tReport) / 1e6, cLostReport, cCorruptedReport,
+        stats["maxQueued"], stats["cBuffers"], stats["cWaits"], stats["secWaited"]*1e3, stats["secWriteMax"]*1e3))
+    if stats["cWaits"]:
+        print("        writer falling behind, the poll loop waited for free buffers")
+    tReport = now
+    cSamplesReport = cSamples
+    cLostReport = 0
+    cCorruptedReport = 0
 
 try:
     while cSamples < nSamples:
+        now = time.perf_counter()
+        if now - tReport >= secReport:
+            report(now)
+
         dwf.FDwfAnalogInStatus(hdwf, c_int(1), byref(sts))
         if cSamples == 0 and (sts == DwfStateConfig or sts == DwfStatePrefill or sts == DwfStateArmed) :
             # Acquisition not yet started.
@@ -107,6 +144,9 @@ try:
         dwf.FDwfAnalogInStatusRecord(hdwf, byref(cAvailable), byref(cLost), byref(cCorrupted))
         
         cSamples += cLost.value
+        gaps.add(cSamples, cAvailable.value, cLost.value, cCorrupted.value)
+        cLostReport += cLost.value
+        cCorruptedReport += cCorrupted.value
 
         if cLost.value :
             fLost = 1
@@ -119,15 +159,32 @@ try:
         if cSamples+cAvailable.value > nSamples :
             cAvailable = c_int(nSamples-cSamples)
         
-        rgSamples = (c_int16*cAvailable.value)()
-
-        dwf.FDwfAnalogInStatusData16(hdwf, c_int(0), rgSamples, c_int(0), cAvailable) # get channel 1 data chunk
+        iChunk = 0
+        while iChunk < cAvailable.value:
+            if cFill == pool.cItems:
+                writer.put(buffer, cFill)
+                buffer = writer.acquire()
+                cFill = 0
+            cPart = min(cAvailable.value - iChunk, pool.cItems - cFill)
+            # get channel 1 data chunk, appended to the buffer
+            dwf.FDwfAnalogInStatusData16(hdwf, c_int(0), c_void_p(buffer.pointer.value + 2*cFill), c_int(iChunk), c_int(cPart))
+            cFill += cPart
+            iChunk += cPart
         cSamples += cAvailable.value
-        waveWrite.writeframes(rgSamples)
+
+        # hand the buffer over before the next chunk might not fit, or when it has waited long enough
+        if cFill and (pool.cItems - cFill < cChunkMax or now - tFill >= secHandOver):
+            writer.put(buffer, cFill)
+            buffer = writer.acquire()
+            cFill = 0
+            tFill = now
         
 except KeyboardInterrupt:
     pass	
 
+writer.put(buffer, cFill)
+writer.close()
+
 endtime = datetime.datetime.now();
 dwf.FDwfAnalogOutReset(hdwf, c_int(0))
 dwf.FDwfDeviceCloseAll()
@@ -137,12 +194,18 @@ if fLost:
     print("Samples were lost! Reduce frequency")
 if fCorrupted:
     print("Samples could be corrupted! Reduce frequency")
+gaps.close()
+if gaps.cEntries:
+    print(gaps.summary())
 
 waveWrite.close();
 
-endfilename = "AD2_" + "{:04d}".format(starttime.year) + "{:02d}".format(starttime.month) + "{:02d}".format(starttime.day) + "_" + "{:02d}".format(starttime.hour) + "{:02d}".format(starttime.minute) + "{:02d}".format(starttime.second) + "-" + "{:02d}".format(endtime.hour) + "{:02d}".format(endtime.minute) + "{:02d}".format(endtime.second) + ".wav";
-print("Renaming file from '" + startfilename + "' to '" + endfilename + "'");
-os.rename(startfilename, endfilename);
+if len(waveWrite.paths) > 1:
+    print("Recorded " + str(len(waveWrite.paths)) + " segments '" + "', '".join(waveWrite.paths) + "'")
+else:
+    endfilename = "AD2_" + "{:04d}".format(starttime.year) + "{:02d}".format(starttime.month) + "{:02d}".format(starttime.day) + "_" + "{:02d}".format(starttime.hour) + "{:02d}".format(starttime.minute) + "{:02d}".format(starttime.second) + "-" + "{:02d}".format(endtime.hour) + "{:02d}".format(endtime.minute) + "{:02d}".format(endtime.second) + ".wav";
+    print("Renaming file from '" + startfilename + "' to '" + endfilename + "'");
+    os.rename(startfilename, endfilename);
+    os.rename(gap_path(startfilename), gap_path(endfilename));
 
 print(" done")
-
@@ -11,14 +11,8 @@ from ctypes import *
 import math
 import time
 import matplotlib.pyplot as plt
-import sys
-
-if sys.platform.startswith("win"):
-    dwf = cdll.dwf
-elif sys.platform.startswith("darwin"):
-    dwf = cdll.LoadLibrary("/Library/Frameworks/dwf.framework/dwf")
-else:
-    dwf = cdll.LoadLibrary("libdwf.so")
+
+from dwfbind import dwf
 
 hdwf = c_int()
 sts = c_byte()
@@ -10,16 +10,10 @@
 from ctypes import *
 import time
 from dwfconstants import *
-import sys
 import matplotlib.pyplot as plt
 import numpy
 
-if sys.platform.startswith("win"):
-    dwf = cdll.dwf
-elif sys.platform.startswith("darwin"):
-    dwf = cdll.LoadLibrary("/Library/Frameworks/dwf.framework/dwf")
-else:
-    dwf = cdll.LoadLibrary("libdwf.so")
+from dwfbind import dwf
 
 version = create_string_buffer(16)
 dwf.FDwfGetVersion(version)
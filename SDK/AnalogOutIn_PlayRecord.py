@@ -12,7 +12,6 @@
 
 from dwfconstants import *
 import ctypes
-import sys
 import wave
 import numpy
 
@@ -47,12 +46,7 @@ sRun = 1.0*length/rate
 
 
 
-if sys.platform.startswith("win"):
-    dwf = cdll.dwf
-elif sys.platform.startswith("darwin"):
-    dwf = cdll.LoadLibrary("/Library/Frameworks/dwf.framework/dwf")
-else:
-    dwf = cdll.LoadLibrary("libdwf.so")
+from dwfbind import dwf
 
 version = create_string_buffer(16)
 dwf.FDwfGetVersion(version)
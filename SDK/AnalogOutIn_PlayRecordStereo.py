@@ -7,12 +7,10 @@
        Python 2.7, 3
    Description:
    Play stereo WAV file on Wavegen channels
-   Record to stereo WAV file Scope channels
+   Record to stereo WAV file Scope channels, streamed to disk as it comes
 """
 
 from dwfconstants import *
-import ctypes
-import sys
 from scipy.io import wavfile
 import numpy
 
@@ -46,16 +44,16 @@ elif data_raw.dtype == numpy.int32 :
     data_float0 /= 2147483648.0
     data_float1 /= 2147483648.0
     
-data0 = (ctypes.c_double * length)(*data_float0)
-data1 = (ctypes.c_double * length)(*data_float1)
+data = numpy.stack((data_float0, data_float1))
 
 
-if sys.platform.startswith("win"):
-    dwf = cdll.dwf
-elif sys.platform.startswith("darwin"):
-    dwf = cdll.LoadLibrary("/Library/Frameworks/dwf.framework/dwf")
-else:
-    dwf = cdll.LoadLibrary("libdwf.so")
+from dwfbind import dwf
+from dwfasync import analog_out_play, stream
+from dwfrecord import AnalogInRecord
+from dwfwave import WaveWriter
+from dwfgaps import GapWriter
+from contextlib import aclosing
+import asyncio
 
 version = create_string_buffer(16)
 dwf.FDwfGetVersion(version)
@@ -73,97 +71,64 @@ if hdwf.value == 0:
     quit()
 
 
-print("Staring record...")
-iRecord = 0
-record0 = (c_int16*length)()
-record1 = (c_int16*length)()
-#set up acquisition
-dwf.FDwfAnalogInChannelEnableSet(hdwf, c_int(0), c_int(1)) # channel 1
-dwf.FDwfAnalogInChannelEnableSet(hdwf, c_int(1), c_int(1)) # channel 2
-dwf.FDwfAnalogInChannelRangeSet(hdwf, c_int(-1), c_double(2.0))
-dwf.FDwfAnalogInChannelOffsetSet(hdwf, c_int(-1), c_double(0))
-dwf.FDwfAnalogInAcquisitionModeSet(hdwf, acqmodeRecord)
-dwf.FDwfAnalogInFrequencySet(hdwf, c_double(rate))
-dwf.FDwfAnalogInRecordLengthSet(hdwf, c_double(slength))
-dwf.FDwfAnalogInTriggerPositionSet(hdwf, c_double(0))
-dwf.FDwfAnalogInTriggerSourceSet(hdwf, trigsrcAnalogOut1)
-dwf.FDwfAnalogInConfigure(hdwf, c_int(0), c_int(1))
-
-
-print("Playing audio...")
-iPlay = 0
-dwf.FDwfAnalogOutNodeEnableSet(hdwf, c_int(0), c_int(0), c_int(1)) # Wavegen channel 1
-dwf.FDwfAnalogOutNodeEnableSet(hdwf, c_int(1), c_int(0), c_int(1)) # Wavegen channel 2
-dwf.FDwfAnalogOutNodeFunctionSet(hdwf, c_int(-1), c_int(0), funcPlay)
-dwf.FDwfAnalogOutRepeatSet(hdwf, c_int(-1), c_int(1))
-dwf.FDwfAnalogOutRunSet(hdwf, c_int(-1), c_double(slength))
-dwf.FDwfAnalogOutNodeFrequencySet(hdwf, c_int(-1), c_int(0), c_double(rate))
-dwf.FDwfAnalogOutNodeAmplitudeSet(hdwf, c_int(-1), c_int(0), c_double(2.0))
-
-# prime the buffer with the first chunk of data
-cBuffer = c_int(0)
-dwf.FDwfAnalogOutNodeDataInfo(hdwf, c_int(0), c_int(0), c_int(0), byref(cBuffer))
-if cBuffer.value > length : cBuffer.value = length
-dwf.FDwfAnalogOutNodeDataSet(hdwf, c_int(0), c_int(0), data0, cBuffer)
-dwf.FDwfAnalogOutNodeDataSet(hdwf, c_int(1), c_int(0), data1, cBuffer)
-iPlay += cBuffer.value
-
-dwf.FDwfAnalogOutConfigure(hdwf, c_int(-1), c_int(1))
-
-dataLost = c_int(0)
-dataFree = c_int(0)
-dataAvailable = c_int(0)
-dataCorrupt = c_int(0)
-sts = c_ubyte(0)
+# interleaved stereo frames go to the file chunk by chunk, RF64 if it grows past 4 GiB
+print("Writing record.wav file")
+waveWrite = WaveWriter("record.wav", rate, 2)
+# lost samples are written as silence, record.wav.gaps tells them apart from real silence
+gaps = GapWriter("record.wav", True, rate)
+iWritten = 0
 totalLost = 0
 totalCorrupt = 0
 
-# loop to send out and read in data chunks
-while iRecord < length :
-    if dwf.FDwfAnalogOutStatus(hdwf, c_int(0), byref(sts)) != 1: # handle error
-        print("Error")
-        szerr = create_string_buffer(512)
-        dwf.FDwfGetLastErrorMsg(szerr)
-        print(szerr.value)
-        break
-    
-    # play, analog out data chunk
-    if sts.value == DwfStateRunning.value and iPlay < length :  # running and more data to stream
-        dwf.FDwfAnalogOutNodePlayStatus(hdwf, c_int(0), c_int(0), byref(dataFree), byref(dataLost), byref(dataCorrupt))
-        totalLost += dataLost.value
-        totalCorrupt += dataCorrupt.value
-        if iPlay + dataFree.value > length : # last chunk might be less than the free buffer size
-            dataFree.value = length - iPlay
-        if dataFree.value > 0 : 
-            if dwf.FDwfAnalogOutNodePlayData(hdwf, c_int(0), c_int(0), byref(data0, iPlay*8), dataFree) != 1: # offset for double is *8 (bytes) 
-                print("Error")
+record = AnalogInRecord(dwf, hdwf, rate, channels=(0, 1))
+
+def configure_record():
+    #set up acquisition
+    record.configure()
+    dwf.FDwfAnalogInChannelRangeSet(hdwf, c_int(-1), c_double(2.0))
+    dwf.FDwfAnalogInChannelOffsetSet(hdwf, c_int(-1), c_double(0))
+    dwf.FDwfAnalogInRecordLengthSet(hdwf, c_double(slength))
+    dwf.FDwfAnalogInTriggerPositionSet(hdwf, c_double(0))
+    dwf.FDwfAnalogInTriggerSourceSet(hdwf, trigsrcAnalogOut1)
+
+async def record_audio(armed):
+    # record, analog in data chunks, polled on the device thread
+    global totalLost, totalCorrupt, iWritten
+    async with aclosing(stream(record, configure=configure_record, started=armed)) as chunks:
+        async for chunk in chunks:
+            totalLost += chunk.cLost
+            totalCorrupt += chunk.cCorrupted
+            gaps.add_chunk(chunk)
+            iRecord = chunk.iFirst
+            if iRecord >= length:
                 break
-            if dwf.FDwfAnalogOutNodePlayData(hdwf, c_int(1), c_int(0), byref(data1, iPlay*8), dataFree) != 1:
-                print("Error")
+            cSamples = min(chunk.samples.shape[1], length - iRecord)
+            # +/-1V full scale as 16 bit; the device rounds the 2V range up to 5V, so the ADC codes are rescaled
+            codes = numpy.clip(numpy.rint(record.volts(chunk.samples[:, :cSamples]) * 32768.0), -32768, 32767).astype(numpy.int16)
+            if iRecord > iWritten:
+                # lost samples stay silent, so the record keeps its timing
+                waveWrite.writeframes(numpy.zeros((iRecord - iWritten, 2), dtype=numpy.int16))
+            waveWrite.writeframes(codes.T)
+            iWritten = iRecord + cSamples
+            if iRecord + cSamples >= length:
                 break
-            iPlay += dataFree.value
-    
-    if dwf.FDwfAnalogInStatus(hdwf, c_int(1), byref(sts)) != 1: # handle error
-        print("Error")
-        szerr = create_string_buffer(512)
-        dwf.FDwfGetLastErrorMsg(szerr)
-        print(szerr.value)
-        break
-    
-    # record, analog in data chunk
-    if sts.value == DwfStateRunning.value or sts.value == DwfStateDone.value : # recording or done
-        dwf.FDwfAnalogInStatusRecord(hdwf, byref(dataAvailable), byref(dataLost), byref(dataCorrupt))
-        iRecord += dataLost.value
-        totalLost += dataLost.value
-        totalCorrupt += dataCorrupt.value
-        if dataAvailable.value > 0 :
-            if iRecord+dataAvailable.value > length :
-                dataAvailable = c_int(length-iRecord)
-            # get Scope channel 1 data chunk, offset for 16bit data is 2*
-            dwf.FDwfAnalogInStatusData16(hdwf, c_int(0), byref(record0, 2*iRecord), c_int(0), dataAvailable) 
-            # get Scope channel 2 data chunk
-            dwf.FDwfAnalogInStatusData16(hdwf, c_int(1), byref(record1, 2*iRecord), c_int(0), dataAvailable)
-            iRecord += dataAvailable.value
+
+async def play_audio(armed):
+    # play, analog out data chunks once the record waits for the AnalogOut trigger
+    global totalLost, totalCorrupt
+    await armed.wait()
+    async with aclosing(analog_out_play(dwf, hdwf, rate, data, channels=(0, 1), amplitude=2.0)) as statuses:
+        async for status in statuses:
+            totalLost += status.cLost
+            totalCorrupt += status.cCorrupted
+
+async def play_record():
+    armed = asyncio.Event()
+    await asyncio.gather(record_audio(armed), play_audio(armed))
+
+print("Staring record...")
+print("Playing audio...")
+asyncio.run(play_record())
 
 
 print("Lost: "+str(totalLost))
@@ -172,7 +137,10 @@ print("done")
 dwf.FDwfAnalogOutReset(hdwf, c_int(-1))
 dwf.FDwfDeviceClose(hdwf)
 
-
-print("Writing record.wav file");
-wavfile.write('record.wav', rate, numpy.stack((record0, record1)).T)
-print("done")
+if iWritten < length:
+    waveWrite.writeframes(numpy.zeros((length - iWritten, 2), dtype=numpy.int16))
+waveWrite.close()
+gaps.close()
+print("record.wav written")
+if gaps.cEntries:
+    print(gaps.summary())
@@ -12,7 +12,6 @@ import scipy.io.wavfile
 import matplotlib.pyplot as plt
 import ctypes
 from ctypes import *
-import sys
 
 print("Load audio.WAV file")
 rate, data = scipy.io.wavfile.read('audio.wav')
@@ -35,12 +34,7 @@ data_c = (ctypes.c_double * len(dataf))(*dataf)
 plt.plot(data)
 plt.show()
 
-if sys.platform.startswith("win"):
-    dwf = cdll.dwf
-elif sys.platform.startswith("darwin"):
-    dwf = cdll.LoadLibrary("/Library/Frameworks/dwf.framework/dwf")
-else:
-    dwf = cdll.LoadLibrary("libdwf.so")
+from dwfbind import dwf
 
 # declare ctype variables
 hdwf = c_int()
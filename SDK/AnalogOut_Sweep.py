@@ -10,17 +10,11 @@
 from ctypes import *
 import time
 from dwfconstants import *
-import sys
 import matplotlib.pyplot as plt
 import numpy
 
 
-if sys.platform.startswith("win"):
-    dwf = cdll.dwf
-elif sys.platform.startswith("darwin"):
-    dwf = cdll.LoadLibrary("/Library/Frameworks/dwf.framework/dwf")
-else:
-    dwf = cdll.LoadLibrary("libdwf.so")
+from dwfbind import dwf
 
 # continue running after device close, prevent temperature drifts
 dwf.FDwfParamSet(c_int(4), c_int(0)) # 4 = DwfParamOnClose, 0 = continue 1 = stop 2 = shutdown
@@ -8,15 +8,9 @@
 """
 
 from ctypes import *
-import sys
 import time
 
-if sys.platform.startswith("win"):
-    dwf = cdll.dwf
-elif sys.platform.startswith("darwin"):
-    dwf = cdll.LoadLibrary("/Library/Frameworks/dwf.framework/dwf")
-else:
-    dwf = cdll.LoadLibrary("libdwf.so")
+from dwfbind import dwf
 
 # check library loading errors
 szerr = create_string_buffer(512)
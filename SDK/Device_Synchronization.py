@@ -13,12 +13,7 @@ import time
 import matplotlib.pyplot as plt
 import numpy as np
 
-if sys.platform.startswith("win"):
-    dwf = cdll.dwf
-elif sys.platform.startswith("darwin"):
-    dwf = cdll.LoadLibrary("/Library/Frameworks/dwf.framework/dwf")
-else:
-    dwf = cdll.LoadLibrary("libdwf.so")
+from dwfbind import dwf
 
 szerr = create_string_buffer(512)
 dwf.FDwfGetLastErrorMsg(szerr)
@@ -10,18 +10,13 @@
 from ctypes import *
 from dwfconstants import *
 import math
-import sys
 import time
 import matplotlib.pyplot as plt
 import numpy
 
 
-if sys.platform.startswith("win"):
-    dwf = cdll.dwf
-elif sys.platform.startswith("darwin"):
-    dwf = cdll.LoadLibrary("/Library/Frameworks/dwf.framework/dwf")
-else:
-    dwf = cdll.LoadLibrary("libdwf.so")
+from dwfbind import dwf
+from dwfbuffers import RingBuffer
 
 hdwf = c_int()
 sts = c_ubyte()
@@ -68,11 +63,11 @@ dwf.FDwfDigitalOutConfigure(hdwf, c_int(1))
 
 hzRecord = 100e6
 nRecord = int(2e6)
-rgwRecord = (c_uint16*nRecord)()
+# circular sample buffer
+ring = RingBuffer(nRecord, numpy.uint16)
 cAvailable = c_int()
 cLost = c_int()
 cCorrupted = c_int()
-iSample = 0
 fLost = 0
 fCorrupted = 0
 hzDI = c_double()
@@ -103,8 +98,7 @@ while True:
     dwf.FDwfDigitalInStatus(hdwf, c_int(1), byref(sts))
     dwf.FDwfDigitalInStatusRecord(hdwf, byref(cAvailable), byref(cLost), byref(cCorrupted))
     
-    iSample += cLost.value
-    iSample %= nRecord
+    ring.advance(cLost.value)
     
     if cLost.value :
         fLost = 1
@@ -113,22 +107,20 @@ while True:
 
     iBuffer = 0
     while cAvailable.value>0:
-        cSamples = cAvailable.value
-        if iSample+cAvailable.value > nRecord: # we are using circular sample buffer, prevent overflow
-            cSamples = nRecord-iSample
-        dwf.FDwfDigitalInStatusData2(hdwf, byref(rgwRecord, 2*iSample), c_int(iBuffer), c_int(2*cSamples))
+        # we are using circular sample buffer, prevent overflow
+        cSamples = min(cAvailable.value, ring.cContiguous)
+        dwf.FDwfDigitalInStatusData2(hdwf, ring.pointer(), c_int(iBuffer), c_int(2*cSamples))
         iBuffer += cSamples
         cAvailable.value -= cSamples
-        iSample += cSamples
-        iSample %= nRecord
+        ring.advance(cSamples)
 
     if sts.value == DwfStateDone.value :
         break
 
 dwf.FDwfDeviceClose(hdwf)
 
-if iSample != 0 :
-    rgwRecord = rgwRecord[iSample:]+rgwRecord[:iSample]
+# oldest sample first, rotated in place
+rgwRecord = ring.unwrap()[0]
 
 print("  done")
 if fLost:
@@ -137,5 +129,5 @@ if fCorrupted:
     print("Samples could be corrupted! Reduce sample rate")
 
 
-plt.plot(numpy.fromiter(rgwRecord, dtype = numpy.uint16))
+plt.plot(rgwRecord)
 plt.show()
@@ -10,18 +10,14 @@
 from ctypes import *
 from dwfconstants import *
 import math
-import sys
 import time
 import matplotlib.pyplot as plt
 import numpy
 
 
-if sys.platform.startswith("win"):
-    dwf = cdll.dwf
-elif sys.platform.startswith("darwin"):
-    dwf = cdll.LoadLibrary("/Library/Frameworks/dwf.framework/dwf")
-else:
-    dwf = cdll.LoadLibrary("libdwf.so")
+from dwfbind import dwf
+from dwfbuffers import BufferPool
+from dwfgaps import GapWriter
 
 hdwf = c_int()
 sts = c_ubyte()
@@ -78,9 +74,17 @@ dwf.FDwfDigitalInInputOrderSet(hdwf, c_int(0))
 # begin acquisition
 dwf.FDwfDigitalInConfigure(hdwf, c_bool(1), c_bool(1))
 
+# chunks are read into one reused page-aligned buffer of the device buffer size
+cBufferMax = c_int()
+dwf.FDwfDigitalInBufferSizeInfo(hdwf, byref(cBufferMax))
+pool = BufferPool(max(cBufferMax.value, 1 << 16), numpy.uint16)
+buffer = pool.acquire()
+
 print("Recording...")
 
 file = open("record.bin", "wb")
+# where samples were lost or corrupted; record.bin holds only the samples that arrived
+gaps = GapWriter("record.bin", False, hzDI.value/divSample)
 
 while True:
     if dwf.FDwfDigitalInStatus(hdwf, c_int(1), byref(sts)) == 0:
@@ -89,6 +93,9 @@ while True:
     
     dwf.FDwfDigitalInStatusRecord(hdwf, byref(cAvailable), byref(cLost), byref(cCorrupted))
     
+    # iRecord counts stored samples, the sample index also counts the lost ones
+    gaps.add(iRecord + gaps.cLost + cLost.value, cAvailable.value, cLost.value, cCorrupted.value)
+
     if cLost.value :
         fLost = 1
     if cCorrupted.value :
@@ -101,11 +108,13 @@ while True:
 
     # print(str(iRecord)+" "+str(cChunk))
     
-    rgBuffer = (c_uint16*cChunk)()
-    
-    dwf.FDwfDigitalInStatusData(hdwf, byref(rgBuffer), c_int(2*cChunk))
-    
-    file.write(numpy.fromiter(rgBuffer, dtype = numpy.ushort))
+    # the buffer covers the device buffer, the loop only guards against a larger report
+    iChunk = 0
+    while iChunk < cChunk:
+        cPart = min(cChunk - iChunk, pool.cItems)
+        dwf.FDwfDigitalInStatusData2(hdwf, buffer.pointer, c_int(iChunk), c_int(2*cPart))
+        file.write(buffer.array[:cPart])
+        iChunk += cPart
 
     iRecord += cChunk
 
@@ -116,9 +125,12 @@ while True:
 dwf.FDwfDeviceClose(hdwf)
 
 file.close()
+gaps.close()
 
 if fLost != 0:
     print("Samples were lost! Reduce sample rate")
 if fCorrupted != 0:
     print("Samples could be corrupted! Reduce sample rate")
+if gaps.cEntries:
+    print(gaps.summary())
 
@@ -16,15 +16,10 @@ from dwfconstants import *
 import math
 import time
 import matplotlib.pyplot as plt
-import sys
 import numpy
 
-if sys.platform.startswith("win"):
-    dwf = cdll.dwf
-elif sys.platform.startswith("darwin"):
-    dwf = cdll.LoadLibrary("/Library/Frameworks/dwf.framework/dwf")
-else:
-    dwf = cdll.LoadLibrary("libdwf.so")
+from dwfbind import dwf
+from dwfbuffers import MappedCapture
 
 hdwf = c_int()
 
@@ -60,7 +55,8 @@ print("Configuring DigitalIn")
 sts = c_byte()
 hzDI = c_double()
 cSamples = 256*1024*1024;
-rgbSamples = (c_byte*cSamples)()
+# the samples are read straight into record.bin, mapped, instead of a 256 MiB array in RAM
+capture = MappedCapture("record.bin", cSamples, numpy.uint8)
 t = c_int()
 
 dwf.FDwfDigitalInInternalClockInfo(hdwf, byref(hzDI))
@@ -89,13 +85,10 @@ while True:
     time.sleep(.1)
 print("   done")
 
-# get samples, byte size
-dwf.FDwfDigitalInStatusData(hdwf, rgbSamples, 1*cSamples)
-dwf.FDwfDeviceCloseAll()
-
+# get samples, byte size, into the file
 print("Writing to file...")
-f = open("record.bin", "wb")
-f.write(numpy.fromiter(rgbSamples, dtype = numpy.byte))
-f.close()
+dwf.FDwfDigitalInStatusData(hdwf, capture.pointer(), 1*cSamples)
+dwf.FDwfDeviceCloseAll()
+capture.close()
 print("   done")
 
@@ -10,17 +10,12 @@
 from ctypes import *
 from dwfconstants import *
 import math
-import sys
 import matplotlib.pyplot as plt
 import numpy
 
 
-if sys.platform.startswith("win"):
-    dwf = cdll.dwf
-elif sys.platform.startswith("darwin"):
-    dwf = cdll.LoadLibrary("/Library/Frameworks/dwf.framework/dwf")
-else:
-    dwf = cdll.LoadLibrary("libdwf.so")
+from dwfbind import dwf
+from dwfbuffers import RingBuffer
 
 hdwf = c_int()
 sts = c_byte()
@@ -54,11 +49,11 @@ dwf.FDwfDigitalOutConfigure(hdwf, c_int(1))
 
 # set number of sample to acquire
 nSamples = 1000000
-rgwSamples = (c_uint16*nSamples)()
+# circular sample buffer
+ring = RingBuffer(nSamples, numpy.uint16)
 cAvailable = c_int()
 cLost = c_int()
 cCorrupted = c_int()
-iSample = 0
 fLost = 0
 fCorrupted = 0
 hzDI = c_double()
@@ -92,8 +87,7 @@ while True:
     dwf.FDwfDigitalInStatus(hdwf, c_int(1), byref(sts))
     dwf.FDwfDigitalInStatusRecord(hdwf, byref(cAvailable), byref(cLost), byref(cCorrupted))
     
-    iSample += cLost.value
-    iSample %= nSamples
+    ring.advance(cLost.value)
     
     if cLost.value :
         fLost = 1
@@ -102,24 +96,21 @@ while True:
 
     iBuffer = 0
     while cAvailable.value>0:
-        cSamples = cAvailable.value
         # we are using circular sample buffer, prevent overflow
-        if iSample+cAvailable.value > nSamples:
-            cSamples = nSamples-iSample
-        dwf.FDwfDigitalInStatusData2(hdwf, byref(rgwSamples, 2*iSample), c_int(iBuffer), c_int(2*cSamples))
+        cSamples = min(cAvailable.value, ring.cContiguous)
+        dwf.FDwfDigitalInStatusData2(hdwf, ring.pointer(), c_int(iBuffer), c_int(2*cSamples))
         iBuffer += cSamples
         cAvailable.value -= cSamples
-        iSample += cSamples
-        iSample %= nSamples
+        ring.advance(cSamples)
 
     if sts.value == DwfStateDone.value :
-        print(str(iSample))
+        print(str(ring.iWrite))
         break
 
 dwf.FDwfDeviceClose(hdwf)
 
-if iSample != 0 :
-    rgwSamples = rgwSamples[iSample:]+rgwSamples[:iSample]
+# oldest sample first, rotated in place
+rgwSamples = ring.unwrap()[0]
 
 print("   done")
 if fLost:
@@ -128,9 +119,10 @@ if cCorrupted:
     print("Samples could be corrupted! Reduce sample rate")
 
 f = open("record.csv", "w")
-for v in rgwSamples:
-    f.write("%s\n" % v)
+# formatted in C, one value per line
+rgwSamples.tofile(f, sep="\n", format="%s")
+f.write("\n")
 f.close()
 
-plt.plot(numpy.fromiter(rgwSamples, dtype = numpy.uint16))
+plt.plot(rgwSamples)
 plt.show()
@@ -10,14 +10,11 @@
 from ctypes import *
 from dwfconstants import *
 import math
-import sys
+import numpy
 
-if sys.platform.startswith("win"):
-    dwf = cdll.dwf
-elif sys.platform.startswith("darwin"):
-    dwf = cdll.LoadLibrary("/Library/Frameworks/dwf.framework/dwf")
-else:
-    dwf = cdll.LoadLibrary("libdwf.so")
+from dwfbind import dwf
+from dwfbuffers import MappedCapture
+from dwfgaps import GapIndex, GapWriter
 
 hdwf = c_int()
 sts = c_byte()
@@ -41,7 +38,8 @@ if hdwf.value == 0:
 print("Configuring Digital In...")
 
 nSamples = 100000000 # 100MiB, ~12Mi of 8bit SPI
-rgbSamples = (c_uint8*nSamples)()
+# the raw samples go straight into record.bin, mapped, so they need no RAM and outlive a crash
+capture = MappedCapture("record.bin", nSamples, numpy.uint8)
 cAvailable = c_int()
 cLost = c_int()
 cCorrupted = c_int()
@@ -68,6 +66,9 @@ dwf.FDwfDigitalInTriggerPositionSet(hdwf, c_int(-1))
 dwf.FDwfDigitalInTriggerSet(hdwf, c_int(0), c_int(0), c_int((1<<idxClk)|(1<<idxCS)), c_int(0))
 # sample on clock rising edge for sampling bits, or CS rising edge to detect frames
 
+# where samples were lost or corrupted, next to record.bin; lost ones keep their place in the capture
+gaps = GapWriter("record.bin", True)
+
 print("Starting spy, press Ctrl+C to stop...")
 dwf.FDwfDigitalInConfigure(hdwf, c_bool(0), c_bool(1))
 
@@ -76,6 +77,7 @@ try:
         dwf.FDwfDigitalInStatus(hdwf, c_int(1), byref(sts))
         dwf.FDwfDigitalInStatusRecord(hdwf, byref(cAvailable), byref(cLost), byref(cCorrupted))
         cSamples += cLost.value
+        gaps.add(cSamples, cAvailable.value, cLost.value, cCorrupted.value)
         
         if cLost.value :
             fLost = 1
@@ -86,7 +88,7 @@ try:
             if cSamples+cAvailable.value > nSamples :
                 cAvailable = c_int(nSamples-cSamples)
             # get samples
-            dwf.FDwfDigitalInStatusData(hdwf, byref(rgbSamples, cSamples), c_int(cAvailable.value))
+            dwf.FDwfDigitalInStatusData(hdwf, capture.pointer(cSamples), c_int(cAvailable.value))
             cSamples += cAvailable.value
         
         if sts != DwfStateRunning :
@@ -96,12 +98,15 @@ except KeyboardInterrupt: # Ctrl+C
     pass
 
 dwf.FDwfDeviceClose(hdwf)
+gaps.close()
 
 print("   done", str(cSamples), "samples")
 if fLost:
     print("Samples were lost!")
 elif cCorrupted:
     print("Samples could be corrupted!")
+if gaps.cEntries:
+    print(gaps.summary())
 
 print("Decoding data and saving to file")
 
@@ -112,34 +117,54 @@ cBit = 0
 fMosi = open("record_mosi.csv", "w")
 fMiso = open("record_miso.csv", "w")
 
-for i in range(0,cSamples):
-    v = rgbSamples[i]
-    if (v>>idxCS)&1: # CS high, inactive
-        if cBit != 0: # log leftover bits, frame not multiple of nBits
-            fMosi.write("X%s %s " % (cBit, hex(fsMosi)))
-            fMiso.write("X%s %s " % (cBit, hex(fsMiso)))
+# frames are decoded within runs of good samples, a gap ends the frame it cuts into
+# bounds alternate: good run, bad run, good run...
+begins, ends = GapIndex("record.bin").bad_ranges(0, cSamples)
+bounds = [0] + numpy.stack((begins, ends), axis=1).ravel().tolist() + [cSamples]
+
+# iterating the memoryview yields Python ints without copying the capture
+rgbSamples = memoryview(capture.array)[:cSamples]
+for iRun in range(len(bounds) - 1):
+    iBegin = bounds[iRun]
+    iEnd = bounds[iRun + 1]
+    if iRun % 2:
+        fMosi.write("\nGAP %d-%d\n" % (iBegin, iEnd))
+        fMiso.write("\nGAP %d-%d\n" % (iBegin, iEnd))
         cBit = 0
         fsMosi = 0
         fsMiso = 0
-        fMosi.write("\n")
-        fMiso.write("\n")
-    else:
-        cBit+=1
-        fsMosi <<= 1 # MSB first
-        fsMiso <<= 1 # MSB first
-        if (v>>idxMosi)&1 :
-            fsMosi |= 1
-        if (v>>idxMiso)&1 :
-            fsMiso |= 1
-        if cBit >= nBits: # got nBits of bits
-            fMosi.write("%s " % hex(fsMosi))
-            fMiso.write("%s " % hex(fsMiso))
+        continue
+    for v in rgbSamples[iBegin:iEnd]:
+        if (v>>idxCS)&1: # CS high, inactive
+            if cBit != 0: # log leftover bits, frame not multiple of nBits
+                fMosi.write("X%s %s " % (cBit, hex(fsMosi)))
+                fMiso.write("X%s %s " % (cBit, hex(fsMiso)))
             cBit = 0
             fsMosi = 0
             fsMiso = 0
+            fMosi.write("\n")
+            fMiso.write("\n")
+        else:
+            cBit+=1
+            fsMosi <<= 1 # MSB first
+            fsMiso <<= 1 # MSB first
+            if (v>>idxMosi)&1 :
+                fsMosi |= 1
+            if (v>>idxMiso)&1 :
+                fsMiso |= 1
+            if cBit >= nBits: # got nBits of bits
+                fMosi.write("%s " % hex(fsMosi))
+                fMiso.write("%s " % hex(fsMiso))
+                cBit = 0
+                fsMosi = 0
+                fsMiso = 0
 fMosi.close()
 fMiso.close()
 
+# keep only the captured part of record.bin
+rgbSamples.release()
+capture.close(cSamples)
+
 
 
 
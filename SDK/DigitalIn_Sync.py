@@ -10,14 +10,9 @@
 from ctypes import *
 from dwfconstants import *
 import math
-import sys
 
-if sys.platform.startswith("win"):
-    dwf = cdll.dwf
-elif sys.platform.startswith("darwin"):
-    dwf = cdll.LoadLibrary("/Library/Frameworks/dwf.framework/dwf")
-else:
-    dwf = cdll.LoadLibrary("libdwf.so")
+from dwfbind import dwf
+from dwfgaps import GapWriter
 
 hdwf = c_int()
 sts = c_byte()
@@ -72,6 +67,8 @@ dwf.FDwfDigitalInTriggerSet(hdwf, c_int(0), c_int(0), c_int(1<<0), c_int(0)) # D
 dwf.FDwfDigitalInConfigure(hdwf, c_bool(0), c_bool(1))
 
 print("Starting sync record...")
+# where samples were lost or corrupted, next to record.csv; lost ones keep their place in rgwSamples
+gaps = GapWriter("record.csv", True)
 
 while cSamples < nSamples:
     dwf.FDwfDigitalInStatus(hdwf, c_int(1), byref(sts))
@@ -82,6 +79,7 @@ while cSamples < nSamples:
     dwf.FDwfDigitalInStatusRecord(hdwf, byref(cAvailable), byref(cLost), byref(cCorrupted))
 
     cSamples += cLost.value
+    gaps.add(cSamples, cAvailable.value, cLost.value, cCorrupted.value)
     
     if cLost.value :
         fLost = 1
@@ -99,12 +97,15 @@ while cSamples < nSamples:
     cSamples += cAvailable.value
 
 dwf.FDwfDeviceClose(hdwf)
+gaps.close()
 
 print("   done")
 if fLost:
     print("Samples were lost! Reduce sample rate")
 if cCorrupted:
     print("Samples could be corrupted! Reduce sample rate")
+if gaps.cEntries:
+    print(gaps.summary())
 
 f = open("record.csv", "w")
 for v in rgwSamples:
@@ -0,0 +1,144 @@
+"""
+   DWFAsync (asyncio streams of the instruments)
+   Revision:  2026-10-18
+
+   Requires:
+       Python 3.11, numpy
+   Description:
+   Async generators over the sources of dwfrecord.py, so several
+   instruments, or several devices, run from one event loop instead of one
+   hand-written busy loop per script:
+       async for chunk in analog_in_record(dwf, hdwf, 1e6, (0, 1)): ...
+   The FDwf calls block, so every start/read/stop runs on the device's own
+   executor thread: the instruments of one device are polled one after the
+   other, as the runtime expects, while different devices and the event
+   loop run in parallel.
+   AdaptivePoll sets the sleep between polls from what the last poll
+   brought: fast while the device buffer fills, slower while nothing comes,
+   e.g. a spy waiting for bus traffic.
+   Leaving the async for (break, exception, cancel) stops the instrument;
+   wrap the generator in contextlib.aclosing() to have it stopped at once
+   rather than when the generator is collected.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from ctypes import *
+import asyncio
+import threading
+
+try:
+    from SDK.dwfconstants import *
+    from SDK.dwfrecord import AnalogInRecord, AnalogOutPlay, DigitalInRecord, I2cSpy, I2cMessage, PlayStatus
+except ImportError:
+    from dwfconstants import *
+    from dwfrecord import AnalogInRecord, AnalogOutPlay, DigitalInRecord, I2cSpy, I2cMessage, PlayStatus
+
+
+class AdaptivePoll:
+    """Poll interval aimed at fTarget of the device buffer per poll.
+
+    An empty poll doubles the interval up to secMax; otherwise it is scaled by
+    how far the poll was from the target, at most 2x per step, down to secMin.
+    """
+
+    def __init__(self, secMin=0.0005, secMax=0.1, fTarget=0.25):
+        self.secMin = secMin
+        self.secMax = secMax
+        self.fTarget = fTarget
+        self.sec = secMin
+
+    def update(self, cItems, cBuffer):
+        if cItems <= 0:
+            factor = 2.0
+        else:
+            factor = min(max(self.fTarget * cBuffer / cItems, 0.5), 2.0)
+        self.sec = min(max(self.sec * factor, self.secMin), self.secMax)
+        return self.sec
+
+
+_executors = {}
+_executorsLock = threading.Lock()
+
+
+def device_executor(hdwf):
+    """The single-thread executor that makes every FDwf call of this device."""
+    key = hdwf.value if hasattr(hdwf, "value") else hdwf
+    with _executorsLock:
+        executor = _executors.get(key)
+        if executor is None:
+            executor = _executors[key] = ThreadPoolExecutor(1, thread_name_prefix="dwf-" + str(key))
+        return executor
+
+
+def _progress(source, item):
+    """(items this poll brought, buffer size, source finished) for AdaptivePoll."""
+    if item is None:
+        return 0, 1, False
+    if isinstance(item, PlayStatus):
+        # the room freed since the last poll is what the device played
+        return item.cFree, getattr(source, "cBuffer", item.cFree) or 1, item.fDone
+    if isinstance(item, I2cMessage):
+        return len(item.data) + 1, len(source.rgData), False
+    fDone = source.sts.value == DwfStateDone.value
+    return item.samples.shape[1], source.cBuffer, fDone
+
+
+async def stream(source, poll=None, configure=None, started=None):
+    """Start source, yield what each read() returns until it is done, stop it.
+
+    configure is called on the executor before the start, started (an
+    asyncio.Event) is set once the instrument runs, e.g. so a record is armed
+    before the AnalogOut that triggers it starts playing.
+    """
+    loop = asyncio.get_running_loop()
+    executor = device_executor(source.hdwf)
+    poll = poll or AdaptivePoll()
+    if configure is not None:
+        await loop.run_in_executor(executor, configure)
+    await loop.run_in_executor(executor, source.start)
+    if started is not None:
+        started.set()
+    try:
+        while True:
+            item = await loop.run_in_executor(executor, source.read)
+            cItems, cBuffer, fDone = _progress(source, item)
+            if item is not None:
+                yield item
+            if fDone:
+                return
+            await asyncio.sleep(poll.update(cItems, cBuffer))
+    finally:
+        await loop.run_in_executor(executor, source.stop)
+
+
+def analog_in_record(dwf, hdwf, hzAcq, channels=(0, 1), config=None, poll=None, started=None):
+    """RecordChunks of continuous AnalogIn record mode, see dwfrecord.AnalogInRecord."""
+    record = AnalogInRecord(dwf, hdwf, hzAcq, channels)
+    return stream(record, poll, lambda: record.configure(config), started)
+
+
+def digital_in_record(dwf, hdwf, hzAcq, cBits=16, poll=None, started=None):
+    """RecordChunks of (1 x samples) DigitalIn words at hzAcq."""
+    record = DigitalInRecord(dwf, hdwf, hzAcq, cBits)
+    return stream(record, poll, record.configure, started)
+
+
+def spi_spy(dwf, hdwf, pinCS=0, pinClk=1, cBits=8, poll=None, started=None):
+    """RecordChunks of DIO words sampled on every clock and chip-select rising edge.
+
+    Bit pinCS high marks the end of a frame, see DigitalIn_Spi_Spy.py for the decoding.
+    """
+    record = DigitalInRecord(dwf, hdwf, None, cBits, detector=(0, 0, (1 << pinClk) | (1 << pinCS), 0))
+    return stream(record, poll, record.configure, started)
+
+
+def i2c_spy(dwf, hdwf, hzRate=1e5, pinScl=0, pinSda=1, poll=None, started=None):
+    """I2cMessages seen on the bus."""
+    spy = I2cSpy(dwf, hdwf, hzRate, pinScl, pinSda)
+    return stream(spy, poll or AdaptivePoll(secMin=0.001), spy.configure, started)
+
+
+def analog_out_play(dwf, hdwf, hz, data, channels=(0,), amplitude=1.0, offset=0.0, poll=None, started=None):
+    """PlayStatus per poll while (channels x samples) data in +/-1 is streamed to the Wavegen."""
+    play = AnalogOutPlay(dwf, hdwf, hz, data, channels, amplitude, offset)
+    return stream(play, poll, play.configure, started)
@@ -0,0 +1,195 @@
+"""
+   DWFBind (shared libdwf binding)
+   Revision:  2026-10-18
+
+   Requires:
+       Python 3.11
+   Description:
+   Loads the WaveForms runtime once per process. dwf is the plain handle the
+   scripts have always used: functions without argtypes, arguments wrapped in
+   c_int()/c_double()/c_bool() by the caller. api is a second handle on the
+   same library with prototypes declared, for setup code that wants Python
+   floats converted and wrong argument types rejected.
+   Prototypes cost an argtypes conversion per argument on every call, so the
+   poll loops stay on dwf and avoid the allocations instead: out-parameters
+   are byref()-ed once and int arguments are passed as Python ints. check()
+   turns a false return into DwfError.
+   DWF_BACKEND=sim swaps the library for the simulated runtime of dwfsim.py,
+   DWF_PROFILE=<json path> times every call, see dwfprofile.py.
+"""
+
+from ctypes import *
+import os
+import sys
+
+try:
+    from SDK.dwfprofile import ProfiledLibrary, enable
+except ImportError:
+    from dwfprofile import ProfiledLibrary, enable
+
+HDWF = c_int
+BOOL = c_int
+STS = c_ubyte # DwfState
+TRIGSRC = c_ubyte
+pInt = POINTER(c_int)
+pUInt = POINTER(c_uint)
+pDouble = POINTER(c_double)
+
+# argtypes per function, from dwf.h; every function returns BOOL
+_PROTOTYPES = {
+    "FDwfGetLastError": (pInt,),
+    "FDwfGetLastErrorMsg": (c_char_p,),
+    "FDwfGetVersion": (c_char_p,),
+    "FDwfParamSet": (c_int, c_int),
+
+    "FDwfEnum": (c_int, pInt),
+    "FDwfEnumDeviceType": (c_int, pInt, pInt),
+    "FDwfEnumDeviceIsOpened": (c_int, pInt),
+    "FDwfEnumDeviceName": (c_int, c_char_p),
+    "FDwfEnumSN": (c_int, c_char_p),
+    "FDwfEnumConfig": (c_int, pInt),
+    "FDwfEnumConfigInfo": (c_int, c_int, pInt),
+
+    "FDwfDeviceOpen": (c_int, POINTER(HDWF)),
+    "FDwfDeviceConfigOpen": (c_int, c_int, POINTER(HDWF)),
+    "FDwfDeviceClose": (HDWF,),
+    "FDwfDeviceCloseAll": (),
+    "FDwfDeviceAutoConfigureSet": (HDWF, c_int),
+    "FDwfDeviceReset": (HDWF,),
+    "FDwfDeviceTriggerSet": (HDWF, c_int, TRIGSRC),
+    "FDwfDeviceTriggerPC": (HDWF,),
+    "FDwfDeviceParamSet": (HDWF, c_int, c_int),
+
+    "FDwfAnalogInReset": (HDWF,),
+    "FDwfAnalogInConfigure": (HDWF, c_int, c_int),
+    "FDwfAnalogInStatus": (HDWF, c_int, POINTER(STS)),
+    "FDwfAnalogInStatusSamplesLeft": (HDWF, pInt),
+    "FDwfAnalogInStatusSamplesValid": (HDWF, pInt),
+    "FDwfAnalogInStatusIndexWrite": (HDWF, pInt),
+    "FDwfAnalogInStatusAutoTriggered": (HDWF, pInt),
+    "FDwfAnalogInStatusData": (HDWF, c_int, pDouble, c_int),
+    "FDwfAnalogInStatusData2": (HDWF, c_int, pDouble, c_int, c_int),
+    "FDwfAnalogInStatusData16": (HDWF, c_int, POINTER(c_short), c_int, c_int),
+    "FDwfAnalogInStatusSample": (HDWF, c_int, pDouble),
+    "FDwfAnalogInStatusRecord": (HDWF, pInt, pInt, pInt),
+    "FDwfAnalogInStatusTime": (HDWF, pUInt, pUInt, pUInt),
+    "FDwfAnalogInBufferSizeInfo": (HDWF, pInt, pInt),
+    "FDwfAnalogInBufferSizeSet": (HDWF, c_int),
+    "FDwfAnalogInBitsInfo": (HDWF, pInt),
+    "FDwfAnalogInFrequencySet": (HDWF, c_double),
+    "FDwfAnalogInFrequencyGet": (HDWF, pDouble),
+    "FDwfAnalogInAcquisitionModeSet": (HDWF, c_int),
+    "FDwfAnalogInRecordLengthSet": (HDWF, c_double),
+    "FDwfAnalogInChannelCount": (HDWF, pInt),
+    "FDwfAnalogInChannelEnableSet": (HDWF, c_int, c_int),
+    "FDwfAnalogInChannelFilterSet": (HDWF, c_int, c_int),
+    "FDwfAnalogInChannelRangeSet": (HDWF, c_int, c_double),
+    "FDwfAnalogInChannelRangeGet": (HDWF, c_int, pDouble),
+    "FDwfAnalogInChannelOffsetSet": (HDWF, c_int, c_double),
+    "FDwfAnalogInChannelOffsetGet": (HDWF, c_int, pDouble),
+    "FDwfAnalogInChannelAttenuationSet": (HDWF, c_int, c_double),
+    "FDwfAnalogInChannelAttenuationGet": (HDWF, c_int, pDouble),
+    "FDwfAnalogInTriggerSourceSet": (HDWF, TRIGSRC),
+    "FDwfAnalogInTriggerPositionSet": (HDWF, c_double),
+    "FDwfAnalogInTriggerAutoTimeoutSet": (HDWF, c_double),
+    "FDwfAnalogInTriggerTypeSet": (HDWF, c_int),
+    "FDwfAnalogInTriggerChannelSet": (HDWF, c_int),
+    "FDwfAnalogInTriggerLevelSet": (HDWF, c_double),
+    "FDwfAnalogInTriggerHysteresisSet": (HDWF, c_double),
+    "FDwfAnalogInTriggerConditionSet": (HDWF, c_int),
+
+    "FDwfDigitalInReset": (HDWF,),
+    "FDwfDigitalInConfigure": (HDWF, c_int, c_int),
+    "FDwfDigitalInStatus": (HDWF, c_int, POINTER(STS)),
+    "FDwfDigitalInStatusSamplesValid": (HDWF, pInt),
+    "FDwfDigitalInStatusData": (HDWF, c_void_p, c_int),
+    "FDwfDigitalInStatusData2": (HDWF, c_void_p, c_int, c_int),
+    "FDwfDigitalInStatusRecord": (HDWF, pInt, pInt, pInt),
+    "FDwfDigitalInInternalClockInfo": (HDWF, pDouble),
+    "FDwfDigitalInDividerSet": (HDWF, c_uint),
+    "FDwfDigitalInDividerGet": (HDWF, pUInt),
+    "FDwfDigitalInBitsInfo": (HDWF, pInt),
+    "FDwfDigitalInSampleFormatSet": (HDWF, c_int),
+    "FDwfDigitalInInputOrderSet": (HDWF, c_int),
+    "FDwfDigitalInBufferSizeInfo": (HDWF, pInt),
+    "FDwfDigitalInBufferSizeSet": (HDWF, c_int),
+    "FDwfDigitalInBufferSizeGet": (HDWF, pInt),
+    "FDwfDigitalInAcquisitionModeSet": (HDWF, c_int),
+    "FDwfDigitalInTriggerSourceSet": (HDWF, TRIGSRC),
+    "FDwfDigitalInTriggerPositionSet": (HDWF, c_uint),
+    "FDwfDigitalInTriggerPrefillSet": (HDWF, c_uint),
+    "FDwfDigitalInTriggerSet": (HDWF, c_uint, c_uint, c_uint, c_uint),
+
+    "FDwfAnalogOutReset": (HDWF, c_int),
+    "FDwfAnalogOutConfigure": (HDWF, c_int, c_int),
+    "FDwfAnalogOutStatus": (HDWF, c_int, POINTER(STS)),
+}
+
+
+class DwfError(Exception):
+    """An FDwf function returned false; the message is the runtime's last error."""
+
+
+def library_path():
+    """Name of the WaveForms runtime for this platform."""
+    if sys.platform.startswith("win"):
+        return "dwf"
+    elif sys.platform.startswith("darwin"):
+        return "/Library/Frameworks/dwf.framework/dwf"
+    else:
+        return "libdwf.so"
+
+
+_apis = {}
+
+
+def prototyped(lib):
+    """Handle on the library behind lib with argtypes and restype declared.
+
+    It is a separate CDLL object, so the declarations never affect the plain
+    handle, where scripts pass c_bool() or c_byte() to int parameters.
+    The simulated backend takes any argument type and is returned as is.
+    """
+    if isinstance(lib, ProfiledLibrary):
+        return lib.profiler.wrap(prototyped(lib.wrapped))
+    if not isinstance(lib, CDLL):
+        return lib
+    api = _apis.get(lib._name)
+    if api is None:
+        api = CDLL(lib._name)
+        for name, argtypes in _PROTOTYPES.items():
+            try:
+                fn = getattr(api, name)
+            except AttributeError:
+                # not exported by older runtimes
+                continue
+            fn.argtypes = argtypes
+            fn.restype = BOOL
+        _apis[lib._name] = api
+    return api
+
+
+def last_error_msg(lib):
+    szerr = create_string_buffer(512)
+    lib.FDwfGetLastErrorMsg(szerr)
+    return szerr.value.decode(errors="replace")
+
+
+def check(rc, lib=None):
+    """Raise DwfError when an FDwf call returned false; costs one test otherwise."""
+    if not rc:
+        raise DwfError(last_error_msg(lib or dwf))
+    return rc
+
+
+if os.environ.get("DWF_BACKEND", "").lower() == "sim":
+    # hardware-free runs, see dwfsim.py for the DWF_SIM settings
+    try:
+        from SDK.dwfsim import SimDwf
+    except ImportError:
+        from dwfsim import SimDwf
+    dwf = SimDwf.from_environment()
+else:
+    dwf = cdll.LoadLibrary(library_path())
+dwf = enable(dwf)
+api = prototyped(dwf)
@@ -0,0 +1,494 @@
+"""
+   DWFBroker (device broker daemon)
+   Revision:  2026-10-18
+
+   Requires:
+       Python 3.11, numpy
+   Description:
+   Keeps devices open with AnalogIn recording and settled, so a script that
+   starts later gets samples within milliseconds instead of opening the
+   device, configuring it and sleeping 2 s for the offset to stabilize.
+   The broker listens on a Unix socket (DWF_BROKER or the default path in
+   the temp directory); where Python has no Unix sockets, e.g. on Windows,
+   on a loopback TCP port instead, DWF_BROKER is then "host:port". A client leases one device with the rate, channels,
+   ranges and offsets it wants: when they match what the device already
+   runs, the lease is ready at once; otherwise only the changed settings
+   are sent (dwfconfig.py) and the lease waits secSettle when a range or
+   offset changed. Chunks are buffered for secBuffer seconds
+   per device and handed out from the moment the lease is started.
+   Messages are a "<II" JSON/payload length pair, a JSON header and a raw
+   payload; sample payloads are (channels x samples) int16 ADC codes, a
+   quarter of the bytes of doubles, scaled by the channel settings of the
+   lease reply.
+   LeasedRecord has the interface of dwfrecord.AnalogInRecord, so a logger
+   can take its samples from the broker without other changes.
+   Usage: py ./SDK/dwfbroker.py [--serial SN ...] [--hz 10000] [--range 5]
+"""
+
+from collections import deque
+from ctypes import *
+import argparse
+import getpass
+import json
+import os
+import signal
+import socket
+import socketserver
+import struct
+import sys
+import tempfile
+import threading
+import time
+import numpy
+
+try:
+    from SDK.dwfbind import DwfError, dwf
+    from SDK.dwfconfig import device_config
+    from SDK.dwfdevices import enumerate_devices, open_by_serial
+    from SDK.dwfrecord import AnalogInRecord, RecordChunk, clip_chunk
+    from SDK.dwfstats import to_volts
+except ImportError:
+    from dwfbind import DwfError, dwf
+    from dwfconfig import device_config
+    from dwfdevices import enumerate_devices, open_by_serial
+    from dwfrecord import AnalogInRecord, RecordChunk, clip_chunk
+    from dwfstats import to_volts
+
+_lengths = struct.Struct("<II")
+
+secPoll = 0.005 # broker drain interval
+portDefault = 50515 # loopback TCP port where there are no Unix sockets
+
+if hasattr(socket, "AF_UNIX"):
+    _StreamServer = socketserver.UnixStreamServer
+else:
+    _StreamServer = socketserver.TCPServer
+
+
+def default_socket():
+    if _StreamServer is socketserver.TCPServer:
+        return os.environ.get("DWF_BROKER") or "127.0.0.1:" + str(portDefault)
+    return os.environ.get("DWF_BROKER") or os.path.join(tempfile.gettempdir(), "dwfbroker-" + getpass.getuser() + ".sock")
+
+
+def _address(path):
+    """Socket family and address of a broker path, "host:port" for TCP."""
+    if _StreamServer is socketserver.TCPServer:
+        host, _, port = path.rpartition(":")
+        return socket.AF_INET, (host or "127.0.0.1", int(port))
+    return socket.AF_UNIX, path
+
+
+def _no_delay(sock):
+    # a message is sent as header and payload, which must not wait for the ACK of the first
+    if sock.family == socket.AF_INET:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+
+class BrokerError(Exception):
+    """The broker refused a request; the message is its reason."""
+
+
+def send_message(sock, header, payload=b""):
+    text = json.dumps(header).encode("utf-8")
+    sock.sendall(_lengths.pack(len(text), len(payload)) + text)
+    if payload:
+        sock.sendall(payload)
+
+
+def _recv_exact(sock, cBytes):
+    buf = bytearray(cBytes)
+    view = memoryview(buf)
+    pos = 0
+    while pos < cBytes:
+        n = sock.recv_into(view[pos:])
+        if n == 0:
+            raise EOFError("broker connection closed")
+        pos += n
+    return buf
+
+
+def recv_message(sock):
+    """(header, payload) of the next message; EOFError when the peer is gone."""
+    cText, cPayload = _lengths.unpack(_recv_exact(sock, _lengths.size))
+    header = json.loads(_recv_exact(sock, cText))
+    return header, _recv_exact(sock, cPayload) if cPayload else b""
+
+
+def _config(hz, channels, ranges, offsets):
+    """Normalized acquisition settings, compared to tell whether a device needs setting up."""
+    channels = [int(channel) for channel in channels]
+    if not isinstance(ranges, (list, tuple)):
+        ranges = [ranges] * len(channels)
+    if not isinstance(offsets, (list, tuple)):
+        offsets = [offsets] * len(channels)
+    return {"hz": float(hz), "channels": channels,
+            "ranges": [float(r) for r in ranges], "offsets": [float(o) for o in offsets]}
+
+
+class _Instrument:
+    """One open device, its running record and the chunks of the last secBuffer."""
+
+    def __init__(self, serial, hdwf, secSettle, secBuffer):
+        self.serial = serial
+        self.hdwf = hdwf
+        self.secSettle = secSettle
+        self.secBuffer = secBuffer
+        self.lock = threading.Condition()
+        self.record = None
+        self.config = None
+        self.settings = None
+        self.tSettled = 0.0
+        self.deviceConfig = device_config(dwf, hdwf, serial, secSettle)
+        self.chunks = deque()
+        self.cBuffered = 0
+        self.lease = None
+        self.error = None
+        self.fStop = False
+        self.thread = threading.Thread(target=self._drain, name="DwfBroker " + serial, daemon=True)
+        self.thread.start()
+
+    def configure(self, config):
+        """Apply config unless it is running already; call with the lock held."""
+        if config == self.config and self.error is None:
+            return
+        if self.error is not None:
+            # what the device holds after a failure is unknown
+            self.deviceConfig.forget()
+        if self.record is not None:
+            self.record.stop()
+        record = AnalogInRecord(dwf, self.hdwf, config["hz"], config["channels"])
+        record.configure(self.deviceConfig)
+        for channel, volts, offset in zip(config["channels"], config["ranges"], config["offsets"]):
+            self.deviceConfig.channel(channel, range=volts, offset=offset)
+        record.start()
+        self.record = record
+        self.config = config
+        self.settings = record.settings
+        self.error = None
+        self.chunks.clear()
+        self.cBuffered = 0
+        # the offset needs 2 seconds after open or a range/offset change; a new rate does not
+        self.tSettled = self.deviceConfig.tChanged + self.secSettle
+
+    def _drain(self):
+        while True:
+            with self.lock:
+                if self.fStop:
+                    return
+                if self.record is not None and self.error is None:
+                    try:
+                        chunk = self.record.read()
+                    except DwfError as e:
+                        # unplugged; the next lease configures it again
+                        self.error = str(e)
+                        chunk = None
+                    if chunk is not None and (chunk.samples.shape[1] or chunk.cLost):
+                        self.chunks.append(chunk)
+                        self.cBuffered += chunk.samples.shape[1]
+                        cMax = self.secBuffer * self.record.hzAcq
+                        while len(self.chunks) > 1 and self.cBuffered - self.chunks[0].samples.shape[1] >= cMax:
+                            self.cBuffered -= self.chunks.popleft().samples.shape[1]
+                        self.lock.notify_all()
+            time.sleep(secPoll)
+
+    def read(self, iNext, secTimeout):
+        """Samples from hardware index iNext on, merged up to the first gap.
+
+        Returns a RecordChunk, with no samples when none arrived in secTimeout.
+        cLost also counts samples that dropped out of the buffer unread.
+        """
+        deadline = time.monotonic() + secTimeout
+        with self.lock:
+            while not self.chunks or self.record.iSample <= iNext:
+                if self.error is not None:
+                    raise BrokerError(self.error)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return RecordChunk(iNext, numpy.empty((len(self.config["channels"]), 0), dtype=numpy.int16), 0, 0)
+                self.lock.wait(remaining)
+
+            parts = []
+            cLost = 0
+            cCorrupted = 0
+            iFirst = None
+            for chunk in self.chunks:
+                if chunk.iFirst + chunk.samples.shape[1] <= iNext:
+                    continue
+                if parts and chunk.cLost:
+                    break
+                if not parts:
+                    # buffer overrun: what was trimmed before iNext is lost as well
+                    cLost = max(chunk.iFirst - chunk.cLost - iNext, 0)
+                    chunk = clip_chunk(chunk, iNext, chunk.iFirst + chunk.samples.shape[1])
+                    if chunk is None:
+                        continue
+                    cLost += chunk.cLost
+                    iFirst = chunk.iFirst
+                parts.append(chunk.samples)
+                cCorrupted += chunk.cCorrupted
+            samples = numpy.concatenate(parts, axis=1) if len(parts) > 1 else parts[0]
+            return RecordChunk(iFirst, samples, cLost, cCorrupted)
+
+    def close(self):
+        with self.lock:
+            self.fStop = True
+            if self.record is not None:
+                self.record.stop()
+        self.thread.join()
+        dwf.FDwfDeviceClose(self.hdwf)
+
+
+class Broker(socketserver.ThreadingMixIn, _StreamServer):
+    """Owns the instruments; one handler thread per connected client."""
+
+    daemon_threads = True
+
+    def __init__(self, path, instruments, config):
+        self.instruments = instruments
+        self.config = config
+        self.leaseLock = threading.Lock()
+        self.path = path
+        family, address = _address(path)
+        if family == socket.AF_INET:
+            # a second broker on the port fails to bind
+            _StreamServer.__init__(self, address, _Handler)
+        else:
+            if os.path.exists(path):
+                probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                try:
+                    probe.connect(path)
+                except OSError:
+                    os.unlink(path) # left over from a broker that was killed
+                else:
+                    raise OSError("a broker is already listening on " + path)
+                finally:
+                    probe.close()
+            umask = os.umask(0o077) # socket for this user only
+            try:
+                _StreamServer.__init__(self, path, _Handler)
+            finally:
+                os.umask(umask)
+        for instrument in instruments.values():
+            with instrument.lock:
+                instrument.configure(config)
+
+    def lease(self, client, serial):
+        with self.leaseLock:
+            if serial is not None:
+                instrument = self.instruments.get(serial)
+                if instrument is None:
+                    raise BrokerError("no device with serial number " + serial)
+                if instrument.lease is not None:
+                    raise BrokerError("device " + serial + " is leased")
+            else:
+                free = [instrument for instrument in self.instruments.values() if instrument.lease is None]
+                if not free:
+                    raise BrokerError("every device is leased")
+                instrument = free[0]
+            instrument.lease = client
+            return instrument
+
+    def release(self, instrument, client):
+        with self.leaseLock:
+            if instrument is not None and instrument.lease is client:
+                instrument.lease = None
+
+    def server_close(self):
+        _StreamServer.server_close(self)
+        for instrument in self.instruments.values():
+            instrument.close()
+        if self.address_family != socket.AF_INET and os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+class _Handler(socketserver.BaseRequestHandler):
+
+    def setup(self):
+        _no_delay(self.request)
+
+    def handle(self):
+        broker = self.server
+        instrument = None
+        iNext = 0
+        try:
+            while True:
+                try:
+                    request, _ = recv_message(self.request)
+                except EOFError:
+                    break
+                op = request.get("op")
+                try:
+                    if op == "lease":
+                        if instrument is not None:
+                            raise BrokerError("already holding " + instrument.serial)
+                        instrument = broker.lease(self, request.get("serial"))
+                        tRequest = time.monotonic()
+                        config = _config(request.get("hz", broker.config["hz"]),
+                                         request.get("channels", broker.config["channels"]),
+                                         request.get("ranges", broker.config["ranges"][0]),
+                                         request.get("offsets", broker.config["offsets"][0]))
+                        try:
+                            with instrument.lock:
+                                instrument.configure(config)
+                                tSettled = instrument.tSettled
+                        except DwfError:
+                            broker.release(instrument, self)
+                            instrument = None
+                            raise
+                        time.sleep(max(tSettled - time.monotonic(), 0))
+                        with instrument.lock:
+                            iNext = instrument.record.iSample
+                            reply = {"ok": True, "serial": instrument.serial, "hzAcq": instrument.record.hzAcq, "iStart": iNext,
+                                     "channels": config["channels"], "settings": instrument.settings,
+                                     "secReady": time.monotonic() - tRequest}
+                        send_message(self.request, reply)
+                    elif op == "read":
+                        if instrument is None:
+                            raise BrokerError("no device leased")
+                        chunk = instrument.read(iNext, float(request.get("secTimeout", 0)))
+                        samples = numpy.ascontiguousarray(chunk.samples, dtype=numpy.int16)
+                        iNext = chunk.iFirst + samples.shape[1]
+                        # a memoryview of a (channels x 0) array cannot be cast, an empty read sends no payload
+                        send_message(self.request, {"ok": True, "iFirst": chunk.iFirst, "cChannels": samples.shape[0],
+                                                    "cSamples": samples.shape[1], "cLost": chunk.cLost,
+                                                    "cCorrupted": chunk.cCorrupted}, samples.data.cast("B") if samples.size else b"")
+                    elif op == "start":
+                        if instrument is None:
+                            raise BrokerError("no device leased")
+                        # reads go on from now, like a record started at this moment
+                        with instrument.lock:
+                            iNext = instrument.record.iSample
+                        send_message(self.request, {"ok": True, "iStart": iNext})
+                    elif op == "release":
+                        broker.release(instrument, self)
+                        instrument = None
+                        send_message(self.request, {"ok": True})
+                    elif op == "status":
+                        devices = {}
+                        for serial, device in broker.instruments.items():
+                            devices[serial] = {"leased": device.lease is not None, "config": device.config,
+                                               "error": device.error, "secBuffered": device.cBuffered / device.record.hzAcq if device.record else 0}
+                        send_message(self.request, {"ok": True, "devices": devices})
+                    else:
+                        raise BrokerError("unknown request " + str(op))
+                except (BrokerError, DwfError) as e:
+                    send_message(self.request, {"ok": False, "error": str(e)})
+        except OSError:
+            pass # client went away mid-reply
+        finally:
+            broker.release(instrument, self)
+
+
+class BrokerClient:
+    """Connection to a running broker."""
+
+    def __init__(self, path=None):
+        self.path = path or default_socket()
+        family, address = _address(self.path)
+        self.sock = socket.socket(family, socket.SOCK_STREAM)
+        self.sock.connect(address)
+        _no_delay(self.sock)
+
+    def request(self, header):
+        send_message(self.sock, header)
+        reply, payload = recv_message(self.sock)
+        if not reply.get("ok"):
+            raise BrokerError(reply.get("error"))
+        return reply, payload
+
+    def lease(self, serial=None, hz=None, channels=None, ranges=None, offsets=None):
+        """Lease a device, the given one or any free one; returns a LeasedRecord."""
+        request = {"op": "lease", "serial": serial}
+        for key, value in (("hz", hz), ("channels", channels), ("ranges", ranges), ("offsets", offsets)):
+            if value is not None:
+                request[key] = list(value) if isinstance(value, tuple) else value
+        reply, _ = self.request(request)
+        return LeasedRecord(self, reply)
+
+    def status(self):
+        return self.request({"op": "status"})[0]["devices"]
+
+    def close(self):
+        self.sock.close()
+
+
+class LeasedRecord:
+    """AnalogInRecord look-alike fed by the broker.
+
+    Sample indexes count from start(), like a record started at that moment.
+    """
+
+    def __init__(self, client, reply):
+        self.client = client
+        self.serial = reply["serial"]
+        self.hzAcq = reply["hzAcq"]
+        self.channels = tuple(reply["channels"])
+        self.settings = reply["settings"]
+        self.secReady = reply["secReady"]
+        self.iBase = reply["iStart"]
+        self.iSample = 0
+        self.secTimeout = 0.0
+
+    def configure(self):
+        pass # done by the broker
+
+    def channel_settings(self):
+        return self.settings
+
+    def volts(self, samples):
+        return to_volts(samples, self.settings)
+
+    def start(self):
+        # the time between lease and start is not part of the record
+        self.iBase = self.client.request({"op": "start"})[0]["iStart"]
+        self.iSample = 0
+
+    def stop(self):
+        self.client.request({"op": "release"})
+
+    def read(self):
+        reply, payload = self.client.request({"op": "read", "secTimeout": self.secTimeout})
+        samples = numpy.frombuffer(payload, dtype=numpy.int16).reshape(reply["cChannels"], reply["cSamples"])
+        chunk = RecordChunk(reply["iFirst"] - self.iBase, samples, reply["cLost"], reply["cCorrupted"])
+        self.iSample = chunk.iFirst + samples.shape[1]
+        return chunk
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keep devices open and settled for client scripts")
+    parser.add_argument("--socket", default=default_socket(), help="Unix socket path or TCP host:port, default $DWF_BROKER or the temp directory")
+    parser.add_argument("--serial", action="append", help="device to hold, default every free one; repeat for more")
+    parser.add_argument("--hz", type=float, default=10000, help="sample rate kept running between leases")
+    parser.add_argument("--channel", type=int, action="append", help="AnalogIn channel kept running, default 0 and 1")
+    parser.add_argument("--range", type=float, default=5, help="channel range in volts")
+    parser.add_argument("--offset", type=float, default=0, help="channel offset in volts")
+    parser.add_argument("--settle", type=float, default=2, help="seconds for the offset to stabilize after a setting change")
+    parser.add_argument("--buffer", type=float, default=10, help="seconds of samples kept per device")
+    args = parser.parse_args()
+
+    serials = args.serial or [device.serial for device in enumerate_devices(dwf) if not device.fInUse]
+    if not serials:
+        print("no free device found")
+        sys.exit(1)
+
+    instruments = {}
+    for serial in serials:
+        instruments[serial] = _Instrument(serial, open_by_serial(dwf, serial), args.settle, args.buffer)
+        print("Holding device " + serial)
+
+    config = _config(args.hz, args.channel or (0, 1), args.range, args.offset)
+    broker = Broker(args.socket, instruments, config)
+    print("Broker listening on " + args.socket + ", press Ctrl+C to stop...")
+    # stop the same way on kill as on Ctrl+C
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        broker.serve_forever()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    broker.server_close()
+    dwf.FDwfDeviceCloseAll()
+
+
+if __name__ == "__main__":
+    main()
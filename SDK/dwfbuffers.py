@@ -0,0 +1,163 @@
+"""
+   DWFBuffers (reusable page-aligned chunk buffers)
+   Revision:  2026-10-18
+
+   Requires:
+       Python 3.11, numpy
+   Description:
+   Record loops read each chunk with FDwf*StatusData straight into a NumPy
+   array of the pool, through a c_void_p made once per buffer, and hand the
+   array slice to file.write()/writeframes(), which take it through the
+   buffer protocol. No ctypes array is created per chunk and no sample goes
+   through Python on the way to the file.
+   The buffers start on a page boundary, so the runtime's copy and the
+   kernel's write work on whole pages, and with count > 1 a buffer can be
+   written by another thread while the next chunk is read into the next one
+   (acquire blocks until one is released).
+   MappedCapture is the destination for captures that are kept whole: a
+   file sized up front and mapped, so the runtime writes the samples into
+   the page cache of the file. A multi-GB capture needs no RAM of its own,
+   and what was read before a crash of the process is in the file.
+   RingBuffer is the circular buffer of the triggered record examples. The
+   oldest sample sits at the write position, so views() gives the capture in
+   time order as two views without copying, and unwrap() rotates it in
+   place, needing only the smaller of the two parts as scratch memory.
+"""
+
+from collections import deque, namedtuple
+from ctypes import *
+import mmap
+import threading
+import numpy
+
+# array: the whole (cItems,) buffer; pointer: c_void_p of array[0] for the FDwf calls
+Buffer = namedtuple("Buffer", ("array", "pointer"))
+
+
+def aligned_empty(cItems, dtype, align=mmap.PAGESIZE):
+    """Uninitialized (cItems,) array whose first element starts on an align boundary."""
+    dtype = numpy.dtype(dtype)
+    raw = numpy.empty(cItems * dtype.itemsize + align, dtype=numpy.uint8)
+    offset = -raw.ctypes.data % align
+    # the view keeps raw alive
+    return raw[offset:offset + cItems * dtype.itemsize].view(dtype)
+
+
+class BufferPool:
+    """count page-aligned buffers of cItems dtype values, reused chunk after chunk."""
+
+    def __init__(self, cItems, dtype, count=1):
+        self.cItems = int(cItems)
+        self.dtype = numpy.dtype(dtype)
+        self.buffers = []
+        for _ in range(count):
+            array = aligned_empty(self.cItems, self.dtype)
+            self.buffers.append(Buffer(array, c_void_p(array.ctypes.data)))
+        self.free = deque(self.buffers)
+        self.cond = threading.Condition()
+
+    def acquire(self):
+        """A free Buffer; waits for release() when all are in use."""
+        with self.cond:
+            while not self.free:
+                self.cond.wait()
+            return self.free.popleft()
+
+    def release(self, buffer):
+        with self.cond:
+            self.free.append(buffer)
+            self.cond.notify()
+
+
+class MappedCapture:
+    """A file of cItems dtype values mapped as a NumPy array for FDwf*StatusData to fill.
+
+    close() cuts the file to the samples actually captured; after a crash it
+    keeps the full size with zeros past the last chunk.
+    """
+
+    def __init__(self, path, cItems, dtype):
+        self.path = path
+        self.dtype = numpy.dtype(dtype)
+        self.cItems = int(cItems)
+        self.file = open(path, "w+b")
+        self.file.truncate(self.cItems * self.dtype.itemsize)
+        self.map = mmap.mmap(self.file.fileno(), self.cItems * self.dtype.itemsize)
+        self.array = numpy.frombuffer(self.map, dtype=self.dtype)
+        self.address = self.array.ctypes.data
+
+    def pointer(self, iItem=0):
+        """c_void_p of array[iItem], where the next chunk is read to."""
+        return c_void_p(self.address + iItem * self.dtype.itemsize)
+
+    def flush(self):
+        """Write the dirty pages out, for captures that must also survive a power loss."""
+        self.map.flush()
+
+    def close(self, cItems=None):
+        """Unmap and cut the file to cItems values, default all of them.
+
+        Views taken from array must be dropped first, mmap refuses to close under them.
+        """
+        if self.map is None:
+            return
+        # the array must go before the map can be closed
+        self.array = None
+        self.map.close()
+        self.map = None
+        if cItems is not None and cItems < self.cItems:
+            self.file.truncate(cItems * self.dtype.itemsize)
+        self.file.close()
+
+
+class RingBuffer:
+    """(cChannels x cItems) circular buffer that a record fills chunk by chunk.
+
+    Read the next chunk of a row to pointer(row), at most cContiguous
+    samples, then advance() by the samples read; advance() over lost samples
+    as well, so the ring keeps the time order.
+    """
+
+    def __init__(self, cItems, dtype, cChannels=1):
+        self.cItems = int(cItems)
+        self.dtype = numpy.dtype(dtype)
+        self.array = aligned_empty(cChannels * self.cItems, self.dtype).reshape(cChannels, self.cItems)
+        self.array[:] = 0
+        self.iWrite = 0
+        self.addresses = [row.ctypes.data for row in self.array]
+
+    @property
+    def cContiguous(self):
+        """Samples that fit before the write position wraps."""
+        return self.cItems - self.iWrite
+
+    def pointer(self, row=0):
+        """c_void_p of the write position in row."""
+        return c_void_p(self.addresses[row] + self.iWrite * self.dtype.itemsize)
+
+    def advance(self, cSamples):
+        self.iWrite = (self.iWrite + cSamples) % self.cItems
+
+    def views(self):
+        """(older, newer) views of all rows, together the capture in time order."""
+        return self.array[:, self.iWrite:], self.array[:, :self.iWrite]
+
+    def unwrap(self):
+        """Rotate in place so the oldest sample comes first; returns array."""
+        k = self.iWrite
+        n = self.cItems
+        if k == 0:
+            return self.array
+        size = self.dtype.itemsize
+        for row, address in zip(self.array, self.addresses):
+            if k <= n - k:
+                # the newer part, row[:k], is the smaller one
+                scratch = row[:k].copy()
+                memmove(address, address + k * size, (n - k) * size)
+                row[n - k:] = scratch
+            else:
+                scratch = row[k:].copy()
+                memmove(address + (n - k) * size, address, k * size)
+                row[:n - k] = scratch
+        self.iWrite = 0
+        return self.array
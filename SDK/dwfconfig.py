@@ -0,0 +1,152 @@
+"""
+   DWFConfig (configuration-state cache)
+   Revision:  2026-10-18
+
+   Requires:
+       Python 3.11
+   Description:
+   Remembers the AnalogIn settings last applied to an open device, so setup
+   code can state the settings it wants and only the changed *Set calls are
+   made. Values the cache has not seen yet are read back from the device
+   first, so settings that are already in place, e.g. the defaults after
+   open, are skipped as well.
+   The input offset needs about 2 s to stabilize after device open and after
+   a range or offset change. settle() waits only for what is left of that
+   time, counted from the open or the last such change, instead of a fixed
+   sleep after every setup.
+   One DeviceConfig per serial number and open handle: device_config()
+   returns the same object until the device is opened again, which resets
+   its settings.
+"""
+
+from ctypes import *
+import math
+import time
+
+try:
+    from SDK.dwfbind import check
+except ImportError:
+    from dwfbind import check
+
+# name: (Set function, Get function, C type, needs settling)
+ANALOG_IN = {
+    "frequency": ("FDwfAnalogInFrequencySet", "FDwfAnalogInFrequencyGet", c_double, False),
+    "bufferSize": ("FDwfAnalogInBufferSizeSet", "FDwfAnalogInBufferSizeGet", c_int, False),
+    "acquisitionMode": ("FDwfAnalogInAcquisitionModeSet", "FDwfAnalogInAcquisitionModeGet", c_int, False),
+    "recordLength": ("FDwfAnalogInRecordLengthSet", "FDwfAnalogInRecordLengthGet", c_double, False),
+    "triggerSource": ("FDwfAnalogInTriggerSourceSet", "FDwfAnalogInTriggerSourceGet", c_ubyte, False),
+    "triggerPosition": ("FDwfAnalogInTriggerPositionSet", "FDwfAnalogInTriggerPositionGet", c_double, False),
+    "triggerAutoTimeout": ("FDwfAnalogInTriggerAutoTimeoutSet", "FDwfAnalogInTriggerAutoTimeoutGet", c_double, False),
+    "triggerType": ("FDwfAnalogInTriggerTypeSet", "FDwfAnalogInTriggerTypeGet", c_int, False),
+    "triggerChannel": ("FDwfAnalogInTriggerChannelSet", "FDwfAnalogInTriggerChannelGet", c_int, False),
+    "triggerLevel": ("FDwfAnalogInTriggerLevelSet", "FDwfAnalogInTriggerLevelGet", c_double, False),
+    "triggerHysteresis": ("FDwfAnalogInTriggerHysteresisSet", "FDwfAnalogInTriggerHysteresisGet", c_double, False),
+    "triggerCondition": ("FDwfAnalogInTriggerConditionSet", "FDwfAnalogInTriggerConditionGet", c_int, False),
+}
+
+ANALOG_IN_CHANNEL = {
+    "enable": ("FDwfAnalogInChannelEnableSet", "FDwfAnalogInChannelEnableGet", c_int, False),
+    "range": ("FDwfAnalogInChannelRangeSet", "FDwfAnalogInChannelRangeGet", c_double, True),
+    "offset": ("FDwfAnalogInChannelOffsetSet", "FDwfAnalogInChannelOffsetGet", c_double, True),
+    "attenuation": ("FDwfAnalogInChannelAttenuationSet", "FDwfAnalogInChannelAttenuationGet", c_double, False),
+    "filter": ("FDwfAnalogInChannelFilterSet", "FDwfAnalogInChannelFilterGet", c_int, False),
+}
+
+
+def _value(x):
+    x = x.value if hasattr(x, "value") else x
+    return int(x) if isinstance(x, bool) else x
+
+
+def _same(a, b):
+    if a is None or b is None:
+        return False
+    if isinstance(a, float) or isinstance(b, float):
+        return math.isclose(a, b, rel_tol=1e-6, abs_tol=1e-9)
+    return a == b
+
+
+class DeviceConfig:
+    """Last applied settings of one open device."""
+
+    def __init__(self, dwf, hdwf, serial=None, secSettle=2.0):
+        self.dwf = dwf
+        self.hdwf = hdwf
+        self.hdwfValue = _value(hdwf)
+        self.serial = serial
+        self.secSettle = secSettle
+        # (name, channel or None): (value asked for, value the device reported)
+        self.applied = {}
+        # the offset settles after device open as after a change
+        self.tChanged = time.monotonic()
+        self.cSet = 0
+        self.cSkipped = 0
+
+    def _read(self, fnGet, ctype, index):
+        fn = getattr(self.dwf, fnGet, None)
+        if fn is None:
+            # not in this runtime
+            return None
+        value = ctype()
+        args = (self.hdwf, c_int(index), byref(value)) if index is not None else (self.hdwf, byref(value))
+        if not fn(*args):
+            return None
+        return value.value
+
+    def _set(self, table, name, value, index=None):
+        fnSet, fnGet, ctype, fSettle = table[name]
+        value = _value(value)
+        key = (name, index)
+        entry = self.applied.get(key)
+        if entry is None:
+            entry = (None, self._read(fnGet, ctype, index))
+        requested, actual = entry
+        if _same(value, requested) or _same(value, actual):
+            self.cSkipped += 1
+            return False
+
+        fn = getattr(self.dwf, fnSet)
+        args = (self.hdwf, c_int(index), ctype(value)) if index is not None else (self.hdwf, ctype(value))
+        check(fn(*args), self.dwf)
+        self.cSet += 1
+        # the device rounds some settings; remember both so either matches next time
+        self.applied[key] = (value, self._read(fnGet, ctype, index))
+        if fSettle:
+            self.tChanged = time.monotonic()
+        return True
+
+    def analog_in(self, **settings):
+        """Apply instrument settings named as in ANALOG_IN; returns the names that changed."""
+        return [name for name, value in settings.items() if self._set(ANALOG_IN, name, value)]
+
+    def channel(self, index, **settings):
+        """Apply settings of one AnalogIn channel named as in ANALOG_IN_CHANNEL."""
+        return [name for name, value in settings.items() if self._set(ANALOG_IN_CHANNEL, name, value, index)]
+
+    def forget(self):
+        """Drop the cache, e.g. after FDwfAnalogInReset or an AnalogImpedance setup changed the inputs."""
+        self.applied.clear()
+
+    def secUnsettled(self, secSettle=None):
+        """Seconds left until the input offset has stabilized."""
+        secSettle = self.secSettle if secSettle is None else secSettle
+        return max(self.tChanged + secSettle - time.monotonic(), 0.0)
+
+    def settle(self, secSettle=None):
+        """Sleep until secSettle after device open or the last range/offset change."""
+        sec = self.secUnsettled(secSettle)
+        if sec > 0:
+            time.sleep(sec)
+        return sec
+
+
+_configs = {}
+
+
+def device_config(dwf, hdwf, serial=None, secSettle=2.0):
+    """The DeviceConfig of this device; a new one when it was opened again since."""
+    key = serial if serial is not None else ("hdwf", _value(hdwf))
+    config = _configs.get(key)
+    if config is None or config.hdwfValue != _value(hdwf) or config.dwf is not dwf:
+        config = _configs[key] = DeviceConfig(dwf, hdwf, serial, secSettle)
+    return config
@@ -0,0 +1,179 @@
+"""
+   DWFDevices (device enumeration and open by serial number)
+   Revision:  2026-10-18
+
+   Requires:
+       Python 3.11
+   Description:
+   Enumeration logic of Device_Enumeration.py / Device_Synchronization.py as
+   functions, so several devices can be told apart by serial number instead
+   of always opening the first one. WorkerSupervisor runs one acquisition
+   process per device, restarts the ones that exit and sums up the counters
+   they report.
+"""
+
+from collections import namedtuple
+from ctypes import *
+import json
+import subprocess
+import threading
+import time
+
+try:
+    from SDK.dwfbind import last_error_msg
+except ImportError:
+    from dwfbind import last_error_msg
+
+DeviceInfo = namedtuple("DeviceInfo", ("index", "name", "serial", "devId", "devRev", "fInUse"))
+
+
+def enumerate_devices(dwf):
+    """List every connected device."""
+    cDevice = c_int()
+    IsInUse = c_bool()
+    iDevId = c_int()
+    iDevRev = c_int()
+    devicename = create_string_buffer(64)
+    serialnum = create_string_buffer(16)
+
+    dwf.FDwfEnum(c_int(0), byref(cDevice))
+    devices = []
+    for iDev in range(cDevice.value):
+        dwf.FDwfEnumDeviceName(c_int(iDev), devicename)
+        dwf.FDwfEnumSN(c_int(iDev), serialnum)
+        dwf.FDwfEnumDeviceType(c_int(iDev), byref(iDevId), byref(iDevRev))
+        dwf.FDwfEnumDeviceIsOpened(c_int(iDev), byref(IsInUse))
+        devices.append(DeviceInfo(iDev, devicename.value.decode(), serialnum.value.decode(),
+                                  iDevId.value, iDevRev.value, IsInUse.value))
+    return devices
+
+
+def open_by_serial(dwf, serial, iConfig=None):
+    """Open the device with the given serial number and return its handle.
+
+    Raises LookupError when no such device is connected and OSError when it
+    cannot be opened, e.g. because another process holds it.
+    """
+    for device in enumerate_devices(dwf):
+        if device.serial == serial:
+            break
+    else:
+        raise LookupError("no device with serial number " + serial)
+
+    hdwf = c_int()
+    if iConfig is None:
+        dwf.FDwfDeviceOpen(c_int(device.index), byref(hdwf))
+    else:
+        dwf.FDwfDeviceConfigOpen(c_int(device.index), c_int(iConfig), byref(hdwf))
+    if hdwf.value == 0:
+        raise OSError("failed to open device " + serial + ": " + last_error_msg(dwf))
+    return hdwf
+
+
+COUNTERS = ("cSamples", "cLost", "cCorrupted")
+
+
+def report(**fields):
+    """Worker side: send one status line to the supervisor."""
+    print(json.dumps(fields), flush=True)
+
+
+class _Worker:
+
+    def __init__(self, serial, argv):
+        self.serial = serial
+        self.argv = argv
+        self.process = None
+        self.reader = None
+        self.cRestarts = -1
+        self.tExit = None
+        self.base = dict.fromkeys(COUNTERS, 0)
+        self.last = dict.fromkeys(COUNTERS, 0)
+
+    def spawn(self):
+        self.process = subprocess.Popen(self.argv, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        self.reader = threading.Thread(target=self._read, args=(self.process,), daemon=True)
+        self.reader.start()
+        self.cRestarts += 1
+        self.tExit = None
+
+    def _read(self, process):
+        for line in process.stdout:
+            try:
+                status = json.loads(line)
+            except ValueError:
+                # plain prints of the worker go to the console
+                print(self.serial + ": " + line, end="")
+                continue
+            self.last = status
+
+    def reap(self):
+        """Fold the counters of an exited process into the totals."""
+        self.reader.join(1.0)
+        self.process.stdin.close()
+        for key in COUNTERS:
+            self.base[key] += self.last.get(key, 0)
+        self.last = dict.fromkeys(COUNTERS, 0)
+        self.tExit = time.monotonic()
+
+    def totals(self):
+        last = self.last
+        return {key: self.base[key] + last.get(key, 0) for key in COUNTERS}
+
+
+class WorkerSupervisor:
+    """Run and restart one worker process per serial number.
+
+    argv_for(serial) returns the command line of a worker. Workers send JSON
+    lines with cumulative cSamples, cLost and cCorrupted counters via report()
+    and stop when their stdin is closed. A worker that exits is started again
+    after secRestart seconds; its counters carry on in the totals.
+    """
+
+    def __init__(self, serials, argv_for, secRestart=5.0):
+        self.secRestart = secRestart
+        self.workers = [_Worker(serial, argv_for(serial)) for serial in serials]
+        self.tLast = time.monotonic()
+        self.cLast = {}
+        for worker in self.workers:
+            worker.spawn()
+
+    def poll(self):
+        """Restart exited workers and return the aggregate statistics."""
+        now = time.monotonic()
+        dt = max(now - self.tLast, 1e-9)
+        self.tLast = now
+
+        devices = {}
+        for worker in self.workers:
+            if worker.tExit is None and worker.process.poll() is not None:
+                print(worker.serial + ": worker exited with code " + str(worker.process.returncode))
+                worker.reap()
+            if worker.tExit is not None and now - worker.tExit >= self.secRestart:
+                print(worker.serial + ": restarting worker")
+                worker.spawn()
+
+            totals = worker.totals()
+            totals["hz"] = (totals["cSamples"] - self.cLast.get(worker.serial, 0)) / dt
+            totals["fAlive"] = worker.tExit is None
+            totals["cRestarts"] = worker.cRestarts
+            self.cLast[worker.serial] = totals["cSamples"]
+            devices[worker.serial] = totals
+
+        stats = {key: sum(device[key] for device in devices.values()) for key in COUNTERS + ("hz",)}
+        stats["cAlive"] = sum(device["fAlive"] for device in devices.values())
+        stats["devices"] = devices
+        return stats
+
+    def close(self, secTimeout=10.0):
+        """Ask every worker to stop and wait for them to close their files."""
+        for worker in self.workers:
+            if worker.process.poll() is None:
+                worker.process.stdin.close()
+        tEnd = time.monotonic() + secTimeout
+        for worker in self.workers:
+            try:
+                worker.process.wait(max(tEnd - time.monotonic(), 0))
+            except subprocess.TimeoutExpired:
+                worker.process.kill()
+                worker.process.wait()
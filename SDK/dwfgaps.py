@@ -0,0 +1,195 @@
+"""
+   DWFGaps (sidecar index of lost and corrupted samples)
+   Revision:  2026-10-18
+
+   Requires:
+       Python 3.11, numpy
+   Description:
+   FDwf*StatusRecord reports with every chunk how many samples were lost
+   before it and how many of it could be corrupted. GapWriter keeps that per
+   chunk in <data file>.gaps instead of one "samples were lost" flag, so an
+   analysis of a multi-hour record knows which samples to distrust.
+   GapIndex reads the sidecar back: query() lists the entries of a sample
+   range, mask() flags the bad samples and timeline() puts data on the
+   sample axis with the bad samples as NaN or interpolated, all vectorized.
+
+   File layout (little endian):
+       b"DWFGAPS1"     magic
+       uint32          length of the JSON header
+       JSON header     utf-8, space padded to a multiple of 8 bytes
+       entries         uint64 iFirst, uint32 cSamples, uint32 cLost,
+                       uint32 cCorrupted, uint32 reserved
+   iFirst is the sample index of the first sample of the chunk, counting
+   lost samples; the cLost samples before it are missing. The device
+   overwrites the oldest samples while a chunk is read out, so the first
+   cCorrupted samples of the chunk are the ones taken as corrupted.
+   "fFilled" in the header tells whether lost samples keep their place in
+   the data file (loops that add cLost to the write position) or the file
+   holds only the samples that arrived. Only chunks with lost or corrupted
+   samples get an entry; an entry cut short by a crash is ignored.
+"""
+
+import json
+import struct
+import numpy
+
+MAGIC = b"DWFGAPS1"
+
+_length = struct.Struct("<I")
+_entry = struct.Struct("<QIIII")
+
+GAP_DTYPE = numpy.dtype([("iFirst", "<u8"), ("cSamples", "<u4"), ("cLost", "<u4"),
+                         ("cCorrupted", "<u4"), ("reserved", "<u4")])
+
+
+def gap_path(path):
+    """Sidecar of a data file; a path already ending in .gaps is kept."""
+    return path if path.endswith(".gaps") else path + ".gaps"
+
+
+class GapWriter:
+    """Append the lost/corrupted counts of a record's chunks to path + ".gaps".
+
+    Every entry is flushed at once: gaps are rare, and the index has to be
+    complete up to the data that made it to disk before a crash.
+    """
+
+    def __init__(self, path, fFilled, hzSample=None, **extra):
+        self.path = gap_path(path)
+        self.cLost = 0
+        self.cCorrupted = 0
+        self.cEntries = 0
+        header = {"version": 1, "fFilled": bool(fFilled)}
+        if hzSample is not None:
+            header["hzSample"] = float(hzSample)
+        header.update(extra)
+
+        text = json.dumps(header).encode("utf-8")
+        text += b" " * (-len(text) % 8)
+        self.f = open(self.path, "wb")
+        self.f.write(MAGIC)
+        self.f.write(_length.pack(len(text)))
+        self.f.write(text)
+        self.f.flush()
+
+    def add(self, iFirst, cSamples, cLost, cCorrupted):
+        """Note one chunk at sample index iFirst; clean chunks are not stored."""
+        if not cLost and not cCorrupted:
+            return
+        self.f.write(_entry.pack(iFirst, cSamples, cLost, cCorrupted, 0))
+        self.f.flush()
+        self.cLost += cLost
+        self.cCorrupted += cCorrupted
+        self.cEntries += 1
+
+    def add_chunk(self, chunk):
+        """add() for a dwfrecord RecordChunk."""
+        self.add(chunk.iFirst, chunk.samples.shape[-1], chunk.cLost, chunk.cCorrupted)
+
+    def summary(self):
+        return "%d lost and %d corrupted samples in %d chunks, listed in %s" % (
+            self.cLost, self.cCorrupted, self.cEntries, self.path)
+
+    def close(self):
+        self.f.close()
+
+
+class GapIndex:
+    """Read access to the .gaps sidecar of a data file."""
+
+    def __init__(self, path):
+        self.path = gap_path(path)
+        with open(self.path, "rb") as f:
+            data = f.read()
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError(self.path + " is not a DWF gap index")
+        pos = len(MAGIC)
+        (cHeader,) = _length.unpack_from(data, pos)
+        pos += _length.size
+        self.header = json.loads(data[pos:pos + cHeader])
+        pos += cHeader
+        self.fFilled = self.header["fFilled"]
+        self.entries = numpy.frombuffer(data, GAP_DTYPE, (len(data) - pos) // GAP_DTYPE.itemsize, pos)
+
+        iFirst = self.entries["iFirst"].astype(numpy.int64)
+        cCorrupted = numpy.minimum(self.entries["cCorrupted"], self.entries["cSamples"]).astype(numpy.int64)
+        # [begin, end) of every run of bad samples: the lost ones, then the corrupted ones
+        self.begins = numpy.concatenate((iFirst - self.entries["cLost"], iFirst))
+        self.ends = numpy.concatenate((iFirst, iFirst + cCorrupted))
+        # position in a file without the lost samples where each entry's chunk starts
+        self.lostBefore = numpy.concatenate(([0], numpy.cumsum(self.entries["cLost"], dtype=numpy.int64)))
+        self.storedFirst = iFirst - self.lostBefore[1:]
+
+    @property
+    def cLost(self):
+        return int(self.entries["cLost"].sum())
+
+    @property
+    def cCorrupted(self):
+        return int(self.entries["cCorrupted"].sum())
+
+    def query(self, iBegin=0, iEnd=None):
+        """Entries with lost or corrupted samples in [iBegin, iEnd)."""
+        n = len(self.entries)
+        fHit = (self.ends[:n] > iBegin) | (self.ends[n:] > iBegin)
+        if iEnd is not None:
+            fHit &= self.begins[:n] < iEnd
+        return self.entries[fHit]
+
+    def bad_ranges(self, iBegin=0, iEnd=None):
+        """(begins, ends) of the merged runs of lost or corrupted samples in [iBegin, iEnd)."""
+        begins = numpy.maximum(self.begins, iBegin)
+        ends = self.ends if iEnd is None else numpy.minimum(self.ends, iEnd)
+        fRun = ends > begins
+        begins = begins[fRun]
+        ends = ends[fRun]
+        if not len(begins):
+            return begins, ends
+        order = numpy.argsort(begins, kind="stable")
+        begins = begins[order]
+        ends = ends[order]
+        # a run starts where a range begins after every earlier one has ended
+        fStart = numpy.concatenate(([True], begins[1:] > numpy.maximum.accumulate(ends)[:-1]))
+        iStart = numpy.flatnonzero(fStart)
+        return begins[iStart], numpy.maximum.reduceat(ends, iStart)
+
+    def mask(self, iBegin, iEnd):
+        """Bool array over samples [iBegin, iEnd), False where lost or corrupted."""
+        begins, ends = self.bad_ranges(iBegin, iEnd)
+        depth = numpy.zeros(iEnd - iBegin + 1, dtype=numpy.int8)
+        depth[begins - iBegin] = 1
+        depth[ends - iBegin] -= 1
+        return numpy.cumsum(depth[:-1], dtype=numpy.int8) == 0
+
+    def positions(self, cStored, iStored=0):
+        """Sample index of values iStored... of a data file that holds only the samples that arrived."""
+        stored = numpy.arange(iStored, iStored + cStored, dtype=numpy.int64)
+        return stored + self.lostBefore[numpy.searchsorted(self.storedFirst, stored, side="right")]
+
+    def timeline(self, data, iStored=0, fill="nan"):
+        """(iFirst, values) of data read from position iStored of the data file.
+
+        values is float64 on the sample axis from sample iFirst on, (n,) or
+        (channels x n) like data, with lost and corrupted samples set to NaN,
+        or with fill="interp" interpolated linearly from the good neighbours.
+        """
+        data = numpy.asarray(data)
+        if self.fFilled:
+            iFirst = iStored
+            values = data.astype(numpy.float64)
+        else:
+            samples = self.positions(data.shape[-1], iStored)
+            iFirst = int(samples[0]) if len(samples) else iStored
+            cSamples = int(samples[-1]) + 1 - iFirst if len(samples) else 0
+            values = numpy.full(data.shape[:-1] + (cSamples,), numpy.nan)
+            values[..., samples - iFirst] = data
+
+        fGood = self.mask(iFirst, iFirst + values.shape[-1])
+        values[..., ~fGood] = numpy.nan
+        if fill == "interp" and fGood.any() and not fGood.all():
+            x = numpy.arange(values.shape[-1])
+            for row in values.reshape(-1, values.shape[-1]):
+                row[~fGood] = numpy.interp(x[~fGood], x[fGood], row[fGood])
+        elif fill != "nan" and fill != "interp":
+            raise ValueError("unsupported fill: " + str(fill))
+        return iFirst, values
@@ -0,0 +1,419 @@
+"""
+   DWFProfile (per-call FDwf latency profiler)
+   Revision:  2026-10-18
+
+   Requires:
+       Python 3.11
+   Description:
+   Opt-in instrumentation of the libdwf calls, to tell whether lost samples
+   come from the device link, the status polls, the data copies or the disk.
+   Set DWF_PROFILE to a JSON path and dwfbind.py wraps dwf and api so that
+   every FDwf call is counted and timed:
+       count, total, max and a log2 latency histogram per function,
+       bytes copied by the Status*Data* functions,
+       the gaps between successive *StatusRecord polls,
+       the last DWF_PROFILE_RING (65536) calls in a ring buffer.
+   tick(name) times one loop iteration to the next on the same thread,
+   section(name) a block of host code such as a disk write; both may be
+   called from several threads and are no-ops while profiling is off.
+   Every DWF_PROFILE_INTERVAL (1) seconds a snapshot replaces the JSON file,
+   and at exit it is written once more with the ring buffer. Watch it live
+   with: py ./SDK/dwfprofile.py profile.json --watch
+   "{pid}" in the path is replaced by the process id, for the one-process-
+   per-device workers of log_multi_device.py.
+   Recording adds well under a microsecond per call (bench_dwf_calls.py
+   measures it), under 2% next to the tens of microseconds a status poll or
+   data transfer spends on the USB link.
+"""
+
+import argparse
+import atexit
+import itertools
+import json
+import operator
+import os
+import sys
+import threading
+import time
+
+_cBuckets = 64 # log2 nanosecond buckets, bucket k holds [2^(k-1), 2^k) ns
+
+# bytes written to the caller's buffer: (argument index, bytes per unit)
+_dataBytes = {
+    "FDwfAnalogInStatusData": (3, 8),
+    "FDwfAnalogInStatusData2": (4, 8),
+    "FDwfAnalogInStatusData16": (4, 2),
+    "FDwfDigitalInStatusData": (2, 1),
+    "FDwfDigitalInStatusData2": (3, 1),
+}
+
+
+def _count(arg):
+    """Element count of a data call, passed as a Python or NumPy int or a ctypes c_int.
+
+    Anything else counts as 0 bytes rather than failing the profiled call.
+    """
+    try:
+        return operator.index(getattr(arg, "value", arg))
+    except TypeError:
+        return 0
+
+
+class _Stat:
+    """Counters of one function, loop or section.
+
+    The wrappers update totals ([ns, max ns, bytes]) and histogram in place;
+    the count is the sum of the histogram.
+    """
+
+    __slots__ = ("name", "totals", "histogram")
+
+    def __init__(self, name):
+        self.name = name
+        self.totals = [0, 0, 0]
+        self.histogram = [0] * _cBuckets
+
+    def add(self, ns):
+        self.histogram[ns.bit_length()] += 1
+        totals = self.totals
+        totals[0] += ns
+        if ns > totals[1]:
+            totals[1] = ns
+
+    def percentile(self, q, count):
+        """Upper bound of the bucket holding the q-th percentile, in ns."""
+        target = count * q / 100
+        cSeen = 0
+        for k, c in enumerate(self.histogram):
+            cSeen += c
+            if c and cSeen >= target:
+                return 1 << k
+        return 0
+
+    def summary(self):
+        ns, nsMax, cBytes = self.totals
+        count = sum(self.histogram)
+        return {
+            "count": count,
+            "usTotal": ns / 1e3,
+            "usMean": ns / count / 1e3 if count else None,
+            "usP50": self.percentile(50, count) / 1e3,
+            "usP99": self.percentile(99, count) / 1e3,
+            "usMax": nsMax / 1e3,
+            "bytes": cBytes,
+            # "<2^k ns": calls, non-empty buckets only
+            "histogram": {"<%dns" % (1 << k): c for k, c in enumerate(self.histogram) if c},
+        }
+
+
+class _Section:
+
+    __slots__ = ("stat", "record", "lock", "t")
+
+    def __init__(self, stat, record, lock):
+        self.stat = stat
+        self.record = record
+        self.lock = lock
+
+    def __enter__(self):
+        self.t = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        t = self.t
+        ns = time.perf_counter_ns() - t
+        with self.lock:
+            self.stat.add(ns)
+            self.record(t, self.stat.name, ns, 0)
+
+
+class Profiler:
+    """Statistics and ring buffer shared by every wrapped library handle."""
+
+    def __init__(self, path=None, cRing=65536, secInterval=1.0):
+        self.path = path
+        # a power of two, so the ring index is a mask
+        self.cRing = 1 << max(int(cRing) - 1, 1).bit_length()
+        self.stats = {}
+        self.gaps = {}
+        self.loops = {}
+        self.tStart = time.perf_counter_ns()
+        self.wallStart = time.time()
+        # one (start ns, name, duration ns, bytes) per call; pos[0] counts the calls
+        self.entries = [None] * self.cRing
+        self.pos = [0]
+        # (name, thread id): last tick
+        self.ticks = {}
+        self.lock = threading.Lock()
+        # tick() and section() run on the logger threads too, e.g. a writer or a broker client
+        self.lockStats = threading.Lock()
+        self.fStop = threading.Event()
+        self.thread = None
+        if path and secInterval > 0:
+            self.thread = threading.Thread(target=self._snapshots, args=(secInterval,), name="DwfProfile", daemon=True)
+            self.thread.start()
+        if path:
+            atexit.register(self.close)
+
+    @classmethod
+    def from_environment(cls):
+        return cls(os.environ["DWF_PROFILE"].replace("{pid}", str(os.getpid())),
+                   int(os.environ.get("DWF_PROFILE_RING", 65536)),
+                   float(os.environ.get("DWF_PROFILE_INTERVAL", 1.0)))
+
+    def stat(self, name):
+        stat = self.stats.get(name)
+        if stat is None:
+            with self.lockStats:
+                stat = self.stats.get(name)
+                if stat is None:
+                    stat = self.stats[name] = _Stat(name)
+        return stat
+
+    def record(self, t, name, ns, cBytes):
+        pos = self.pos
+        i = pos[0]
+        pos[0] = i + 1
+        self.entries[i & (self.cRing - 1)] = (t, name, ns, cBytes)
+
+    def wrap(self, lib):
+        return ProfiledLibrary(lib, self)
+
+    def function(self, name, fn):
+        """fn timed into this profiler.
+
+        The wrappers are written out per kind of function with everything in
+        locals, which keeps the overhead to a few hundred ns per call.
+        """
+        stat = self.stat(name)
+        totals = stat.totals
+        histogram = stat.histogram
+        perf = time.perf_counter_ns
+        entries = self.entries
+        pos = self.pos
+        mask = self.cRing - 1
+        dataBytes = _dataBytes.get(name)
+        if dataBytes is not None:
+            iArg, cbUnit = dataBytes
+
+            def call(*args):
+                t = perf()
+                rc = fn(*args)
+                ns = perf() - t
+                histogram[ns.bit_length()] += 1
+                totals[0] += ns
+                if ns > totals[1]:
+                    totals[1] = ns
+                count = args[iArg]
+                if count.__class__ is not int:
+                    count = _count(count)
+                cBytes = count * cbUnit
+                totals[2] += cBytes
+                i = pos[0]
+                pos[0] = i + 1
+                entries[i & mask] = (t, name, ns, cBytes)
+                return rc
+
+        elif name.endswith("StatusRecord"):
+            gap = self.gaps[name] = _Stat(name)
+            gapTotals = gap.totals
+            gapHistogram = gap.histogram
+            last = [0]
+
+            def call(*args):
+                t = perf()
+                rc = fn(*args)
+                ns = perf() - t
+                histogram[ns.bit_length()] += 1
+                totals[0] += ns
+                if ns > totals[1]:
+                    totals[1] = ns
+                if last[0]:
+                    nsGap = t - last[0]
+                    gapHistogram[nsGap.bit_length()] += 1
+                    gapTotals[0] += nsGap
+                    if nsGap > gapTotals[1]:
+                        gapTotals[1] = nsGap
+                last[0] = t
+                i = pos[0]
+                pos[0] = i + 1
+                entries[i & mask] = (t, name, ns, 0)
+                return rc
+
+        else:
+
+            def call(*args):
+                t = perf()
+                rc = fn(*args)
+                ns = perf() - t
+                histogram[ns.bit_length()] += 1
+                totals[0] += ns
+                if ns > totals[1]:
+                    totals[1] = ns
+                i = pos[0]
+                pos[0] = i + 1
+                entries[i & mask] = (t, name, ns, 0)
+                return rc
+
+        call.__name__ = name
+        return call
+
+    def tick(self, name="loop"):
+        """Time from the previous tick of name on this thread, e.g. once per acquisition loop.
+
+        Loops of the same name on several threads add to one histogram.
+        """
+        t = time.perf_counter_ns()
+        key = (name, threading.get_ident())
+        with self.lockStats:
+            last = self.ticks.get(key)
+            self.ticks[key] = t
+            if last is not None:
+                stat = self.loops.get(name)
+                if stat is None:
+                    stat = self.loops[name] = _Stat(name)
+                stat.add(t - last)
+                self.record(last, name, t - last, 0)
+
+    def section(self, name):
+        """Context manager timing a block, e.g. a file write."""
+        return _Section(self.stat(name), self.record, self.lockStats)
+
+    def ring(self):
+        """Ring buffer contents, oldest first: [us since start, name, us, bytes]."""
+        cCalls = self.pos[0]
+        iEnd = cCalls & (self.cRing - 1)
+        order = range(cCalls) if cCalls <= self.cRing else itertools.chain(range(iEnd, self.cRing), range(iEnd))
+        entries = [self.entries[i] for i in order]
+        return [[(t - self.tStart) / 1e3, name, ns / 1e3, cBytes] for t, name, ns, cBytes in entries if t]
+
+    def snapshot(self, fRing=False):
+        secElapsed = (time.perf_counter_ns() - self.tStart) / 1e9
+        report = {
+            "pid": os.getpid(),
+            "argv": sys.argv,
+            "tStart": self.wallStart,
+            "secElapsed": secElapsed,
+            "cCalls": self.pos[0],
+            "calls": {name: stat.summary() for name, stat in list(self.stats.items())},
+            "gaps": {name: stat.summary() for name, stat in list(self.gaps.items())},
+            "loops": {name: stat.summary() for name, stat in list(self.loops.items())},
+        }
+        if fRing:
+            report["ring"] = self.ring()
+        return report
+
+    def dump(self, path=None, fRing=True):
+        """Write a snapshot as JSON, replacing path in one step."""
+        path = path or self.path
+        with self.lock:
+            report = self.snapshot(fRing)
+            with open(path + ".tmp", "w") as f:
+                json.dump(report, f, indent=1)
+            os.replace(path + ".tmp", path)
+
+    def _snapshots(self, secInterval):
+        while not self.fStop.wait(secInterval):
+            try:
+                self.dump(fRing=False)
+            except OSError:
+                pass
+
+    def close(self):
+        self.fStop.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        if self.path:
+            self.dump()
+
+
+class ProfiledLibrary:
+    """Stands in for a dwf handle; FDwf functions are looked up once and timed."""
+
+    def __init__(self, lib, profiler):
+        self.wrapped = lib
+        self.profiler = profiler
+        self._name = getattr(lib, "_name", None)
+
+    def __getattr__(self, name):
+        fn = getattr(self.wrapped, name)
+        if name.startswith("FDwf"):
+            fn = self.profiler.function(name, fn)
+            # cached on the instance, later lookups skip __getattr__
+            setattr(self, name, fn)
+        return fn
+
+
+profiler = None
+
+
+def tick(name="loop"):
+    if profiler is not None:
+        profiler.tick(name)
+
+
+class _NoSection:
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+_noSection = _NoSection()
+
+
+def section(name):
+    if profiler is not None:
+        return profiler.section(name)
+    return _noSection
+
+
+def enable(lib):
+    """Profile lib when DWF_PROFILE is set, else return it unchanged."""
+    global profiler
+    if not os.environ.get("DWF_PROFILE"):
+        return lib
+    if profiler is None:
+        profiler = Profiler.from_environment()
+    return profiler.wrap(lib)
+
+
+def _table(report):
+    lines = [f"pid {report['pid']}  {' '.join(report['argv'])}  {report['secElapsed']:.1f} s"]
+    lines.append(f"{'call':<36} {'count':>10} {'% time':>7} {'mean us':>9} {'p50 us':>8} {'p99 us':>8} {'max us':>9} {'MB/s':>8}")
+    secElapsed = report["secElapsed"] or 1
+    for name, s in sorted(report["calls"].items(), key=lambda item: -item[1]["usTotal"]):
+        lines.append(f"{name:<36} {s['count']:>10} {s['usTotal']/1e4/secElapsed:>6.1f}% {s['usMean'] or 0:>9.1f} "
+                     f"{s['usP50']:>8.1f} {s['usP99']:>8.1f} {s['usMax']:>9.1f} {s['bytes']/1e6/secElapsed:>8.2f}")
+    for kind in ("gap", "loop"):
+        for name, s in report[kind + "s"].items():
+            lines.append(f"{kind + ' ' + name:<36} {s['count']:>10} {'':>7} {s['usMean'] or 0:>9.1f} "
+                         f"{s['usP50']:>8.1f} {s['usP99']:>8.1f} {s['usMax']:>9.1f}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show a DWF_PROFILE report.")
+    parser.add_argument("path")
+    parser.add_argument("--watch", action="store_true", help="redraw when the running script writes a new snapshot")
+    args = parser.parse_args()
+    try:
+        while True:
+            try:
+                with open(args.path) as f:
+                    report = json.load(f)
+            except (OSError, ValueError) as e:
+                text = str(e)
+            else:
+                text = _table(report)
+            if not args.watch:
+                print(text)
+                break
+            sys.stdout.write("\x1b[H\x1b[2J" + text + "\n")
+            sys.stdout.flush()
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
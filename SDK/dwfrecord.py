@@ -0,0 +1,539 @@
+"""
+   DWFRecord (continuous record-mode streaming)
+   Revision:  2026-10-18
+
+   Requires:
+       Python 3.11, numpy
+   Description:
+   Runs the AnalogIn instrument in acqmodeRecord with an infinite record length,
+   drains it with FDwfAnalogInStatusRecord and hands out hardware-clocked chunks
+   tagged with their sample index and lost/corrupted counts. Samples stay
+   the int16 ADC codes of FDwfAnalogInStatusData16 from the device to the
+   file; volts() scales them with the channel settings read at start().
+   ChannelFetch reads all channels of a chunk into one (channels x samples)
+   block, which read() and the loggers hand on as a whole.
+   Decimator reduces the stream to a lower log rate in software.
+   DigitalInRecord does the same for DigitalIn, also in sync mode where the
+   SPI spy samples on clock edges, AnalogOutPlay streams arrays to the
+   Wavegen channels and I2cSpy drains the I2C spy. Each has start(), read()
+   for one poll and stop(), so dwfasync.py can drive any of them.
+"""
+
+from collections import namedtuple
+from ctypes import *
+import numpy
+
+try:
+    from SDK.dwfconstants import *
+    from SDK.dwfstats import channel_stats, to_volts
+    from SDK.dwfprofile import tick
+    from SDK.dwfbuffers import aligned_empty
+except ImportError:
+    from dwfconstants import *
+    from dwfstats import channel_stats, to_volts
+    from dwfprofile import tick
+    from dwfbuffers import aligned_empty
+
+# iFirst: hardware sample index of samples[:, 0], counting lost samples
+# samples: (channels x cAvailable) int16 ADC codes of AnalogIn, uint8/16/32 words of DigitalIn
+RecordChunk = namedtuple("RecordChunk", ("iFirst", "samples", "cLost", "cCorrupted"))
+
+_stateWaiting = (DwfStateConfig.value, DwfStatePrefill.value, DwfStateArmed.value)
+
+
+def _bind():
+    """Import check and prototyped once an instrument is made.
+
+    dwfbind loads libdwf, or the simulator, on import; Decimator, clip_chunk
+    and the other helpers here work without either.
+    """
+    global check, prototyped
+    try:
+        from SDK.dwfbind import check, prototyped
+    except ImportError:
+        from dwfbind import check, prototyped
+
+
+def channel_settings(dwf, hdwf, channels):
+    """Read back range, offset and attenuation of AnalogIn channels, the scale of their codes."""
+    settings = []
+    value = c_double()
+    for channel in channels:
+        setting = {"index": channel}
+        for key, fn in (("range", dwf.FDwfAnalogInChannelRangeGet),
+                        ("offset", dwf.FDwfAnalogInChannelOffsetGet),
+                        ("attenuation", dwf.FDwfAnalogInChannelAttenuationGet)):
+            fn(hdwf, c_int(channel), byref(value))
+            setting[key] = value.value
+        settings.append(setting)
+    return settings
+
+
+class ChannelFetch:
+    """Read the samples of several AnalogIn channels into one (channels x samples) block.
+
+    The runtime hands out one channel per FDwfAnalogInStatusData* call, so
+    there is still a call per channel, but all of them write into a block
+    preallocated for cMax samples: a chunk of cSamples fills its first
+    channels*cSamples values row after row, and fetch() returns it as one
+    C-contiguous (channels x cSamples) view, valid until the next fetch().
+    int16 reads ADC codes with FDwfAnalogInStatusData16, float64 volts with
+    FDwfAnalogInStatusData2.
+    """
+
+    def __init__(self, dwf, hdwf, channels, cMax, dtype=numpy.int16):
+        self.dwf = dwf
+        self.hdwf = hdwf
+        self.channels = tuple(channels)
+        self.cMax = int(cMax)
+        self.dtype = numpy.dtype(dtype)
+        if self.dtype == numpy.int16:
+            self.fn = dwf.FDwfAnalogInStatusData16
+        elif self.dtype == numpy.float64:
+            self.fn = dwf.FDwfAnalogInStatusData2
+        else:
+            raise ValueError("unsupported fetch dtype: " + str(self.dtype))
+        self.array = aligned_empty(len(self.channels) * self.cMax, self.dtype)
+
+    def fetch(self, cSamples, iFirst=0, out=None):
+        """Read samples iFirst... of the last status of every channel.
+
+        out defaults to the block of this fetch; any (channels x n) array of
+        the fetch dtype with contiguous rows, n >= cSamples, can take the
+        samples instead, e.g. ring.array[:, ring.iWrite:] of a RingBuffer or a
+        fresh array that outlives the next fetch. Returns out[:, :cSamples].
+        """
+        if out is None:
+            if cSamples > self.cMax:
+                raise ValueError("fetch of %d samples, block holds %d" % (cSamples, self.cMax))
+            out = self.array[:len(self.channels) * cSamples].reshape(len(self.channels), cSamples)
+        elif out.dtype != self.dtype or out.shape[0] != len(self.channels) or out.shape[1] < cSamples \
+                or (cSamples > 1 and out.strides[1] != self.dtype.itemsize):
+            raise ValueError("out must be (%d x >= %d) %s with contiguous rows" % (len(self.channels), cSamples, self.dtype))
+        if cSamples:
+            fn = self.fn
+            hdwf = self.hdwf
+            address = out.ctypes.data
+            stride = out.strides[0]
+            for row, channel in enumerate(self.channels):
+                fn(hdwf, channel, c_void_p(address + row * stride), iFirst, cSamples)
+        return out[:, :cSamples]
+
+
+def place_trigger(dwf, hdwf, config, cSamples):
+    """Place the trigger of a single acquisition before the last cSamples of its buffer.
+
+    The buffer holds at least 16 samples, so a capture of a few samples is
+    longer than asked for. The trigger position counts from the middle of
+    the buffer; it is set so that the samples from the returned index on all
+    follow the trigger. config is the DeviceConfig of the device.
+    """
+    cBuffer = c_int()
+    hzAcq = c_double()
+    dwf.FDwfAnalogInBufferSizeGet(hdwf, byref(cBuffer))
+    dwf.FDwfAnalogInFrequencyGet(hdwf, byref(hzAcq))
+    iFirst = max(cBuffer.value - cSamples, 0)
+    config.analog_in(triggerPosition=(cBuffer.value // 2 - iFirst) / hzAcq.value)
+    return iFirst
+
+
+def trigger_tick(dwf, hdwf):
+    """Device clock tick of the last AnalogIn trigger, and the ticks per second.
+
+    FDwfAnalogInStatusTime tells the trigger in UTC seconds plus ticks; the
+    ticks counted from the epoch are a hardware index, which a SampleClock
+    of the tick rate turns into host time like a sample index.
+    """
+    secUtc = c_uint()
+    cTick = c_uint()
+    hzTick = c_uint()
+    dwf.FDwfAnalogInStatusTime(hdwf, byref(secUtc), byref(cTick), byref(hzTick))
+    return secUtc.value * hzTick.value + cTick.value, hzTick.value
+
+
+class AnalogInRecord:
+    """Continuous record-mode acquisition on one or more AnalogIn channels.
+
+    With fReuse, every chunk is read into the same preallocated ChannelFetch
+    block and its samples are a view valid until the next read(), for loops
+    that are done with a chunk before reading the next one (Decimator and
+    SegmentCapture copy what they keep). Otherwise each chunk gets its own
+    array, as the broker and dwfasync queue chunks.
+    """
+
+    def __init__(self, dwf, hdwf, hzAcq, channels=(0, 1), fReuse=False):
+        _bind()
+        self.dwf = dwf
+        self.hdwf = hdwf
+        self.hzAcq = float(hzAcq)
+        self.channels = tuple(channels)
+        self.fReuse = fReuse
+        self.sts = c_ubyte()
+        self.cAvailable = c_int()
+        self.cLost = c_int()
+        self.cCorrupted = c_int()
+        self.iSample = 0
+        self.fRunning = False
+        self.settings = None
+
+        # out-parameters of the poll loop are made once
+        self.api = prototyped(dwf)
+        self._pSts = byref(self.sts)
+        self._pAvailable = byref(self.cAvailable)
+        self._pLost = byref(self.cLost)
+        self._pCorrupted = byref(self.cCorrupted)
+
+        cMin = c_int()
+        cMax = c_int()
+        dwf.FDwfAnalogInBufferSizeInfo(hdwf, byref(cMin), byref(cMax))
+        # the device can never report more than its own buffer in one status
+        self.cBuffer = cMax.value if cMax.value > 0 else 16384
+        self.fetch = ChannelFetch(dwf, hdwf, self.channels, self.cBuffer)
+
+    def configure(self, config=None):
+        """Set up record mode; with a DeviceConfig (dwfconfig.py) only changed settings are sent."""
+        api = self.api
+        hdwf = self.hdwf
+        if config is not None:
+            for channel in self.channels:
+                config.channel(channel, enable=1)
+            # -1 infinite record length
+            config.analog_in(acquisitionMode=acqmodeRecord, frequency=self.hzAcq, recordLength=-1.0)
+        else:
+            for channel in self.channels:
+                check(api.FDwfAnalogInChannelEnableSet(hdwf, channel, 1), api)
+            check(api.FDwfAnalogInAcquisitionModeSet(hdwf, acqmodeRecord.value), api)
+            check(api.FDwfAnalogInFrequencySet(hdwf, self.hzAcq), api)
+            check(api.FDwfAnalogInRecordLengthSet(hdwf, -1), api) # -1 infinite record length
+
+        # the device rounds the rate to a divider of its system clock
+        hzReal = c_double()
+        api.FDwfAnalogInFrequencyGet(hdwf, byref(hzReal))
+        if hzReal.value > 0:
+            self.hzAcq = hzReal.value
+
+    def channel_settings(self):
+        """Read back range, offset and attenuation of every recorded channel."""
+        return channel_settings(self.dwf, self.hdwf, self.channels)
+
+    def volts(self, samples):
+        """samples, e.g. of a RecordChunk, scaled to volts with the settings of this record."""
+        return to_volts(samples, self.settings)
+
+    def start(self):
+        self.iSample = 0
+        self.fRunning = False
+        # range and offset can be set after configure(), the codes are scaled by what runs
+        self.settings = self.channel_settings()
+        self.dwf.FDwfAnalogInConfigure(self.hdwf, c_int(0), c_int(1))
+
+    def stop(self):
+        self.dwf.FDwfAnalogInConfigure(self.hdwf, c_int(0), c_int(0))
+
+    def read(self):
+        """Poll the device once; return a RecordChunk, or None before the record starts.
+
+        Raises DwfError when the device stops answering, e.g. after it was unplugged.
+        """
+        # plain handle: every argument is a ready object or a Python int, which
+        # ctypes passes as C int without the per-argument argtypes conversion
+        dwf = self.dwf
+        hdwf = self.hdwf
+        tick("AnalogInRecord.read")
+        check(dwf.FDwfAnalogInStatus(hdwf, 1, self._pSts), dwf)
+        if not self.fRunning:
+            if self.sts.value in _stateWaiting:
+                # Acquisition not yet started.
+                return None
+            self.fRunning = True
+
+        dwf.FDwfAnalogInStatusRecord(hdwf, self._pAvailable, self._pLost, self._pCorrupted)
+
+        cLost = self.cLost.value
+        cAvailable = min(self.cAvailable.value, self.cBuffer)
+        self.iSample += cLost
+
+        if self.fReuse:
+            samples = self.fetch.fetch(cAvailable)
+        else:
+            samples = self.fetch.fetch(cAvailable, out=numpy.empty((len(self.channels), cAvailable), dtype=numpy.int16))
+
+        chunk = RecordChunk(self.iSample, samples, cLost, self.cCorrupted.value)
+        self.iSample += cAvailable
+        return chunk
+
+
+class DigitalInRecord:
+    """Continuous record-mode DigitalIn acquisition.
+
+    Chunks hold (1 x cAvailable) sample words of cBits bits. With hzAcq None
+    the instrument runs in sync mode: a sample is taken on every edge
+    selected by the trigger detector masks (low, high, rise, fall), the way
+    the SPI spy samples on clock and chip-select edges.
+    """
+
+    def __init__(self, dwf, hdwf, hzAcq=None, cBits=16, detector=(0, 0, 0, 0)):
+        _bind()
+        self.dwf = dwf
+        self.hdwf = hdwf
+        self.hzAcq = float(hzAcq) if hzAcq else None
+        self.cBits = cBits
+        self.dtype = {8: numpy.uint8, 16: numpy.uint16, 32: numpy.uint32}[cBits]
+        self.detector = detector
+        self.sts = c_ubyte()
+        self.cAvailable = c_int()
+        self.cLost = c_int()
+        self.cCorrupted = c_int()
+        self.iSample = 0
+        self.fRunning = False
+
+        self._pSts = byref(self.sts)
+        self._pAvailable = byref(self.cAvailable)
+        self._pLost = byref(self.cLost)
+        self._pCorrupted = byref(self.cCorrupted)
+
+        cMax = c_int()
+        dwf.FDwfDigitalInBufferSizeInfo(hdwf, byref(cMax))
+        self.cBuffer = cMax.value if cMax.value > 0 else 4096
+
+    def configure(self):
+        dwf = self.dwf
+        hdwf = self.hdwf
+        check(dwf.FDwfDigitalInAcquisitionModeSet(hdwf, acqmodeRecord), dwf)
+        if self.hzAcq is None:
+            # sync mode, sampled on the detector edges
+            check(dwf.FDwfDigitalInDividerSet(hdwf, c_int(-1)), dwf)
+            dwf.FDwfDigitalInTriggerSet(hdwf, *(c_int(mask) for mask in self.detector))
+        else:
+            hzInternal = c_double()
+            dwf.FDwfDigitalInInternalClockInfo(hdwf, byref(hzInternal))
+            divider = max(int(round(hzInternal.value / self.hzAcq)), 1)
+            check(dwf.FDwfDigitalInDividerSet(hdwf, c_int(divider)), dwf)
+            self.hzAcq = hzInternal.value / divider
+        check(dwf.FDwfDigitalInSampleFormatSet(hdwf, c_int(self.cBits)), dwf)
+        # -1 record until stopped
+        dwf.FDwfDigitalInTriggerPositionSet(hdwf, c_int(-1))
+        dwf.FDwfDigitalInTriggerSourceSet(hdwf, trigsrcNone)
+
+    def start(self):
+        self.iSample = 0
+        self.fRunning = False
+        self.dwf.FDwfDigitalInConfigure(self.hdwf, c_int(0), c_int(1))
+
+    def stop(self):
+        self.dwf.FDwfDigitalInConfigure(self.hdwf, c_int(0), c_int(0))
+
+    def read(self):
+        """Poll the device once; return a RecordChunk, or None before the record starts."""
+        dwf = self.dwf
+        hdwf = self.hdwf
+        check(dwf.FDwfDigitalInStatus(hdwf, 1, self._pSts), dwf)
+        if not self.fRunning:
+            if self.sts.value in _stateWaiting:
+                return None
+            self.fRunning = True
+
+        dwf.FDwfDigitalInStatusRecord(hdwf, self._pAvailable, self._pLost, self._pCorrupted)
+
+        cLost = self.cLost.value
+        cAvailable = min(self.cAvailable.value, self.cBuffer)
+        self.iSample += cLost
+
+        samples = numpy.empty((1, cAvailable), dtype=self.dtype)
+        if cAvailable:
+            # the count is in bytes
+            dwf.FDwfDigitalInStatusData(hdwf, samples.ctypes.data_as(c_void_p), samples.nbytes)
+
+        chunk = RecordChunk(self.iSample, samples, cLost, self.cCorrupted.value)
+        self.iSample += cAvailable
+        return chunk
+
+
+# iPlay: samples handed to the device per channel; cFree: room left in its buffer
+PlayStatus = namedtuple("PlayStatus", ("iPlay", "cFree", "cLost", "cCorrupted", "fDone"))
+
+
+class AnalogOutPlay:
+    """Streams (channels x samples) values normalized to +/-1 to Wavegen channels in funcPlay mode."""
+
+    def __init__(self, dwf, hdwf, hz, data, channels=(0,), amplitude=1.0, offset=0.0):
+        _bind()
+        self.dwf = dwf
+        self.hdwf = hdwf
+        self.hz = float(hz)
+        self.data = numpy.ascontiguousarray(numpy.atleast_2d(data), dtype=numpy.float64)
+        self.channels = tuple(channels)
+        self.amplitude = amplitude
+        self.offset = offset
+        self.iPlay = 0
+        self.cBuffer = 0
+        self.sts = c_ubyte()
+        self.cFree = c_int()
+        self.cLost = c_int()
+        self.cCorrupted = c_int()
+        self._pSts = byref(self.sts)
+        self._pFree = byref(self.cFree)
+        self._pLost = byref(self.cLost)
+        self._pCorrupted = byref(self.cCorrupted)
+
+    def configure(self):
+        dwf = self.dwf
+        hdwf = self.hdwf
+        secLength = self.data.shape[1] / self.hz
+        for channel in self.channels:
+            check(dwf.FDwfAnalogOutNodeEnableSet(hdwf, c_int(channel), c_int(0), c_int(1)), dwf)
+            dwf.FDwfAnalogOutNodeFunctionSet(hdwf, c_int(channel), c_int(0), funcPlay)
+            dwf.FDwfAnalogOutRepeatSet(hdwf, c_int(channel), c_int(1))
+            dwf.FDwfAnalogOutRunSet(hdwf, c_int(channel), c_double(secLength))
+            dwf.FDwfAnalogOutNodeFrequencySet(hdwf, c_int(channel), c_int(0), c_double(self.hz))
+            dwf.FDwfAnalogOutNodeAmplitudeSet(hdwf, c_int(channel), c_int(0), c_double(self.amplitude))
+            dwf.FDwfAnalogOutNodeOffsetSet(hdwf, c_int(channel), c_int(0), c_double(self.offset))
+
+    def _data(self, row, cSamples):
+        return self.data[row, self.iPlay:].ctypes.data_as(POINTER(c_double)), c_int(cSamples)
+
+    def start(self):
+        """Prime the device buffers with the first chunk and start all channels together."""
+        dwf = self.dwf
+        hdwf = self.hdwf
+        cMin = c_int()
+        cMax = c_int()
+        dwf.FDwfAnalogOutNodeDataInfo(hdwf, c_int(self.channels[0]), c_int(0), byref(cMin), byref(cMax))
+        self.iPlay = 0
+        self.cBuffer = cMax.value
+        cSamples = min(cMax.value, self.data.shape[1])
+        for row, channel in enumerate(self.channels):
+            dwf.FDwfAnalogOutNodeDataSet(hdwf, c_int(channel), c_int(0), *self._data(row, cSamples))
+        self.iPlay = cSamples
+        for channel in self.channels:
+            check(dwf.FDwfAnalogOutConfigure(hdwf, c_int(channel), c_int(1)), dwf)
+
+    def stop(self):
+        for channel in self.channels:
+            self.dwf.FDwfAnalogOutConfigure(self.hdwf, c_int(channel), c_int(0))
+
+    def read(self):
+        """Poll the first channel once and top up every channel; return a PlayStatus.
+
+        fDone is set once the device has played everything, not when the last
+        data was handed over, so stop() after it does not cut the tail.
+        """
+        dwf = self.dwf
+        hdwf = self.hdwf
+        cSamples = self.data.shape[1]
+        check(dwf.FDwfAnalogOutStatus(hdwf, self.channels[0], self._pSts), dwf)
+        self.cFree.value = 0
+        self.cLost.value = 0
+        self.cCorrupted.value = 0
+        if self.sts.value == DwfStateRunning.value:
+            dwf.FDwfAnalogOutNodePlayStatus(hdwf, self.channels[0], 0, self._pFree, self._pLost, self._pCorrupted)
+            if self.iPlay >= cSamples:
+                # only the end of the data running out, not an underrun
+                self.cLost.value = 0
+            cFree = min(self.cFree.value, cSamples - self.iPlay)
+            if cFree > 0:
+                # the channels are started together, so they have the same room
+                for row, channel in enumerate(self.channels):
+                    check(dwf.FDwfAnalogOutNodePlayData(hdwf, channel, 0, *self._data(row, cFree)), dwf)
+                self.iPlay += cFree
+        fDrained = self.iPlay >= cSamples and self.cFree.value >= self.cBuffer
+        fDone = fDrained or self.sts.value == DwfStateDone.value
+        return PlayStatus(self.iPlay, self.cFree.value, self.cLost.value, self.cCorrupted.value, fDone)
+
+
+# fStart: 0 none, 1 start, 2 restart; data[0] is the address byte after a start
+# iNak: index + 1 of the NAK-ed byte, negative on a bus error
+I2cMessage = namedtuple("I2cMessage", ("fStart", "data", "fStop", "iNak"))
+
+
+class I2cSpy:
+    """The I2C spy of the protocol instrument; read() returns an I2cMessage or None."""
+
+    def __init__(self, dwf, hdwf, hzRate=1e5, pinScl=0, pinSda=1, cData=16):
+        _bind()
+        self.dwf = dwf
+        self.hdwf = hdwf
+        self.hzRate = hzRate
+        self.pinScl = pinScl
+        self.pinSda = pinSda
+        self.fStart = c_int()
+        self.fStop = c_int()
+        self.rgData = (c_ubyte*cData)()
+        self.cData = c_int()
+        self.iNak = c_int()
+        self._args = (byref(self.fStart), byref(self.fStop), byref(self.rgData), byref(self.cData), byref(self.iNak))
+
+    def configure(self):
+        dwf = self.dwf
+        check(dwf.FDwfDigitalI2cRateSet(self.hdwf, c_double(self.hzRate)), dwf)
+        dwf.FDwfDigitalI2cSclSet(self.hdwf, c_int(self.pinScl))
+        dwf.FDwfDigitalI2cSdaSet(self.hdwf, c_int(self.pinSda))
+
+    def start(self):
+        check(self.dwf.FDwfDigitalI2cSpyStart(self.hdwf), self.dwf)
+
+    def stop(self):
+        self.dwf.FDwfDigitalI2cReset(self.hdwf)
+
+    def read(self):
+        self.cData.value = len(self.rgData)
+        check(self.dwf.FDwfDigitalI2cSpyStatus(self.hdwf, *self._args), self.dwf)
+        if not (self.fStart.value or self.cData.value or self.fStop.value or self.iNak.value):
+            return None
+        data = numpy.frombuffer(self.rgData, dtype=numpy.uint8, count=self.cData.value).copy()
+        return I2cMessage(self.fStart.value, data, self.fStop.value, self.iNak.value)
+
+
+def clip_chunk(chunk, iBegin, iEnd):
+    """Restrict a RecordChunk to samples [iBegin, iEnd); None if nothing is left.
+
+    cLost keeps only the part of the preceding gap that falls inside the range.
+    """
+    cSamples = chunk.samples.shape[1]
+    lo = min(max(iBegin - chunk.iFirst, 0), cSamples)
+    hi = max(min(iEnd - chunk.iFirst, cSamples), lo)
+    gapFirst = chunk.iFirst - chunk.cLost
+    cLost = max(min(chunk.iFirst, iEnd) - max(gapFirst, iBegin), 0)
+    if lo == hi and not cLost:
+        return None
+    if lo == 0 and hi == cSamples:
+        return chunk._replace(cLost=cLost)
+    return RecordChunk(chunk.iFirst + lo, chunk.samples[:, lo:hi], cLost, chunk.cCorrupted if hi > lo else 0)
+
+
+class Decimator:
+    """Reduce a record stream to one ChannelStats row per `factor` samples.
+
+    Groups never straddle lost samples: a partial group before a gap is dropped
+    and grouping restarts after it, at the first sample on the grid of
+    `factor` samples from iOrigin, so (iFirst - iOrigin) // factor numbers
+    the rows without collisions or holes.
+    The stats are in the units of the samples, ADC codes for AnalogInRecord;
+    dwfstats.stats_to_volts scales the reduced rows.
+    """
+
+    def __init__(self, factor, cChannels, iOrigin=0):
+        self.factor = int(factor)
+        self.iOrigin = iOrigin
+        self.pending = numpy.empty((cChannels, 0))
+        self.iPending = 0
+
+    def push(self, chunk):
+        """Add a RecordChunk; return (iFirst, stats) with stats fields shaped (channels x rows)."""
+        if chunk.cLost or self.pending.shape[1] == 0:
+            # samples before the next grid point cannot fill a group
+            cSkip = (self.iOrigin - chunk.iFirst) % self.factor
+            self.pending = chunk.samples[:, cSkip:]
+            self.iPending = chunk.iFirst + cSkip
+        else:
+            self.pending = numpy.concatenate((self.pending, chunk.samples), axis=1)
+
+        cChannels, cPending = self.pending.shape
+        cRows = cPending // self.factor
+        cUsed = cRows * self.factor
+        stats = channel_stats(self.pending[:, :cUsed].reshape(cChannels, cRows, self.factor))
+
+        iFirst = self.iPending
+        self.pending = self.pending[:, cUsed:].copy()
+        self.iPending += cUsed
+        return iFirst, stats
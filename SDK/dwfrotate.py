@@ -0,0 +1,250 @@
+"""
+   DWFRotate (log rotation, background compression and segment manifest)
+   Revision:  2026-10-18
+
+   Requires:
+       Python 3.11, numpy
+   Description:
+   Splits long logs into segments by size, duration or logging window, closes
+   each segment atomically and hands it to a worker process that compresses it
+   with lzma or zlib. The worker appends every finished segment with its time
+   range to manifest.jsonl, so readers only open the segments a span needs.
+"""
+
+from datetime import datetime
+import json
+import lzma
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+import zlib
+
+try:
+    from SDK.dwfsession import SessionWriter, delta_encode
+except ImportError:
+    from dwfsession import SessionWriter, delta_encode
+
+MANIFEST = "manifest.jsonl"
+
+_suffixes = {"lzma": ".xz", "zlib": ".zz"}
+
+
+class RotationPolicy:
+    """Close the current segment once it holds maxBytes or has been open secMax seconds."""
+
+    def __init__(self, maxBytes=None, secMax=None):
+        self.maxBytes = maxBytes
+        self.secMax = secMax
+
+    def due(self, cBytes, secOpen):
+        return ((self.maxBytes is not None and cBytes >= self.maxBytes)
+                or (self.secMax is not None and secOpen >= self.secMax))
+
+
+def compress_segment(path, method="lzma"):
+    """Compress a closed segment next to itself and remove the original.
+
+    Session files are delta encoded first. Returns the compressed path.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if path.endswith(".dwfs"):
+        data = delta_encode(data)
+    if method == "lzma":
+        data = lzma.compress(data, preset=6)
+    elif method == "zlib":
+        data = zlib.compress(data, 9)
+    else:
+        raise ValueError("unsupported compression: " + str(method))
+
+    out = path + _suffixes[method]
+    with open(out + ".part", "wb") as f:
+        f.write(data)
+    os.replace(out + ".part", out)
+    os.remove(path)
+    return out
+
+
+def read_manifest(directory, tBegin=None, tEnd=None):
+    """Manifest entries of the segments overlapping [tBegin, tEnd), oldest first."""
+    entries = []
+    try:
+        with open(os.path.join(directory, MANIFEST)) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # last line cut short by a crash
+                    continue
+                if tBegin is not None and entry["tEnd"] <= tBegin:
+                    continue
+                if tEnd is not None and entry["tStart"] >= tEnd:
+                    continue
+                entries.append(entry)
+    except FileNotFoundError:
+        pass
+    entries.sort(key=lambda entry: entry["tStart"])
+    return entries
+
+
+def _append_manifest(directory, entry):
+    with open(os.path.join(directory, MANIFEST), "a") as f:
+        f.write(json.dumps(entry) + "\n")
+
+
+def _worker(directory, method):
+    """Worker process loop: one JSON line per closed segment on stdin."""
+    for line in sys.stdin:
+        item = json.loads(line)
+        path = item["path"]
+        try:
+            if method != "none":
+                path = compress_segment(path, method)
+        except Exception as e:
+            # e.g. a session cut short; it stays listed uncompressed and the worker goes on
+            print("compression of " + item["path"] + " failed: " + str(e), file=sys.stderr)
+        try:
+            cBytes = os.path.getsize(path)
+        except OSError:
+            cBytes = None
+        _append_manifest(directory, {
+            "file": os.path.basename(path),
+            "tStart": item["tStart"],
+            "tEnd": item["tEnd"],
+            "bytes": cBytes,
+        })
+
+
+class SegmentCompressor:
+    """Compress closed segments in a separate Python process.
+
+    The worker is a fresh interpreter running this module, not a
+    multiprocessing child, so the logger scripts are never re-imported.
+    method is "lzma", "zlib" or "none" (manifest only). The worker ignores
+    Ctrl+C, which reaches the whole console, and finishes what was submitted
+    once close() ends its input. submit() may be called from several threads.
+    """
+
+    def __init__(self, directory, method="lzma"):
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), directory, method],
+            stdin=subprocess.PIPE, text=True)
+
+    def submit(self, path, tStart, tEnd):
+        line = json.dumps({"path": path, "tStart": tStart, "tEnd": tEnd}) + "\n"
+        with self.lock:
+            self.process.stdin.write(line)
+            self.process.stdin.flush()
+
+    def close(self):
+        """Wait until every submitted segment is compressed and listed."""
+        with self.lock:
+            self.process.stdin.close()
+        self.process.wait()
+
+
+def _segment_path(directory, tStart, tz, suffix):
+    name = str(datetime.fromtimestamp(tStart, tz))[:19].replace(":", "_")
+    path = os.path.join(directory, name + suffix)
+    n = 1
+    while os.path.exists(path) or os.path.exists(path + ".part"):
+        # more than one segment started within the same second
+        path = os.path.join(directory, "%s.%d%s" % (name, n, suffix))
+        n += 1
+    return path
+
+
+class RotatingFile:
+    """Text file that rolls over to a new segment when its RotationPolicy is due.
+
+    The check runs in flush(), which BatchedWriter calls after every batch, so
+    segments always end on a row boundary. Segments are named like the
+    loggers' own files, "<local start time><suffix>", and are written as
+    .part files until closed.
+    """
+
+    def __init__(self, directory, suffix, policy, tz, compressor=None):
+        self.directory = directory
+        self.suffix = suffix
+        self.policy = policy
+        self.tz = tz
+        self.compressor = compressor
+        self.f = None
+        self._open()
+
+    def _open(self):
+        self.tStart = time.time()
+        self.tMono = time.monotonic()
+        self.path = _segment_path(self.directory, self.tStart, self.tz, self.suffix)
+        self.f = open(self.path + ".part", "w", newline="")
+        self.cBytes = 0
+
+    def _close(self):
+        self.f.close()
+        os.replace(self.path + ".part", self.path)
+        tEnd = self.tStart + (time.monotonic() - self.tMono)
+        if self.compressor is not None:
+            self.compressor.submit(self.path, self.tStart, tEnd)
+
+    def write(self, text):
+        self.cBytes += len(text)
+        return self.f.write(text)
+
+    def flush(self):
+        self.f.flush()
+        if self.policy.due(self.cBytes, time.monotonic() - self.tMono):
+            self._close()
+            self._open()
+
+    def close(self):
+        self._close()
+
+
+class RotatingSession:
+    """SessionWriter that rolls over to a new segment file when its policy is due.
+
+    Every segment keeps the same header, so sample indexes and times carry on
+    across segments.
+    """
+
+    def __init__(self, directory, suffix, header, policy, tz, compressor=None):
+        self.directory = directory
+        self.suffix = suffix
+        self.header = header
+        self.policy = policy
+        self.tz = tz
+        self.compressor = compressor
+        self.writer = None
+        self._open()
+
+    def _open(self):
+        iNext = 0 if self.writer is None else self.writer.iNext
+        self.tMono = time.monotonic()
+        self.writer = SessionWriter(_segment_path(self.directory, time.time(), self.tz, self.suffix), self.header)
+        self.writer.iNext = iNext
+
+    def _close(self):
+        self.writer.close()
+        tStart, tEnd = self.writer.time_range()
+        if self.compressor is not None:
+            self.compressor.submit(self.writer.path, tStart, tEnd)
+
+    def append(self, samples, iFirst=None):
+        self.writer.append(samples, iFirst)
+        if self.policy.due(self.writer.cBytes, time.monotonic() - self.tMono):
+            self._close()
+            self._open()
+
+    def close(self):
+        self._close()
+
+
+if __name__ == "__main__":
+    # Ctrl+C is for the logger, which closes its last segments and then close()s the worker
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _worker(sys.argv[1], sys.argv[2])
@@ -0,0 +1,139 @@
+"""
+   DWFSchedule (deadline-based logging window scheduler)
+   Revision:  2026-10-18
+
+   Requires:
+       Python 3.11
+   Description:
+   Computes logging windows from a cron-like spec and sleeps until their
+   start on the monotonic clock instead of polling the wall clock.
+"""
+
+from collections import namedtuple
+from datetime import datetime
+import time
+
+# tStart/tEnd are UTC epoch seconds; fLate is set when the window was already
+# running when it was scheduled and only its remainder is logged
+Window = namedtuple("Window", ("tStart", "tEnd", "fLate"))
+
+_fieldRanges = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 6))
+
+
+def _parse_field(text, lo, hi):
+    values = set()
+    for part in text.split(","):
+        part, _, step = part.partition("/")
+        if part == "*":
+            first, last = lo, hi
+        elif "-" in part:
+            first, last = (int(v) for v in part.split("-"))
+        else:
+            first = last = int(part)
+            if step:
+                last = hi
+        if first < lo or last > hi or first > last:
+            raise ValueError("cron field out of range: " + text)
+        values.update(range(first, last + 1, int(step) if step else 1))
+    return values
+
+
+class CronSpec:
+    """Five-field cron spec: minute hour day-of-month month day-of-week.
+
+    Fields accept *, lists, ranges and steps ("14,29,44,59 * * * *",
+    "*/15 8-17 * * 1-5"). Day of week 0 is Sunday; both day fields must match.
+    """
+
+    def __init__(self, spec, tz):
+        fields = spec.split()
+        if len(fields) != 5:
+            raise ValueError("cron spec needs 5 fields: " + spec)
+        self.spec = spec
+        self.tz = tz
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            _parse_field(field, lo, hi) for field, (lo, hi) in zip(fields, _fieldRanges))
+
+    def next_after(self, t):
+        """First matching minute strictly after UTC epoch time t."""
+        t = (int(t) // 60 + 1) * 60
+        tLimit = t + 366 * 86400
+        while t < tLimit:
+            local = datetime.fromtimestamp(t, self.tz)
+            if (local.month not in self.months or local.day not in self.days
+                    or (local.weekday() + 1) % 7 not in self.weekdays):
+                # jump to the next local midnight
+                t += ((23 - local.hour) * 60 + 60 - local.minute) * 60
+            elif local.hour not in self.hours:
+                t += (60 - local.minute) * 60
+            elif local.minute not in self.minutes:
+                t += 60
+            else:
+                return t
+        raise ValueError("cron spec never matches: " + self.spec)
+
+    def min_gap(self):
+        """Lower bound in seconds of the time between two consecutive matches.
+
+        Taken from the minutes of a day and the day-of-month and day-of-week
+        fields, so it holds for any month; a DST change can shorten it by an hour.
+        """
+        times = sorted(h * 60 + m for h in self.hours for m in self.minutes)
+        gaps = [b - a for a, b in zip(times, times[1:])]
+        # days between matching days: both day fields must match, so the larger bound holds
+        days = sorted(self.days)
+        dayGap = min([b - a for a, b in zip(days, days[1:])] + [days[0] + max(28, days[-1]) - days[-1]])
+        weekdays = sorted(self.weekdays)
+        weekdayGap = min([b - a for a, b in zip(weekdays, weekdays[1:])] + [weekdays[0] + 7 - weekdays[-1]])
+        gaps.append((max(dayGap, weekdayGap) - 1) * 1440 + 1440 - times[-1] + times[0])
+        return min(gaps) * 60
+
+
+class WindowScheduler:
+    """Hand out non-overlapping logging windows of secDuration from a CronSpec.
+
+    A window whose start has passed but whose end has not is caught up and
+    logged from now until its scheduled end, and never before the end of
+    the previous window, so no sample is logged twice.
+    Windows that ended before they could run are counted in cMissed.
+    A duration longer than the shortest time between two starts would cut
+    every window short, so it is rejected with ValueError.
+    """
+
+    def __init__(self, spec, secDuration, tz):
+        self.cron = CronSpec(spec, tz)
+        secGap = self.cron.min_gap()
+        if secDuration > secGap:
+            raise ValueError("window of %g s is longer than the %d s between starts of %s" % (secDuration, secGap, spec))
+        self.secDuration = secDuration
+        self.tLastStart = None
+        self.tLastEnd = None
+        self.cMissed = 0
+
+    def next_window(self, now=None):
+        now = time.time() if now is None else now
+        tFrom = now if self.tLastEnd is None else max(now, self.tLastEnd)
+        if self.tLastStart is None:
+            # search one duration back so a window already in progress is caught up
+            tSearch = tFrom - self.secDuration
+        else:
+            tSearch = self.tLastStart
+
+        tStart = self.cron.next_after(tSearch)
+        while tStart + self.secDuration <= tFrom:
+            self.cMissed += 1
+            tStart = self.cron.next_after(tStart)
+
+        window = Window(max(tStart, tFrom), tStart + self.secDuration, tStart < tFrom)
+        self.tLastStart = tStart
+        self.tLastEnd = window.tEnd
+        return window
+
+
+def sleep_until(t):
+    """Sleep until UTC epoch time t, measured as a monotonic deadline."""
+    deadline = time.monotonic() + (t - time.time())
+    remaining = deadline - time.monotonic()
+    while remaining > 0:
+        time.sleep(remaining)
+        remaining = deadline - time.monotonic()
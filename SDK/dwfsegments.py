@@ -0,0 +1,120 @@
+"""
+   DWFSegments (software-triggered segmented capture on record streams)
+   Revision:  2026-10-18
+
+   Requires:
+       Python 3.11, numpy
+   Description:
+   Finds trigger crossings with level, slope and hysteresis in the chunks of a
+   continuous record and cuts cPre pre-trigger and cPost post-trigger samples
+   around every event, tagged with the exact sample index of the crossing.
+"""
+
+import numpy
+
+# slope values match the trigger condition prompt of log_with_trigger.py
+slopeRise = 0
+slopeFall = 1
+slopeEither = 2
+
+
+def _schmitt(x, lo, hi, state):
+    """Forward-filled Schmitt state of x: +1 once x >= hi, -1 once x < lo.
+
+    state is the carried state before x[0] (0 when unknown); returns the
+    filled state per sample.
+    """
+    z = numpy.where(x >= hi, 1, numpy.where(x < lo, -1, 0)).astype(numpy.int8)
+    z = numpy.concatenate(([state], z))
+    idx = numpy.where(z != 0, numpy.arange(len(z)), 0)
+    numpy.maximum.accumulate(idx, out=idx)
+    return z[idx][1:]
+
+
+class SegmentCapture:
+    """Cut trigger-aligned segments out of RecordChunks from dwfrecord.
+
+    iChannel is the row of chunk.samples the trigger looks at. A rising
+    event needs the signal below level - hysteresis before it reaches level,
+    a falling event needs it above level + hysteresis before it drops to
+    level. Events that have no pre-trigger history or whose segment would
+    straddle lost samples are counted in cDropped.
+    level and hysteresis are in the units of the samples: for the ADC codes
+    of AnalogInRecord convert volts with dwfstats.to_codes. Segments keep the
+    dtype of the chunks.
+    """
+
+    def __init__(self, cChannels, iChannel, level, slope, hysteresis, cPre, cPost):
+        self.cChannels = cChannels
+        self.iChannel = iChannel
+        self.level = level
+        self.slope = slope
+        self.hysteresis = hysteresis
+        self.cPre = cPre
+        self.cPost = cPost
+        self.cDropped = 0
+        self._reset()
+
+    def _reset(self):
+        self.history = numpy.empty((self.cChannels, 0))
+        self.iHistory = None
+        self.pending = numpy.empty(0, dtype=numpy.int64)
+        self.stateRise = 0
+        self.stateFall = 0
+
+    def _detect(self, x, iFirst):
+        events = []
+        if self.slope in (slopeRise, slopeEither):
+            state = _schmitt(x, self.level - self.hysteresis, self.level, self.stateRise)
+            prev = numpy.concatenate(([self.stateRise], state[:-1]))
+            events.append(numpy.flatnonzero((prev == -1) & (state == 1)))
+            self.stateRise = state[-1]
+        if self.slope in (slopeFall, slopeEither):
+            # mirror the signal so a falling edge is a rising one
+            state = _schmitt(-x, -self.level - self.hysteresis, -self.level, self.stateFall)
+            prev = numpy.concatenate(([self.stateFall], state[:-1]))
+            events.append(numpy.flatnonzero((prev == -1) & (state == 1)))
+            self.stateFall = state[-1]
+        return numpy.unique(numpy.concatenate(events)) + iFirst
+
+    def push(self, chunk):
+        """Add a RecordChunk; return (iTrigger, segments) for every completed event.
+
+        segments has shape (events x channels x (cPre + cPost)); sample cPre of
+        each segment is the trigger sample iTrigger.
+        """
+        if chunk.cLost or self.iHistory is None:
+            self.cDropped += len(self.pending)
+            self._reset()
+            self.iHistory = chunk.iFirst
+
+        x = chunk.samples[self.iChannel]
+        if len(x):
+            # float, so mirroring the lowest int16 code cannot wrap around
+            events = self._detect(x.astype(numpy.float64), chunk.iFirst)
+            self.pending = numpy.concatenate((self.pending, events))
+            if self.history.shape[1]:
+                self.history = numpy.concatenate((self.history, chunk.samples), axis=1)
+            else:
+                self.history = chunk.samples
+
+        iEnd = self.iHistory + self.history.shape[1]
+        fEarly = self.pending - self.cPre < self.iHistory
+        self.cDropped += int(fEarly.sum())
+        self.pending = self.pending[~fEarly]
+
+        fDone = self.pending + self.cPost <= iEnd
+        iTrigger = self.pending[fDone]
+        self.pending = self.pending[~fDone]
+
+        idx = (iTrigger - self.cPre - self.iHistory)[:, None] + numpy.arange(self.cPre + self.cPost)
+        segments = self.history[:, idx].transpose(1, 0, 2)
+
+        # keep enough history for the pending events and the next chunk's pre-trigger samples
+        iKeep = iEnd - self.cPre
+        if len(self.pending):
+            iKeep = min(iKeep, int(self.pending.min()) - self.cPre)
+        iKeep = max(iKeep, self.iHistory)
+        self.history = self.history[:, iKeep - self.iHistory:].copy()
+        self.iHistory = iKeep
+        return iTrigger, segments
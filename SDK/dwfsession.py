@@ -0,0 +1,285 @@
+"""
+   DWFSession (chunked append-only binary session files)
+   Revision:  2026-10-18
+
+   Requires:
+       Python 3.11, numpy, pytz
+   Description:
+   Stores logged samples as fixed-width float32 or raw int16 columns behind a
+   JSON header, and exports any time range back to CSV.
+
+   File layout (little endian):
+       b"DWFSESS1"     magic
+       uint32          length of the JSON header
+       JSON header     utf-8, space padded to a multiple of 8 bytes
+       chunks          uint64 iFirst, uint32 cSamples, uint32 cChannels,
+                       then cChannels columns of cSamples values each
+   A chunk cut short by a crash is ignored by the reader. Files are written
+   as <path>.part and renamed when closed. Compressed copies (.dwfs.xz or
+   .dwfs.zz) store every column as integer deltas of its raw bit patterns.
+"""
+
+import csv
+import json
+import lzma
+import mmap
+import os
+import struct
+import time
+import zlib
+import numpy
+import pytz
+
+try:
+    from SDK.dwftime import LocalTimeFormatter
+    from SDK.dwfprofile import section
+    from SDK.dwfstats import to_volts
+except ImportError:
+    from dwftime import LocalTimeFormatter
+    from dwfprofile import section
+    from dwfstats import to_volts
+
+MAGIC = b"DWFSESS1"
+DTYPES = {"float32": numpy.dtype("<f4"), "int16": numpy.dtype("<i2")}
+
+_length = struct.Struct("<I")
+_chunkHeader = struct.Struct("<QII")
+
+# integer views used for delta encoding, same width as the stored dtype
+_deltaTypes = {"float32": numpy.dtype("<i4"), "int16": numpy.dtype("<i2")}
+
+
+def session_header(hzSample, channels, dtype="float32", tz="UTC", tStart=None, **extra):
+    """Build a session header.
+
+    channels is a list of dicts with at least "index", "range", "offset" and
+    "attenuation", e.g. from AnalogInRecord.channel_settings(). tStart is the
+    UTC epoch time of sample 0, tz the zone used when rendering times.
+    """
+    if dtype not in DTYPES:
+        raise ValueError("unsupported session dtype: " + str(dtype))
+    header = {
+        "version": 1,
+        "dtype": dtype,
+        "hzSample": float(hzSample),
+        "tStart": time.time() if tStart is None else float(tStart),
+        "tz": tz,
+        "channels": list(channels),
+    }
+    header.update(extra)
+    return header
+
+
+def _parse_header(buf):
+    """Return (header, offset of the first chunk) of a session image."""
+    if bytes(buf[:len(MAGIC)]) != MAGIC:
+        raise ValueError("not a DWF session file")
+    pos = len(MAGIC)
+    (cHeader,) = _length.unpack_from(buf, pos)
+    pos += _length.size
+    return json.loads(bytes(buf[pos:pos + cHeader])), pos + cHeader
+
+
+def _chunks(buf, pos, itemsize):
+    """Yield (iFirst, cSamples, cChannels, data offset) of every complete chunk."""
+    size = len(buf)
+    while pos + _chunkHeader.size <= size:
+        iFirst, cSamples, cChannels = _chunkHeader.unpack_from(buf, pos)
+        pos += _chunkHeader.size
+        end = pos + cSamples * cChannels * itemsize
+        if end > size:
+            return
+        yield iFirst, cSamples, cChannels, pos
+        pos = end
+
+
+def _delta(data, fEncode):
+    data = bytearray(data)
+    header, pos = _parse_header(data)
+    dtype = _deltaTypes[header["dtype"]]
+    for iFirst, cSamples, cChannels, offset in _chunks(data, pos, dtype.itemsize):
+        block = numpy.frombuffer(data, dtype, cSamples * cChannels, offset).reshape(cChannels, cSamples)
+        if fEncode:
+            block[:, 1:] = numpy.diff(block, axis=1)
+        else:
+            numpy.cumsum(block, axis=1, dtype=dtype, out=block)
+    return bytes(data)
+
+
+def delta_encode(data):
+    """Replace every column of a session image by integer deltas along the samples.
+
+    Slowly varying voltages turn into runs of small numbers that compress far
+    better; the integer arithmetic wraps, so delta_decode restores every bit.
+    """
+    return _delta(data, True)
+
+
+def delta_decode(data):
+    return _delta(data, False)
+
+
+def load_session(path):
+    """Session image of path, decompressing and undoing deltas for .xz/.zz files."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if path.endswith(".xz"):
+        return delta_decode(lzma.decompress(data))
+    if path.endswith(".zz"):
+        return delta_decode(zlib.decompress(data))
+    return data
+
+
+class SessionWriter:
+    """Append (channels x samples) chunks to a new session file.
+
+    Data goes to path + ".part" until close() renames it to path, so a
+    finished segment never shows up half written.
+    """
+
+    def __init__(self, path, header, cBuffer=1 << 20):
+        self.path = path
+        self.header = header
+        self.dtype = DTYPES[header["dtype"]]
+        self.cChannels = len(header["channels"])
+        self.iFirst = None
+        self.iNext = 0
+
+        text = json.dumps(header).encode("utf-8")
+        text += b" " * (-len(text) % 8)
+        self.f = open(path + ".part", "wb", buffering=cBuffer)
+        self.f.write(MAGIC)
+        self.f.write(_length.pack(len(text)))
+        self.f.write(text)
+        self.cBytes = len(MAGIC) + _length.size + len(text)
+
+    def append(self, samples, iFirst=None):
+        """Append one chunk; iFirst defaults to right after the previous chunk."""
+        samples = numpy.ascontiguousarray(samples, dtype=self.dtype)
+        if samples.ndim == 1:
+            samples = samples[None, :]
+        if samples.shape[0] != self.cChannels:
+            raise ValueError("expected %d channels, got %d" % (self.cChannels, samples.shape[0]))
+        if iFirst is None:
+            iFirst = self.iNext
+
+        cSamples = samples.shape[1]
+        if cSamples:
+            with section("SessionWriter.append"):
+                self.f.write(_chunkHeader.pack(iFirst, cSamples, self.cChannels))
+                self.f.write(samples.data)
+            self.cBytes += _chunkHeader.size + samples.nbytes
+            if self.iFirst is None:
+                self.iFirst = iFirst
+        self.iNext = iFirst + cSamples
+
+    def time_range(self):
+        """UTC epoch times of the first sample written and just after the last one."""
+        iFirst = self.iNext if self.iFirst is None else self.iFirst
+        hz = self.header["hzSample"]
+        return self.header["tStart"] + iFirst / hz, self.header["tStart"] + self.iNext / hz
+
+    def flush(self):
+        self.f.flush()
+
+    def close(self):
+        if not self.f.closed:
+            self.f.close()
+            os.replace(self.path + ".part", self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SessionReader:
+    """Memory-mapped read access to a session file.
+
+    Compressed .xz/.zz segments are decompressed into memory instead.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        if path.endswith((".xz", ".zz")):
+            self.f = None
+            self.mm = load_session(path)
+        else:
+            self.f = open(path, "rb")
+            self.mm = mmap.mmap(self.f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            self.header, pos = _parse_header(self.mm)
+        except ValueError:
+            self.close()
+            raise ValueError(path + " is not a DWF session file")
+
+        self.dtype = DTYPES[self.header["dtype"]]
+        self.hzSample = self.header["hzSample"]
+        self.tStart = self.header["tStart"]
+
+        # (iFirst, cSamples, cChannels, data offset) of every complete chunk
+        self.chunks = list(_chunks(self.mm, pos, self.dtype.itemsize))
+
+    def time_of(self, iSample):
+        """UTC epoch time of a sample index."""
+        return self.tStart + iSample / self.hzSample
+
+    def index_of(self, t):
+        """First sample index at or after UTC epoch time t."""
+        return int(numpy.ceil((t - self.tStart) * self.hzSample))
+
+    def read(self, iBegin=0, iEnd=None):
+        """Yield (iFirst, samples) views for every chunk overlapping [iBegin, iEnd).
+
+        samples are (channels x n) arrays backed by the file mapping, no copies.
+        """
+        for iFirst, cSamples, cChannels, offset in self.chunks:
+            iLast = iFirst + cSamples
+            if iLast <= iBegin or (iEnd is not None and iFirst >= iEnd):
+                continue
+            block = numpy.frombuffer(self.mm, self.dtype, cSamples * cChannels, offset).reshape(cChannels, cSamples)
+            lo = max(iBegin - iFirst, 0)
+            hi = cSamples if iEnd is None else min(iEnd - iFirst, cSamples)
+            yield iFirst + lo, block[:, lo:hi]
+
+    def close(self):
+        if self.f is not None:
+            self.mm.close()
+            self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def export_csv(reader, out, tBegin=None, tEnd=None, decimals=3, fTime=True, iOffset=0):
+    """Write the samples between UTC epoch times tBegin and tEnd as CSV rows.
+
+    Rows are [index, local time, ch...] like the loggers' own CSV files, with
+    the time column left out when fTime is False. iOffset is added to the
+    indexes, so several sessions can continue one numbering. Returns the
+    rows written.
+    """
+    format_time = LocalTimeFormatter(pytz.timezone(reader.header.get("tz", "UTC")))
+    channels = reader.header["channels"]
+    iBegin = 0 if tBegin is None else max(reader.index_of(tBegin), 0)
+    iEnd = None if tEnd is None else reader.index_of(tEnd)
+    writer = csv.writer(out)
+    cRows = 0
+
+    for iFirst, block in reader.read(iBegin, iEnd):
+        if reader.dtype.kind == "i":
+            block = to_volts(block, channels)
+        values = numpy.round(block.T.astype(numpy.float64), decimals).tolist()
+        for i, row in enumerate(values, iFirst):
+            prefix = [iOffset + i + 1]
+            if fTime:
+                prefix.append(format_time(reader.time_of(i)))
+            writer.writerow(prefix + row)
+        cRows += len(values)
+
+    return cRows
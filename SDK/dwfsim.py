@@ -0,0 +1,1491 @@
+"""
+   DWFSim (simulated WaveForms runtime)
+   Revision:  2026-10-18
+
+   Requires:
+       Python 3.11, numpy
+   Description:
+   Stands in for libdwf when DWF_BACKEND=sim is set, so the loggers and the
+   record/spy examples run without a device. It takes the same ctypes
+   arguments as the real library for device enumeration and open, AnalogIn
+   single and record acquisitions with analog or digital triggers, DigitalIn
+   single, record and sync captures, the AnalogOut / DigitalOut settings
+   that loop back into the inputs and AnalogOut play streaming. Other *Set, *Reset and *Configure calls are
+   accepted and ignored; anything else raises AttributeError like a function
+   missing from an old runtime.
+   Settings come from DWF_SIM, a JSON string or the path of a JSON file:
+       {"realtime": true, "chunk": 0, "seed": 0, "loopback": true,
+        "devices": [{"name": "Analog Discovery 2", "serial": "SIM000000001", "devId": 3}],
+        "analog": [{"func": "sine", "frequency": 1e3, "amplitude": 1, "offset": 0, "noise": 0.001}],
+        "digital": {"pattern": "auto", "hzSync": 1e6, "spiBytes": 4},
+        "lostEvery": 0, "lostCount": 0, "corruptedEvery": 0, "corruptedCount": 0,
+        "samplesMax": 0, "interrupt": false, "stats": ""}
+   With realtime false every status poll delivers chunk new samples (default
+   the device buffer) regardless of the wall clock, for benchmarks.
+   samplesMax ends every record after that many samples, like a replayed
+   capture running out; with interrupt the next status poll raises SIGINT, the
+   Ctrl+C of scripts that record until stopped. stats is a path the timing of
+   each acquisition is written to at exit, see bench_record_paths.py.
+   lostEvery / corruptedEvery inject lostCount / corruptedCount samples every
+   so many seconds of signal; a realtime record that is not drained fast
+   enough loses the overflow of its buffer like the device does.
+   Signal functions: dc, sine, square, triangle, rampup, rampdown, noise.
+   Digital patterns: auto (DigitalOut loopback while it runs, else counter),
+   counter, random, constant ("value"), spi (CS DIO 0, CLK 1, MOSI 2, MISO 3,
+   one sample per clock edge like DigitalIn_Spi_Spy.py's sync mode), replay
+   ("path" of a raw capture such as DigitalDiscovery_RecordToFile16.py's
+   record.bin, "bits" per sample, played in a loop).
+"""
+
+from ctypes import *
+from ctypes import _SimpleCData
+import atexit
+import json
+import math
+import os
+import signal
+import sys
+import time
+import numpy
+
+try:
+    import resource
+except ImportError:
+    # Windows
+    resource = None
+
+_stReady = 0
+_stArmed = 1
+_stDone = 2
+_stRunning = 3
+_stConfig = 4
+_stPrefill = 5
+
+_acqmodeSingle = 0
+_acqmodeRecord = 3
+_acqmodeSingle1 = 5
+
+_trigsrcNone = 0
+_trigsrcDetectorAnalogIn = 2
+_trigsrcDetectorDigitalIn = 3
+
+_slopeRise = 0
+_slopeFall = 1
+
+_ercUnknown = 1
+_ercAlreadyOpened = 3
+_ercNotSupported = 4
+_ercInvalidParameter = 0x10
+
+_cSearch = 1 << 20 # trigger search block
+_cSearchMax = 1 << 24 # samples searched per status poll at most
+_cBlock = 1 << 22 # samples generated at once
+
+# device id: (AnalogIn channels, DigitalIn bits, digital clock,
+#             buffer sizes (AnalogIn, AnalogOut, DigitalIn, DigitalOut) per device configuration)
+_models = {
+    2: (2, 16, 100e6, ((8192, 4096, 4096, 1024), (16384, 1024, 1024, 1024), (2048, 16384, 1024, 1024), (512, 256, 16384, 256))),
+    3: (2, 16, 100e6, ((8192, 4096, 4096, 1024), (16384, 1024, 1024, 1024), (2048, 16384, 1024, 1024), (512, 256, 16384, 256))),
+    4: (0, 32, 800e6, ((0, 0, 1 << 28, 32768),)),
+}
+_hzAnalogClock = 100e6
+
+_defaultDevice = {"name": "Analog Discovery 2", "serial": "SIM000000001", "devId": 3, "devRev": 1}
+_defaultAnalog = (
+    {"func": "sine", "frequency": 1e3, "amplitude": 1.0, "offset": 0.0, "noise": 0.001},
+    {"func": "dc", "offset": 1.2, "noise": 0.002},
+)
+_funcs = {0: "dc", 1: "sine", 2: "square", 3: "triangle", 4: "rampup", 5: "rampdown", 6: "noise"}
+
+
+def _val(x):
+    """Python value of a ctypes scalar argument or of a plain int/float."""
+    return x.value if isinstance(x, _SimpleCData) else x
+
+
+def _addr(p):
+    """Address behind a byref(), pointer, array, buffer or plain int."""
+    return cast(p, c_void_p).value
+
+
+def _put(p, ctype, value):
+    ctype.from_address(_addr(p)).value = value
+
+
+def _view(p, dtype, count):
+    dtype = numpy.dtype(dtype)
+    return numpy.frombuffer((c_char * (count * dtype.itemsize)).from_address(_addr(p)), dtype)
+
+
+def _put_text(p, text, size):
+    data = text.encode()[:size - 1] + b"\0"
+    memmove(_addr(p), data, len(data))
+
+
+def _waveform(func, t, frequency=1e3, amplitude=1.0, offset=0.0, phase=0.0, rng=None):
+    x = frequency * t + phase / 360.0
+    if func == "dc":
+        return numpy.full(len(t), float(offset))
+    elif func == "sine":
+        w = numpy.sin(2 * math.pi * x)
+    elif func == "square":
+        w = numpy.where(x % 1 < 0.5, 1.0, -1.0)
+    elif func == "triangle":
+        w = 1 - 4 * numpy.abs((x + 0.25) % 1 - 0.5)
+    elif func == "rampup":
+        w = 2 * (x % 1) - 1
+    elif func == "rampdown":
+        w = 1 - 2 * (x % 1)
+    elif func == "noise":
+        w = rng.uniform(-1, 1, len(t))
+    else:
+        raise ValueError("unknown signal function: " + str(func))
+    return offset + amplitude * w
+
+
+def _edge(x, lo, hi, fArmed):
+    """First index where x reaches hi after having been below lo.
+
+    Returns (index or None, fArmed for the next block).
+    """
+    if fArmed:
+        iArm = 0
+    else:
+        below = numpy.flatnonzero(x < lo)
+        if not len(below):
+            return None, False
+        iArm = below[0]
+    above = numpy.flatnonzero(x[iArm:] >= hi)
+    if len(above):
+        return iArm + above[0], False
+    return None, True
+
+
+def _faults(iBegin, iEnd, hz, secEvery, count):
+    """Samples to inject for every secEvery seconds boundary in [iBegin, iEnd)."""
+    if not secEvery or not count:
+        return 0
+    period = max(int(secEvery * hz), 1)
+    return (iEnd // period - iBegin // period) * count
+
+
+def _peak_rss():
+    """Peak resident set size of this process in bytes, None where unknown."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+class _Stats:
+    """Host-side timing of one acquisition.
+
+    Clocks start at the Configure call that starts it, so device open and the
+    scripts' settling sleeps are left out. The time the simulator spends
+    making samples is kept apart in secBackend / cpuBackend and is not part
+    of the time between chunks.
+    """
+
+    def __init__(self, name, acquisition):
+        self.name = name
+        self.mode = acquisition.mode
+        self.hz = acquisition.hz()
+        self.tStart = time.perf_counter()
+        self.cpuStart = time.process_time()
+        self.tLast = self.tStart
+        self.cpuLast = self.cpuStart
+        self.cPolls = 0
+        self.cSamples = 0
+        self.cLost = 0
+        self.cCorrupted = 0
+        self.secBackend = 0.0
+        self.cpuBackend = 0.0
+        self.secBackendChunk = 0.0
+        self.rgsecChunk = []
+        self.rss = None
+
+    def poll(self, sec, cpu):
+        self.cPolls += 1
+        self.secBackend += sec
+        self.cpuBackend += cpu
+        self.secBackendChunk += sec
+
+    def chunk(self, cAvailable, cLost, cCorrupted):
+        t = time.perf_counter()
+        self.rgsecChunk.append(t - self.tLast - self.secBackendChunk)
+        self.secBackendChunk = 0.0
+        self.tLast = t
+        self.cpuLast = time.process_time()
+        self.cSamples += cAvailable
+        self.cLost += cLost
+        self.cCorrupted += cCorrupted
+        self.rss = _peak_rss()
+
+    def summary(self):
+        sec = numpy.array(self.rgsecChunk)
+        return {
+            "name": self.name,
+            "mode": self.mode,
+            "hz": self.hz,
+            "cPolls": self.cPolls,
+            "cChunks": len(sec),
+            "cSamples": self.cSamples,
+            "cLost": self.cLost,
+            "cCorrupted": self.cCorrupted,
+            "secWall": self.tLast - self.tStart,
+            "secCpu": self.cpuLast - self.cpuStart,
+            "secBackend": self.secBackend,
+            "cpuBackend": self.cpuBackend,
+            "secChunk": {
+                "mean": float(sec.mean()) if len(sec) else None,
+                "p50": float(numpy.percentile(sec, 50)) if len(sec) else None,
+                "p99": float(numpy.percentile(sec, 99)) if len(sec) else None,
+                "max": float(sec.max()) if len(sec) else None,
+            },
+            "peakRss": self.rss,
+        }
+
+
+class _Acquisition:
+    """Sample production, triggering and status shared by AnalogIn and DigitalIn."""
+
+    def __init__(self, sim, cBuffer):
+        self.sim = sim
+        self.cBufferMax = cBuffer
+        self.state = _stReady
+        self.data = None
+        self._reset()
+
+    def _reset(self):
+        self.cBuffer = self.cBufferMax
+        self.mode = _acqmodeSingle
+        self.trigsrc = _trigsrcNone
+        self.secAutoTimeout = 0.0
+        self.state = _stReady
+        self.cAvailable = 0
+        self.cLost = 0
+        self.cCorrupted = 0
+        self.iProduced = 0
+        self.iArm = 0
+        self.iTrigger = None
+        self.iDataTrigger = None
+        self.tUtc = time.time()
+        self.fAuto = False
+        self.trigState = (False, False)
+        self.stats = None
+
+    def start(self):
+        self.t0 = time.perf_counter()
+        self.iProduced = 0
+        self.iArm = 0
+        self.iSearched = 0
+        self.iTrigger = None
+        self.iDataTrigger = None
+        self.tUtc = time.time()
+        self.fAuto = False
+        self.trigState = (False, False)
+        self.cAvailable = 0
+        self.cLost = 0
+        self.cCorrupted = 0
+        self.data = None
+        self.state = _stPrefill if self.mode != _acqmodeRecord else _stArmed
+        self.stats = self.sim.stats_start(self)
+
+    def stop(self):
+        self.state = _stReady
+
+    def _rearm(self):
+        """Start the next acquisition of acqmodeSingle, as the device does once Done was read.
+
+        Sample indexes go on counting; the new prefill starts now, not where
+        the last acquisition ended. The last data stays readable.
+        """
+        self.iArm = self._limit() if self.sim.realtime else self.iProduced
+        self.iProduced = self.iArm
+        self.iSearched = self.iArm
+        self.iTrigger = None
+        self.fAuto = False
+        self.trigState = (False, False)
+        self.cAvailable = 0
+        self.state = _stPrefill
+
+    def _limit(self):
+        """Samples the device has acquired by now."""
+        if self.sim.realtime:
+            return int((time.perf_counter() - self.t0) * self.hz())
+        return self.iProduced + (self.sim.chunk or max(self.cBuffer, 1))
+
+    def _search(self, iArm, iTo):
+        """Look for the trigger in [iArm, iTo), at most _cSearchMax samples per poll.
+
+        Without an event the auto timeout fires secAutoTimeout after iArm.
+        """
+        if self.trigsrc == _trigsrcNone or self.sync():
+            return iArm
+        iFrom = max(iArm, self.iSearched)
+        iTo = min(iTo, iFrom + _cSearchMax)
+        iAuto = iArm + int(self.secAutoTimeout * self.hz()) if self.secAutoTimeout > 0 else None
+        if iAuto is not None:
+            iTo = min(iTo, iAuto + 1)
+        for i0 in range(iFrom, iTo, _cSearch):
+            i1 = min(i0 + _cSearch, iTo)
+            if self.trigsrc == _trigsrcDetectorAnalogIn:
+                iTrigger = self.device.analogIn.detect(i0, i1, self.hz())
+            elif self.trigsrc == _trigsrcDetectorDigitalIn:
+                iTrigger = self.device.digitalIn.detect(i0, i1, self.hz())
+            else:
+                # PC, external and the other sources fire at once here
+                iTrigger = i0
+            if iTrigger is not None:
+                return iTrigger
+            self.iSearched = i1
+        if iAuto is not None and iAuto < iTo:
+            self.fAuto = True
+            return iAuto
+        return None
+
+    def status(self, fReadData):
+        if self.state == _stDone and self.mode == _acqmodeSingle:
+            self._rearm()
+        if self.state in (_stReady, _stConfig, _stDone):
+            if self.state == _stDone and self.mode == _acqmodeRecord:
+                self.cAvailable = 0
+                self.cLost = 0
+                self.cCorrupted = 0
+                if self.sim.interrupt:
+                    signal.raise_signal(signal.SIGINT)
+            return self.state
+        if self.stats is None:
+            return self._status(fReadData)
+        t = time.perf_counter()
+        cpu = time.process_time()
+        sts = self._status(fReadData)
+        self.stats.poll(time.perf_counter() - t, time.process_time() - cpu)
+        if self.data is not None and (self.cAvailable or self.cLost) and (self.mode == _acqmodeRecord or sts == _stDone):
+            self.stats.chunk(self.cAvailable, self.cLost, self.cCorrupted)
+        return sts
+
+    def _status(self, fReadData):
+        if self.mode == _acqmodeRecord:
+            return self._status_record(fReadData)
+        return self._status_single(fReadData)
+
+    def _status_single(self, fReadData):
+        cPre = self.pre_trigger()
+        iLimit = self._limit()
+        if self.iTrigger is None:
+            iSearch = self.iArm + max(cPre, 0)
+            if iLimit > iSearch:
+                self.iTrigger = self._search(iSearch, iLimit)
+            self.iProduced = iLimit
+            if self.iTrigger is None:
+                self.state = _stPrefill if iLimit < self.iArm + cPre else _stArmed
+                return self.state
+        iEnd = self.iTrigger - cPre + self.cBuffer
+        if iLimit < iEnd:
+            self.iProduced = iLimit
+            self.state = _stRunning
+            return self.state
+        self.iProduced = iEnd
+        self.state = _stDone
+        if fReadData:
+            self.data = self.samples(iEnd - self.cBuffer, self.cBuffer)
+            self.cAvailable = self.cBuffer
+            # the re-arm clears iTrigger, the time of the data read stays
+            self.iDataTrigger = self.iTrigger
+        return self.state
+
+    def _status_record(self, fReadData):
+        cTotal = self.record_length()
+        cPre = self.pre_trigger()
+        iLimit = self._limit()
+        if self.iTrigger is None:
+            if iLimit > cPre:
+                self.iTrigger = self._search(cPre, iLimit)
+        iEnd = None
+        if self.iTrigger is not None and cTotal:
+            iEnd = self.iTrigger - cPre + cTotal
+        if self.sim.samplesMax:
+            iEnd = min(iEnd or self.sim.samplesMax, self.sim.samplesMax)
+        if iEnd is not None:
+            iLimit = min(iLimit, iEnd)
+        if not fReadData:
+            return self.state
+
+        # pre-trigger samples stream as well; scripts keep the last cTotal in a ring
+        cNew = max(iLimit - self.iProduced, 0)
+        cAvailable = min(cNew, self.cBuffer)
+        hz = self.hz()
+        cInject = _faults(self.iProduced, iLimit, hz, self.sim.lostEvery, self.sim.lostCount)
+        cAvailable -= min(cInject, cAvailable)
+        self.cLost = cNew - cAvailable
+        self.cCorrupted = min(_faults(self.iProduced, iLimit, hz, self.sim.corruptedEvery, self.sim.corruptedCount), cAvailable)
+        self.cAvailable = cAvailable
+        self.data = self.samples(iLimit - cAvailable, cAvailable)
+        self.iProduced = iLimit
+
+        if iEnd is not None and iLimit >= iEnd:
+            self.state = _stDone
+        elif self.iTrigger is not None:
+            self.state = _stRunning
+        else:
+            self.state = _stArmed
+        return self.state
+
+
+class _AnalogIn(_Acquisition):
+
+    def __init__(self, device, cChannels, cBuffer):
+        self.device = device
+        self.cChannels = cChannels
+        _Acquisition.__init__(self, device.sim, cBuffer)
+
+    def _reset(self):
+        _Acquisition._reset(self)
+        self.hzAcq = 20e6
+        self.secRecord = 0.0
+        self.secPosition = 0.0
+        self.enabled = [True] * self.cChannels
+        self.range = [5.0] * self.cChannels
+        self.offset = [0.0] * self.cChannels
+        self.attenuation = [1.0] * self.cChannels
+        self.trigChannel = 0
+        self.trigLevel = 0.0
+        self.trigHysteresis = 0.0
+        self.trigCondition = _slopeRise
+
+    def hz(self):
+        return self.hzAcq
+
+    def sync(self):
+        return False
+
+    def set_frequency(self, hz):
+        # the sample clock is the system clock divided by an integer
+        self.hzAcq = _hzAnalogClock / max(round(_hzAnalogClock / max(hz, 1e-3)), 1)
+
+    def set_range(self, channel, volts):
+        # Analog Discovery inputs have a 5 V and a 50 V range
+        self.range[channel] = 5.0 if volts <= 5.0 + 1e-9 else 50.0
+
+    def pre_trigger(self):
+        if self.mode == _acqmodeRecord:
+            if self.trigsrc == _trigsrcNone:
+                return 0
+            return min(max(round(-self.secPosition * self.hzAcq), 0), self.record_length() or 0)
+        # trigger position is relative to the middle of the buffer
+        return self.cBuffer // 2 - round(self.secPosition * self.hzAcq)
+
+    def record_length(self):
+        return round(self.secRecord * self.hzAcq) if self.secRecord > 0 else None
+
+    def signal(self, channel, iFirst, count, hz):
+        """Volts seen by an input at sample indexes [iFirst, iFirst + count) of rate hz."""
+        t = numpy.arange(iFirst, iFirst + count) / hz
+        out = self.device.analogOut
+        if self.sim.loopback and channel < len(out.channels) and out.channels[channel]["running"]:
+            spec = out.channels[channel]
+            x = _waveform(_funcs.get(spec["func"], "sine"), t, spec["frequency"], spec["amplitude"], spec["offset"], spec["phase"], self.sim.rng)
+            noise = self.sim.analog[channel].get("noise", 0.0) if channel < len(self.sim.analog) else 0.0
+        else:
+            spec = self.sim.analog[channel] if channel < len(self.sim.analog) else {"func": "dc", "offset": 0.0}
+            x = _waveform(spec.get("func", "sine"), t, spec.get("frequency", 1e3), spec.get("amplitude", 1.0), spec.get("offset", 0.0), spec.get("phase", 0.0), self.sim.rng)
+            noise = spec.get("noise", 0.0)
+        if noise:
+            x += self.sim.rng.normal(0.0, noise, count)
+        return x
+
+    def samples(self, iFirst, count):
+        data = numpy.zeros((self.cChannels, count))
+        for channel in range(self.cChannels):
+            if not self.enabled[channel]:
+                continue
+            half = self.range[channel] / 2
+            x = self.signal(channel, iFirst, count, self.hzAcq)
+            numpy.clip(x, self.offset[channel] - half, self.offset[channel] + half, out=x)
+            data[channel] = x
+        return data
+
+    def samples16(self, channel, idx, count):
+        x = self.data[channel, idx:idx + count]
+        raw = numpy.round((x - self.offset[channel]) / self.range[channel] * 65536)
+        return numpy.clip(raw, -32768, 32767).astype(numpy.int16)
+
+    def detect(self, iFirst, iEnd, hz):
+        """First trigger detector event in [iFirst, iEnd) of rate hz, or None."""
+        x = self.signal(self.trigChannel, iFirst, iEnd - iFirst, hz)
+        fRise, fFall = self.trigState
+        events = []
+        if self.trigCondition != _slopeFall:
+            i, fRise = _edge(x, self.trigLevel - self.trigHysteresis, self.trigLevel, fRise)
+            if i is not None:
+                events.append(i)
+        if self.trigCondition != _slopeRise:
+            i, fFall = _edge(-x, -self.trigLevel - self.trigHysteresis, -self.trigLevel, fFall)
+            if i is not None:
+                events.append(i)
+        self.trigState = (fRise, fFall)
+        return iFirst + min(events) if events else None
+
+
+class _DigitalIn(_Acquisition):
+
+    def __init__(self, device, cBits, hzClock, cBuffer):
+        self.device = device
+        self.cBits = cBits
+        self.hzClock = hzClock
+        _Acquisition.__init__(self, device.sim, cBuffer)
+
+    def _reset(self):
+        _Acquisition._reset(self)
+        self.divider = 1
+        self.nBits = self.cBits
+        self.cPosition = 0
+        self.cPrefill = 0
+        self.fsLow = 0
+        self.fsHigh = 0
+        self.fsRise = 0
+        self.fsFall = 0
+        self.valuePrev = 0
+
+    def start(self):
+        _Acquisition.start(self)
+        self.valuePrev = 0
+
+    def sync(self):
+        return self.divider in (-1, 0xFFFFFFFF)
+
+    def hz(self):
+        if self.sync():
+            return self.sim.digital.get("hzSync", 1e6)
+        return self.hzClock / max(self.divider, 1)
+
+    def dtype(self):
+        return {8: numpy.uint8, 16: numpy.uint16}.get(self.nBits, numpy.uint32)
+
+    def pre_trigger(self):
+        if self.mode == _acqmodeRecord:
+            return 0 if self.trigsrc == _trigsrcNone else self.cPrefill
+        return self.cBuffer - min(self.cPosition, self.cBuffer)
+
+    def record_length(self):
+        if self.cPosition in (0, -1, 0xFFFFFFFF) or self.sync():
+            return None
+        return self.pre_trigger() + self.cPosition
+
+    def pattern(self, n, t):
+        """Pin values at digital sample numbers n, taken at times t."""
+        digital = self.sim.digital
+        name = digital.get("pattern", "auto")
+        if name == "auto":
+            name = "loopback" if self.device.digitalOut.running else "counter"
+        if name == "loopback":
+            return self.device.digitalOut.bits(t)
+        elif name == "counter":
+            return n.astype(numpy.uint64)
+        elif name == "random":
+            v = (n.astype(numpy.uint64) * numpy.uint64(0x9E3779B1)) & numpy.uint64(0xFFFFFFFF)
+            return v ^ (v >> numpy.uint64(15))
+        elif name == "constant":
+            return numpy.full(len(n), digital.get("value", 0), dtype=numpy.uint64)
+        elif name == "spi":
+            return self._spi(n)
+        elif name == "replay":
+            capture = self._capture()
+            return capture[n % len(capture)].astype(numpy.uint64)
+        raise ValueError("unknown digital pattern: " + str(name))
+
+    def _capture(self):
+        if self.sim.capture is None:
+            digital = self.sim.digital
+            dtype = {8: numpy.uint8, 16: numpy.uint16}.get(digital.get("bits", 16), numpy.uint32)
+            self.sim.capture = numpy.fromfile(digital["path"], dtype=dtype)
+            if not len(self.sim.capture):
+                raise ValueError("empty capture: " + digital["path"])
+        return self.sim.capture
+
+    def _spi(self, n):
+        # one sample per CLK rising edge while CS is low, then one with CS high
+        cBytes = self.sim.digital.get("spiBytes", 4)
+        period = 8 * cBytes + 1
+        frame, k = numpy.divmod(n.astype(numpy.int64), period)
+        mosi = (frame * cBytes + numpy.minimum(k // 8, cBytes - 1)) & 0xFF
+        miso = ~mosi & 0xFF
+        shift = 7 - k % 8
+        v = 2 | ((mosi >> shift) & 1) << 2 | ((miso >> shift) & 1) << 3
+        return numpy.where(k == period - 1, 3, v).astype(numpy.uint64)
+
+    def samples(self, iFirst, count):
+        # in blocks, the uint64/float64 temporaries of a 256M sample capture would not fit
+        out = numpy.empty(count, dtype=self.dtype())
+        mask = numpy.uint64((1 << self.nBits) - 1)
+        for i in range(0, count, _cBlock):
+            n = numpy.arange(iFirst + i, iFirst + min(i + _cBlock, count))
+            out[i:i + len(n)] = self.pattern(n, n / self.hz()) & mask
+        return out
+
+    def detect(self, iFirst, iEnd, hz):
+        """First trigger detector event in [iFirst, iEnd) of a stream at rate hz."""
+        i = numpy.arange(iFirst, iEnd)
+        if hz == self.hz():
+            n = i
+        else:
+            # an AnalogIn acquisition triggered from the digital pins
+            n = numpy.floor(i * (self.hz() / hz)).astype(numpy.int64)
+        v = self.pattern(n, i / hz)
+        fire = numpy.ones(len(v), dtype=bool)
+        if self.fsLow:
+            fire &= (v & numpy.uint64(self.fsLow)) == 0
+        if self.fsHigh:
+            fire &= (v & numpy.uint64(self.fsHigh)) == self.fsHigh
+        if self.fsRise or self.fsFall:
+            prev = numpy.concatenate(([self.valuePrev], v[:-1])).astype(numpy.uint64)
+            edges = ((~prev & v) & numpy.uint64(self.fsRise)) | ((prev & ~v) & numpy.uint64(self.fsFall))
+            fire &= edges != 0
+        if len(v):
+            self.valuePrev = int(v[-1])
+        hits = numpy.flatnonzero(fire)
+        return iFirst + int(hits[0]) if len(hits) else None
+
+
+class _AnalogOut:
+
+    def __init__(self, cChannels=2, cBuffer=4096):
+        self.cBuffer = cBuffer
+        self.channels = []
+        for channel in range(cChannels):
+            self.channels.append(None)
+            self.reset(channel)
+
+    def reset(self, channel):
+        for i in self._indexes(channel):
+            self.channels[i] = {"enabled": False, "func": 1, "frequency": 1e3, "amplitude": 1.0, "offset": 0.0, "phase": 0.0, "running": False,
+                                "cQueued": 0, "tPlay": 0.0}
+
+    def _indexes(self, channel):
+        return range(len(self.channels)) if channel < 0 else (channel,)
+
+    def set(self, channel, key, value):
+        for i in self._indexes(channel):
+            self.channels[i][key] = value
+
+    def configure(self, channel, fStart):
+        for i in self._indexes(channel):
+            self.channels[i]["running"] = bool(fStart) and self.channels[i]["enabled"]
+            self.channels[i]["tPlay"] = time.perf_counter()
+
+    def play_status(self, channel, realtime):
+        """Free room and underrun of a funcPlay channel since the last poll.
+
+        The running channels play in lockstep, so all of them are advanced;
+        the scripts poll the first and feed every channel the same amount.
+        """
+        polled = self.channels[channel]
+        if not polled["running"]:
+            return 0, 0
+        cPlayed = self.cBuffer
+        if realtime:
+            cPlayed = int((time.perf_counter() - polled["tPlay"]) * polled["frequency"])
+            # keep the fraction of a sample for the next poll
+            polled["tPlay"] += cPlayed / polled["frequency"]
+        cLost = max(cPlayed - polled["cQueued"], 0)
+        for c in self.channels:
+            if c["running"]:
+                c["cQueued"] = max(c["cQueued"] - cPlayed, 0)
+        return self.cBuffer - polled["cQueued"], cLost
+
+
+class _DigitalOut:
+
+    def __init__(self, hzClock, cChannels=16):
+        self.hzClock = hzClock
+        self.channels = [{"enabled": False, "divider": 1, "low": 0, "high": 0} for _ in range(cChannels)]
+        self.running = False
+
+    def bits(self, t):
+        ticks = numpy.floor(t * self.hzClock)
+        v = numpy.zeros(len(t), dtype=numpy.uint64)
+        for i, channel in enumerate(self.channels):
+            cPeriod = channel["low"] + channel["high"]
+            if channel["enabled"] and cPeriod:
+                phase = (ticks // max(channel["divider"], 1)) % cPeriod
+                v |= (phase >= channel["low"]).astype(numpy.uint64) << numpy.uint64(i)
+        return v
+
+
+class _Device:
+
+    def __init__(self, sim, spec):
+        self.sim = sim
+        self.name = spec.get("name", _defaultDevice["name"])
+        self.serial = spec.get("serial", _defaultDevice["serial"])
+        self.devId = spec.get("devId", _defaultDevice["devId"])
+        self.devRev = spec.get("devRev", _defaultDevice["devRev"])
+        self.model = _models.get(self.devId, _models[3])
+        self.hdwf = 0
+
+    def open(self, hdwf, iConfig):
+        cAnalog, cBits, hzDigital, configs = self.model
+        cAI, cAO, cDI, cDO = configs[iConfig]
+        self.hdwf = hdwf
+        self.analogIn = _AnalogIn(self, cAnalog, cAI)
+        self.analogOut = _AnalogOut(2 if cAO else 0, cAO or 4096)
+        self.digitalIn = _DigitalIn(self, cBits, hzDigital, cDI)
+        self.digitalOut = _DigitalOut(hzDigital)
+
+
+def _noop(*args):
+    return 1
+
+
+class SimDwf:
+    """Simulated dwf library object; use it where the scripts use dwf."""
+
+    _name = "dwfsim"
+
+    def __init__(self, config=None):
+        config = config or {}
+        self.realtime = config.get("realtime", True)
+        self.chunk = config.get("chunk", 0)
+        self.loopback = config.get("loopback", True)
+        self.analog = config.get("analog", list(_defaultAnalog))
+        self.digital = config.get("digital", {})
+        self.lostEvery = config.get("lostEvery", 0)
+        self.lostCount = config.get("lostCount", 0)
+        self.corruptedEvery = config.get("corruptedEvery", 0)
+        self.corruptedCount = config.get("corruptedCount", 0)
+        self.samplesMax = config.get("samplesMax", 0)
+        self.interrupt = config.get("interrupt", False)
+        self.statsPath = config.get("stats", "")
+        self.runs = []
+        if self.statsPath:
+            atexit.register(self.write_stats)
+        self.rng = numpy.random.default_rng(config.get("seed", 0))
+        self.capture = None
+        self.devices = [_Device(self, spec) for spec in config.get("devices", [_defaultDevice])]
+        self.erc = 0
+        self.error = ""
+
+    @classmethod
+    def from_environment(cls):
+        """Settings from DWF_SIM: inline JSON or a JSON file path."""
+        text = os.environ.get("DWF_SIM", "")
+        if text and not text.lstrip().startswith("{"):
+            with open(text) as f:
+                text = f.read()
+        return cls(json.loads(text) if text else None)
+
+    def __getattr__(self, name):
+        if name.startswith("FDwf") and name.endswith(("Set", "Reset", "Configure", "TriggerPC")):
+            return _noop
+        raise AttributeError(name + " is not simulated")
+
+    def stats_start(self, acquisition):
+        """Start timing an acquisition when a stats path is set."""
+        if not self.statsPath:
+            return None
+        stats = _Stats(type(acquisition).__name__.lstrip("_"), acquisition)
+        self.runs.append(stats)
+        return stats
+
+    def write_stats(self):
+        with open(self.statsPath, "w") as f:
+            json.dump({"runs": [stats.summary() for stats in self.runs]}, f, indent=1)
+
+    def _fail(self, erc, message):
+        self.erc = erc
+        self.error = message
+        return 0
+
+    def _device(self, hdwf):
+        hdwf = _val(hdwf)
+        for device in self.devices:
+            if device.hdwf and device.hdwf == hdwf:
+                return device
+        self._fail(_ercInvalidParameter, "Invalid device handle")
+        return None
+
+    # library
+
+    def FDwfGetVersion(self, szVersion):
+        _put_text(szVersion, "3.20.1 sim", 32)
+        return 1
+
+    def FDwfGetLastError(self, pdwferc):
+        _put(pdwferc, c_int, self.erc)
+        return 1
+
+    def FDwfGetLastErrorMsg(self, szError):
+        _put_text(szError, self.error, 512)
+        self.erc = 0
+        self.error = ""
+        return 1
+
+    # enumeration
+
+    def FDwfEnum(self, enumfilter, pcDevice):
+        _put(pcDevice, c_int, len(self.devices))
+        return 1
+
+    def _enum(self, idxDevice):
+        idxDevice = _val(idxDevice)
+        if 0 <= idxDevice < len(self.devices):
+            return self.devices[idxDevice]
+        self._fail(_ercInvalidParameter, "Invalid device index")
+        return None
+
+    def FDwfEnumDeviceType(self, idxDevice, pDeviceId, pDeviceRevision):
+        device = self._enum(idxDevice)
+        if device is None:
+            return 0
+        _put(pDeviceId, c_int, device.devId)
+        _put(pDeviceRevision, c_int, device.devRev)
+        return 1
+
+    def FDwfEnumDeviceIsOpened(self, idxDevice, pfIsUsed):
+        device = self._enum(idxDevice)
+        if device is None:
+            return 0
+        _put(pfIsUsed, c_int, 1 if device.hdwf else 0)
+        return 1
+
+    def FDwfEnumUserName(self, idxDevice, szUserName):
+        return self.FDwfEnumDeviceName(idxDevice, szUserName)
+
+    def FDwfEnumDeviceName(self, idxDevice, szDeviceName):
+        device = self._enum(idxDevice)
+        if device is None:
+            return 0
+        _put_text(szDeviceName, device.name, 32)
+        return 1
+
+    def FDwfEnumSN(self, idxDevice, szSN):
+        device = self._enum(idxDevice)
+        if device is None:
+            return 0
+        _put_text(szSN, device.serial, 16)
+        return 1
+
+    def FDwfEnumConfig(self, idxDevice, pcConfig):
+        device = self._enum(idxDevice)
+        if device is None:
+            return 0
+        _put(pcConfig, c_int, len(device.model[3]))
+        self._enumDevice = device
+        return 1
+
+    def FDwfEnumConfigInfo(self, idxConfig, info, pConfigInfo):
+        # info: DECIAnalogInChannelCount .. DECIDigitalOutBufferSize
+        device = getattr(self, "_enumDevice", self.devices[0])
+        cAnalog, cBits, hzDigital, configs = device.model
+        cAI, cAO, cDI, cDO = configs[_val(idxConfig)]
+        values = {1: cAnalog, 2: 2 if cAO else 0, 3: 0, 4: cBits, 5: 16, 6: 16, 7: cAI, 8: cAO, 9: cDI, 10: cDO}
+        _put(pConfigInfo, c_int, values.get(_val(info), 0))
+        return 1
+
+    # device
+
+    def FDwfDeviceOpen(self, idxDevice, phdwf):
+        return self.FDwfDeviceConfigOpen(idxDevice, 0, phdwf)
+
+    def FDwfDeviceConfigOpen(self, idxDevice, idxCfg, phdwf):
+        idxDevice = _val(idxDevice)
+        _put(phdwf, c_int, 0)
+        if idxDevice < 0:
+            free = [device for device in self.devices if not device.hdwf]
+            if not free:
+                return self._fail(_ercAlreadyOpened, "No free device found")
+            device = free[0]
+        else:
+            device = self._enum(idxDevice)
+            if device is None:
+                return 0
+            if device.hdwf:
+                return self._fail(_ercAlreadyOpened, "Device is busy")
+        idxCfg = max(_val(idxCfg), 0)
+        if idxCfg >= len(device.model[3]):
+            return self._fail(_ercInvalidParameter, "Invalid device configuration")
+        device.open(self.devices.index(device) + 1, idxCfg)
+        _put(phdwf, c_int, device.hdwf)
+        return 1
+
+    def FDwfDeviceClose(self, hdwf):
+        device = self._device(hdwf)
+        if device is None:
+            return 0
+        device.hdwf = 0
+        return 1
+
+    def FDwfDeviceCloseAll(self):
+        for device in self.devices:
+            device.hdwf = 0
+        return 1
+
+    # AnalogIn
+
+    def _analogIn(self, hdwf):
+        device = self._device(hdwf)
+        return None if device is None else device.analogIn
+
+    def FDwfAnalogInReset(self, hdwf):
+        ai = self._analogIn(hdwf)
+        if ai is None:
+            return 0
+        ai._reset()
+        return 1
+
+    def FDwfAnalogInConfigure(self, hdwf, fReconfigure, fStart):
+        ai = self._analogIn(hdwf)
+        if ai is None:
+            return 0
+        if ai.mode not in (_acqmodeSingle, _acqmodeSingle1, _acqmodeRecord):
+            return self._fail(_ercNotSupported, "Acquisition mode is not simulated")
+        if _val(fStart):
+            ai.start()
+        elif _val(fReconfigure):
+            ai.stop()
+        return 1
+
+    def FDwfAnalogInStatus(self, hdwf, fReadData, psts):
+        ai = self._analogIn(hdwf)
+        if ai is None:
+            return 0
+        _put(psts, c_ubyte, ai.status(_val(fReadData)))
+        return 1
+
+    def FDwfAnalogInStatusSamplesLeft(self, hdwf, pcSamplesLeft):
+        ai = self._analogIn(hdwf)
+        if ai is None:
+            return 0
+        cTotal = ai.record_length() if ai.mode == _acqmodeRecord else ai.cBuffer
+        _put(pcSamplesLeft, c_int, max((cTotal or 0) - ai.iProduced, 0))
+        return 1
+
+    def FDwfAnalogInStatusSamplesValid(self, hdwf, pcSamplesValid):
+        ai = self._analogIn(hdwf)
+        if ai is None:
+            return 0
+        _put(pcSamplesValid, c_int, ai.cAvailable)
+        return 1
+
+    def FDwfAnalogInStatusIndexWrite(self, hdwf, pidxWrite):
+        ai = self._analogIn(hdwf)
+        if ai is None:
+            return 0
+        _put(pidxWrite, c_int, ai.iProduced % max(ai.cBuffer, 1))
+        return 1
+
+    def FDwfAnalogInStatusAutoTriggered(self, hdwf, pfAuto):
+        ai = self._analogIn(hdwf)
+        if ai is None:
+            return 0
+        _put(pfAuto, c_int, int(ai.fAuto))
+        return 1
+
+    def FDwfAnalogInStatusData(self, hdwf, idxChannel, rgdVoltData, cdData):
+        return self.FDwfAnalogInStatusData2(hdwf, idxChannel, rgdVoltData, 0, cdData)
+
+    def FDwfAnalogInStatusData2(self, hdwf, idxChannel, rgdVoltData, idxData, cdData):
+        ai = self._analogIn(hdwf)
+        if ai is None:
+            return 0
+        channel = _val(idxChannel)
+        idxData = _val(idxData)
+        if ai.data is None or not 0 <= channel < ai.cChannels:
+            return self._fail(_ercInvalidParameter, "No data for this channel")
+        x = ai.data[channel, idxData:idxData + _val(cdData)]
+        _view(rgdVoltData, numpy.float64, len(x))[:] = x
+        return 1
+
+    def FDwfAnalogInStatusData16(self, hdwf, idxChannel, rgu16Data, idxData, cdData):
+        ai = self._analogIn(hdwf)
+        if ai is None:
+            return 0
+        channel = _val(idxChannel)
+        if ai.data is None or not 0 <= channel < ai.cChannels:
+            return self._fail(_ercInvalidParameter, "No data for this channel")
+        raw = ai.samples16(channel, _val(idxData), _val(cdData))
+        _view(rgu16Data, numpy.int16, len(raw))[:] = raw
+        return 1
+
+    def FDwfAnalogInStatusSample(self, hdwf, idxChannel, pdVoltSample):
+        ai = self._analogIn(hdwf)
+        if ai is None:
+            return 0
+        if ai.state == _stReady:
+            i = int((time.perf_counter() - getattr(ai, "t0", 0.0)) * ai.hzAcq)
+        else:
+            i = ai.iProduced
+        _put(pdVoltSample, c_double, float(ai.signal(_val(idxChannel), i, 1, ai.hzAcq)[0]))
+        return 1
+
+    def FDwfAnalogInStatusRecord(self, hdwf, pcdDataAvailable, pcdDataLost, pcdDataCorrupt):
+        ai = self._analogIn(hdwf)
+        if ai is None:
+            return 0
+        _put(pcdDataAvailable, c_int, ai.cAvailable)
+        _put(pcdDataLost, c_int, ai.cLost)
+        _put(pcdDataCorrupt, c_int, ai.cCorrupted)
+        return 1
+
+    def FDwfAnalogInStatusTime(self, hdwf, psecUtc, ptick, pticksPerSecond):
+        ai = self._analogIn(hdwf)
+        if ai is None:
+            return 0
+        # trigger of the data read last on a 100 MHz device clock set to the host time at start
+        iTrigger = ai.iDataTrigger if ai.iDataTrigger is not None else (ai.iTrigger or 0)
+        secUtc = int(ai.tUtc)
+        cTick = round((ai.tUtc - secUtc + iTrigger / ai.hzAcq) * _hzAnalogClock)
+        _put(psecUtc, c_uint, secUtc + cTick // int(_hzAnalogClock))
+        _put(ptick, c_uint, cTick % int(_hzAnalogClock))
+        _put(pticksPerSecond, c_uint, int(_hzAnalogClock))
+        return 1
+
+    def FDwfAnalogInBufferSizeInfo(self, hdwf, pnSizeMin, pnSizeMax):
+        ai = self._analogIn(hdwf)
+        if ai is None:
+            return 0
+        _put(pnSizeMin, c_int, min(16, ai.cBufferMax))
+        _put(pnSizeMax, c_int, ai.cBufferMax)
+        return 1
+
+    def FDwfAnalogInBufferSizeSet(self, hdwf, nSize):
+        ai = self._analogIn(hdwf)
+        if ai is None:
+            return 0
+        ai.cBuffer = min(max(_val(nSize), 16), ai.cBufferMax)
+        return 1
+
+    def FDwfAnalogInBufferSizeGet(self, hdwf, pnSize):
+        ai = self._analogIn(hdwf)
+        if ai is None:
+            return 0
+        _put(pnSize, c_int, ai.cBuffer)
+        return 1
+
+    def FDwfAnalogInBitsInfo(self, hdwf, pnBits):
+        if self._analogIn(hdwf) is None:
+            return 0
+        _put(pnBits, c_int, 14)
+        return 1
+
+    def FDwfAnalogInFrequencySet(self, hdwf, hzFrequency):
+        ai = self._analogIn(hdwf)
+        if ai is None:
+            return 0
+        ai.set_frequency(_val(hzFrequency))
+        return 1
+
+    def FDwfAnalogInFrequencyGet(self, hdwf, phzFrequency):
+        ai = self._analogIn(hdwf)
+        if ai is None:
+            return 0
+        _put(phzFrequency, c_double, ai.hzAcq)
+        return 1
+
+    def FDwfAnalogInAcquisitionModeSet(self, hdwf, acqmode):
+        ai = self._analogIn(hdwf)
+        if ai is None:
+            return 0
+        ai.mode = _val(acqmode)
+        return 1
+
+    def FDwfAnalogInAcquisitionModeGet(self, hdwf, pacqmode):
+        return self._analog_get(hdwf, "mode", c_int, pacqmode)
+
+    def FDwfAnalogInRecordLengthSet(self, hdwf, sLength):
+        ai = self._analogIn(hdwf)
+        if ai is None:
+            return 0
+        ai.secRecord = _val(sLength)
+        return 1
+
+    def FDwfAnalogInRecordLengthGet(self, hdwf, psLength):
+        return self._analog_get(hdwf, "secRecord", c_double, psLength)
+
+    def FDwfAnalogInChannelCount(self, hdwf, pcChannel):
+        ai = self._analogIn(hdwf)
+        if ai is None:
+            return 0
+        _put(pcChannel, c_int, ai.cChannels)
+        return 1
+
+    def _channel_set(self, hdwf, idxChannel, key, value):
+        ai = self._analogIn(hdwf)
+        if ai is None:
+            return 0
+        channel = _val(idxChannel)
+        for i in (range(ai.cChannels) if channel < 0 else (channel,)):
+            if key == "range":
+                ai.set_range(i, _val(value))
+            else:
+                getattr(ai, key)[i] = _val(value)
+        return 1
+
+    def _channel_get(self, hdwf, idxChannel, key, p, ctype=c_double):
+        ai = self._analogIn(hdwf)
+        if ai is None:
+            return 0
+        _put(p, ctype, getattr(ai, key)[_val(idxChannel)])
+        return 1
+
+    def FDwfAnalogInChannelEnableSet(self, hdwf, idxChannel, fEnable):
+        return self._channel_set(hdwf, idxChannel, "enabled", bool(_val(fEnable)))
+
+    def FDwfAnalogInChannelEnableGet(self, hdwf, idxChannel, pfEnable):
+        return self._channel_get(hdwf, idxChannel, "enabled", pfEnable, c_int)
+
+    def FDwfAnalogInChannelRangeSet(self, hdwf, idxChannel, voltsRange):
+        return self._channel_set(hdwf, idxChannel, "range", voltsRange)
+
+    def FDwfAnalogInChannelRangeGet(self, hdwf, idxChannel, pvoltsRange):
+        return self._channel_get(hdwf, idxChannel, "range", pvoltsRange)
+
+    def FDwfAnalogInChannelOffsetSet(self, hdwf, idxChannel, voltOffset):
+        return self._channel_set(hdwf, idxChannel, "offset", voltOffset)
+
+    def FDwfAnalogInChannelOffsetGet(self, hdwf, idxChannel, pvoltOffset):
+        return self._channel_get(hdwf, idxChannel, "offset", pvoltOffset)
+
+    def FDwfAnalogInChannelAttenuationSet(self, hdwf, idxChannel, xAttenuation):
+        return self._channel_set(hdwf, idxChannel, "attenuation", xAttenuation)
+
+    def FDwfAnalogInChannelAttenuationGet(self, hdwf, idxChannel, pxAttenuation):
+        return self._channel_get(hdwf, idxChannel, "attenuation", pxAttenuation)
+
+    def _analog_trigger(self, hdwf, key, value):
+        ai = self._analogIn(hdwf)
+        if ai is None:
+            return 0
+        setattr(ai, key, _val(value))
+        return 1
+
+    def _analog_get(self, hdwf, key, ctype, p):
+        ai = self._analogIn(hdwf)
+        if ai is None:
+            return 0
+        _put(p, ctype, getattr(ai, key))
+        return 1
+
+    def FDwfAnalogInTriggerSourceGet(self, hdwf, ptrigsrc):
+        return self._analog_get(hdwf, "trigsrc", c_ubyte, ptrigsrc)
+
+    def FDwfAnalogInTriggerPositionGet(self, hdwf, psecPosition):
+        return self._analog_get(hdwf, "secPosition", c_double, psecPosition)
+
+    def FDwfAnalogInTriggerAutoTimeoutGet(self, hdwf, psecTimeout):
+        return self._analog_get(hdwf, "secAutoTimeout", c_double, psecTimeout)
+
+    def FDwfAnalogInTriggerChannelGet(self, hdwf, pidxChannel):
+        return self._analog_get(hdwf, "trigChannel", c_int, pidxChannel)
+
+    def FDwfAnalogInTriggerLevelGet(self, hdwf, pvoltsLevel):
+        return self._analog_get(hdwf, "trigLevel", c_double, pvoltsLevel)
+
+    def FDwfAnalogInTriggerHysteresisGet(self, hdwf, pvoltsLevel):
+        return self._analog_get(hdwf, "trigHysteresis", c_double, pvoltsLevel)
+
+    def FDwfAnalogInTriggerConditionGet(self, hdwf, ptrigcond):
+        return self._analog_get(hdwf, "trigCondition", c_int, ptrigcond)
+
+    def FDwfAnalogInTriggerSourceSet(self, hdwf, trigsrc):
+        return self._analog_trigger(hdwf, "trigsrc", trigsrc)
+
+    def FDwfAnalogInTriggerPositionSet(self, hdwf, secPosition):
+        return self._analog_trigger(hdwf, "secPosition", secPosition)
+
+    def FDwfAnalogInTriggerAutoTimeoutSet(self, hdwf, secTimeout):
+        return self._analog_trigger(hdwf, "secAutoTimeout", secTimeout)
+
+    def FDwfAnalogInTriggerChannelSet(self, hdwf, idxChannel):
+        return self._analog_trigger(hdwf, "trigChannel", idxChannel)
+
+    def FDwfAnalogInTriggerLevelSet(self, hdwf, voltsLevel):
+        return self._analog_trigger(hdwf, "trigLevel", voltsLevel)
+
+    def FDwfAnalogInTriggerHysteresisSet(self, hdwf, voltsLevel):
+        return self._analog_trigger(hdwf, "trigHysteresis", voltsLevel)
+
+    def FDwfAnalogInTriggerConditionSet(self, hdwf, trigcond):
+        return self._analog_trigger(hdwf, "trigCondition", trigcond)
+
+    # AnalogOut, only what loops back into AnalogIn
+
+    def _analogOut(self, hdwf, idxChannel, key, value):
+        device = self._device(hdwf)
+        if device is None:
+            return 0
+        device.analogOut.set(_val(idxChannel), key, _val(value))
+        return 1
+
+    def FDwfAnalogOutNodeEnableSet(self, hdwf, idxChannel, node, fEnable):
+        return self._analogOut(hdwf, idxChannel, "enabled", bool(_val(fEnable)))
+
+    def FDwfAnalogOutNodeFunctionSet(self, hdwf, idxChannel, node, func):
+        return self._analogOut(hdwf, idxChannel, "func", func) if _val(node) == 0 else 1
+
+    def FDwfAnalogOutNodeFrequencySet(self, hdwf, idxChannel, node, hzFrequency):
+        return self._analogOut(hdwf, idxChannel, "frequency", hzFrequency) if _val(node) == 0 else 1
+
+    def FDwfAnalogOutNodeAmplitudeSet(self, hdwf, idxChannel, node, vAmplitude):
+        return self._analogOut(hdwf, idxChannel, "amplitude", vAmplitude) if _val(node) == 0 else 1
+
+    def FDwfAnalogOutNodeOffsetSet(self, hdwf, idxChannel, node, vOffset):
+        return self._analogOut(hdwf, idxChannel, "offset", vOffset) if _val(node) == 0 else 1
+
+    def FDwfAnalogOutNodePhaseSet(self, hdwf, idxChannel, node, degreePhase):
+        return self._analogOut(hdwf, idxChannel, "phase", degreePhase) if _val(node) == 0 else 1
+
+    def FDwfAnalogOutConfigure(self, hdwf, idxChannel, fStart):
+        device = self._device(hdwf)
+        if device is None:
+            return 0
+        device.analogOut.configure(_val(idxChannel), _val(fStart))
+        return 1
+
+    def FDwfAnalogOutReset(self, hdwf, idxChannel):
+        device = self._device(hdwf)
+        if device is None:
+            return 0
+        device.analogOut.reset(_val(idxChannel))
+        return 1
+
+    def FDwfAnalogOutNodeDataInfo(self, hdwf, idxChannel, node, pnSamplesMin, pnSamplesMax):
+        device = self._device(hdwf)
+        if device is None:
+            return 0
+        _put(pnSamplesMin, c_int, 1)
+        _put(pnSamplesMax, c_int, device.analogOut.cBuffer)
+        return 1
+
+    def FDwfAnalogOutNodeDataSet(self, hdwf, idxChannel, node, rgdData, cdData):
+        device = self._device(hdwf)
+        if device is None:
+            return 0
+        for i in device.analogOut._indexes(_val(idxChannel)):
+            device.analogOut.channels[i]["cQueued"] = min(_val(cdData), device.analogOut.cBuffer)
+        return 1
+
+    def FDwfAnalogOutNodePlayStatus(self, hdwf, idxChannel, node, pdataFree, pdataLost, pdataCorrupted):
+        device = self._device(hdwf)
+        if device is None:
+            return 0
+        cFree, cLost = device.analogOut.play_status(_val(idxChannel), self.realtime)
+        _put(pdataFree, c_int, cFree)
+        _put(pdataLost, c_int, cLost)
+        _put(pdataCorrupted, c_int, 0)
+        return 1
+
+    def FDwfAnalogOutNodePlayData(self, hdwf, idxChannel, node, rgdData, cdData):
+        device = self._device(hdwf)
+        if device is None:
+            return 0
+        c = device.analogOut.channels[_val(idxChannel)]
+        cData = _val(cdData)
+        if c["cQueued"] + cData > device.analogOut.cBuffer:
+            return self._fail(_ercInvalidParameter, "AnalogOut play data exceeds the free buffer")
+        c["cQueued"] += cData
+        return 1
+
+    def FDwfAnalogOutStatus(self, hdwf, idxChannel, psts):
+        device = self._device(hdwf)
+        if device is None:
+            return 0
+        channel = _val(idxChannel)
+        fRunning = any(device.analogOut.channels[i]["running"] for i in device.analogOut._indexes(channel))
+        _put(psts, c_ubyte, _stRunning if fRunning else _stReady)
+        return 1
+
+    # DigitalIn
+
+    def _digitalIn(self, hdwf):
+        device = self._device(hdwf)
+        return None if device is None else device.digitalIn
+
+    def FDwfDigitalInReset(self, hdwf):
+        di = self._digitalIn(hdwf)
+        if di is None:
+            return 0
+        di._reset()
+        return 1
+
+    def FDwfDigitalInConfigure(self, hdwf, fReconfigure, fStart):
+        di = self._digitalIn(hdwf)
+        if di is None:
+            return 0
+        if di.mode not in (_acqmodeSingle, _acqmodeSingle1, _acqmodeRecord):
+            return self._fail(_ercNotSupported, "Acquisition mode is not simulated")
+        if _val(fStart):
+            di.start()
+        elif _val(fReconfigure):
+            di.stop()
+        return 1
+
+    def FDwfDigitalInStatus(self, hdwf, fReadData, psts):
+        di = self._digitalIn(hdwf)
+        if di is None:
+            return 0
+        _put(psts, c_ubyte, di.status(_val(fReadData)))
+        return 1
+
+    def FDwfDigitalInStatusSamplesValid(self, hdwf, pcSamplesValid):
+        di = self._digitalIn(hdwf)
+        if di is None:
+            return 0
+        _put(pcSamplesValid, c_int, di.cAvailable)
+        return 1
+
+    def FDwfDigitalInStatusData(self, hdwf, rgData, countOfDataBytes):
+        return self.FDwfDigitalInStatusData2(hdwf, rgData, 0, countOfDataBytes)
+
+    def FDwfDigitalInStatusData2(self, hdwf, rgData, idxSample, countOfDataBytes):
+        di = self._digitalIn(hdwf)
+        if di is None:
+            return 0
+        if di.data is None:
+            return self._fail(_ercInvalidParameter, "No data")
+        idxSample = _val(idxSample)
+        x = di.data[idxSample:idxSample + _val(countOfDataBytes) // di.data.itemsize]
+        _view(rgData, x.dtype, len(x))[:] = x
+        return 1
+
+    def FDwfDigitalInStatusRecord(self, hdwf, pcdDataAvailable, pcdDataLost, pcdDataCorrupt):
+        di = self._digitalIn(hdwf)
+        if di is None:
+            return 0
+        _put(pcdDataAvailable, c_int, di.cAvailable)
+        _put(pcdDataLost, c_int, di.cLost)
+        _put(pcdDataCorrupt, c_int, di.cCorrupted)
+        return 1
+
+    def FDwfDigitalInInternalClockInfo(self, hdwf, phzFreq):
+        di = self._digitalIn(hdwf)
+        if di is None:
+            return 0
+        _put(phzFreq, c_double, di.hzClock)
+        return 1
+
+    def FDwfDigitalInDividerSet(self, hdwf, div):
+        di = self._digitalIn(hdwf)
+        if di is None:
+            return 0
+        di.divider = _val(div)
+        return 1
+
+    def FDwfDigitalInDividerGet(self, hdwf, pdiv):
+        di = self._digitalIn(hdwf)
+        if di is None:
+            return 0
+        _put(pdiv, c_uint, di.divider & 0xFFFFFFFF)
+        return 1
+
+    def FDwfDigitalInBitsInfo(self, hdwf, pnBits):
+        di = self._digitalIn(hdwf)
+        if di is None:
+            return 0
+        _put(pnBits, c_int, di.cBits)
+        return 1
+
+    def FDwfDigitalInSampleFormatSet(self, hdwf, nBits):
+        di = self._digitalIn(hdwf)
+        if di is None:
+            return 0
+        if _val(nBits) not in (8, 16, 32):
+            return self._fail(_ercInvalidParameter, "Sample format must be 8, 16 or 32 bits")
+        di.nBits = _val(nBits)
+        return 1
+
+    def FDwfDigitalInBufferSizeInfo(self, hdwf, pnSizeMax):
+        di = self._digitalIn(hdwf)
+        if di is None:
+            return 0
+        _put(pnSizeMax, c_int, di.cBufferMax)
+        return 1
+
+    def FDwfDigitalInBufferSizeSet(self, hdwf, nSize):
+        di = self._digitalIn(hdwf)
+        if di is None:
+            return 0
+        di.cBuffer = min(max(_val(nSize), 1), di.cBufferMax)
+        return 1
+
+    def FDwfDigitalInBufferSizeGet(self, hdwf, pnSize):
+        di = self._digitalIn(hdwf)
+        if di is None:
+            return 0
+        _put(pnSize, c_int, di.cBuffer)
+        return 1
+
+    def FDwfDigitalInAcquisitionModeSet(self, hdwf, acqmode):
+        di = self._digitalIn(hdwf)
+        if di is None:
+            return 0
+        di.mode = _val(acqmode)
+        return 1
+
+    def FDwfDigitalInTriggerSourceSet(self, hdwf, trigsrc):
+        di = self._digitalIn(hdwf)
+        if di is None:
+            return 0
+        di.trigsrc = _val(trigsrc)
+        return 1
+
+    def FDwfDigitalInTriggerPositionSet(self, hdwf, cSamplesAfterTrigger):
+        di = self._digitalIn(hdwf)
+        if di is None:
+            return 0
+        di.cPosition = _val(cSamplesAfterTrigger)
+        return 1
+
+    def FDwfDigitalInTriggerPrefillSet(self, hdwf, cSamplesBeforeTrigger):
+        di = self._digitalIn(hdwf)
+        if di is None:
+            return 0
+        di.cPrefill = _val(cSamplesBeforeTrigger)
+        return 1
+
+    def FDwfDigitalInTriggerSet(self, hdwf, fsLevelLow, fsLevelHigh, fsEdgeRise, fsEdgeFall):
+        di = self._digitalIn(hdwf)
+        if di is None:
+            return 0
+        di.fsLow = _val(fsLevelLow) & 0xFFFFFFFF
+        di.fsHigh = _val(fsLevelHigh) & 0xFFFFFFFF
+        di.fsRise = _val(fsEdgeRise) & 0xFFFFFFFF
+        di.fsFall = _val(fsEdgeFall) & 0xFFFFFFFF
+        return 1
+
+    # DigitalOut pulse counters, which loop back into DigitalIn
+
+    def _digitalOut(self, hdwf, idxChannel, **values):
+        device = self._device(hdwf)
+        if device is None:
+            return 0
+        channel = _val(idxChannel)
+        if not 0 <= channel < len(device.digitalOut.channels):
+            return self._fail(_ercInvalidParameter, "Invalid DigitalOut channel")
+        device.digitalOut.channels[channel].update(values)
+        return 1
+
+    def FDwfDigitalOutEnableSet(self, hdwf, idxChannel, fEnable):
+        return self._digitalOut(hdwf, idxChannel, enabled=bool(_val(fEnable)))
+
+    def FDwfDigitalOutDividerSet(self, hdwf, idxChannel, v):
+        return self._digitalOut(hdwf, idxChannel, divider=_val(v))
+
+    def FDwfDigitalOutCounterSet(self, hdwf, idxChannel, vLow, vHigh):
+        return self._digitalOut(hdwf, idxChannel, low=_val(vLow), high=_val(vHigh))
+
+    def FDwfDigitalOutConfigure(self, hdwf, fStart):
+        device = self._device(hdwf)
+        if device is None:
+            return 0
+        device.digitalOut.running = bool(_val(fStart))
+        return 1
+
+    def FDwfDigitalOutReset(self, hdwf):
+        device = self._device(hdwf)
+        if device is None:
+            return 0
+        device.digitalOut = _DigitalOut(device.digitalOut.hzClock)
+        return 1
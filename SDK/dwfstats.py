@@ -0,0 +1,102 @@
+"""
+   DWFStats (vectorized per-channel statistics for DWF sample buffers)
+   Revision:  2026-10-18
+
+   Requires:
+       Python 3.11, numpy
+   Description:
+   Views ctypes sample buffers as numpy arrays without copying and computes
+   mean, RMS, AC-RMS, min, max and peak-to-peak for every channel in one pass.
+   Records keep the int16 ADC codes of FDwfAnalogInStatusData16, a quarter of
+   the doubles of FDwfAnalogInStatusData; to_volts and stats_to_volts scale
+   codes, or statistics computed on them, once the values are needed.
+"""
+
+from collections import namedtuple
+import numpy
+
+STAT_FIELDS = ("mean", "rms", "acrms", "min", "max", "pkpk")
+
+ChannelStats = namedtuple("ChannelStats", STAT_FIELDS)
+
+
+def as_array(rgSamples, cValid=None):
+    """Return a zero-copy numpy view of a ctypes buffer, trimmed to cValid samples.
+
+    rgSamples may be a 1-D buffer, e.g. (c_double*n)(), or a 2-D one,
+    e.g. ((c_double*n)*channels)(); cValid may be an int or a c_int.
+    """
+    samples = numpy.ctypeslib.as_array(rgSamples)
+    if cValid is not None:
+        samples = samples[..., :int(getattr(cValid, "value", cValid))]
+    return samples
+
+
+def channel_stats(samples):
+    """Compute ChannelStats along the last axis of samples.
+
+    A 1-D input gives float fields, a (channels x samples) input gives one
+    value per channel. Empty inputs give NaN instead of a warning.
+    """
+    samples = numpy.asarray(samples, dtype=numpy.float64)
+    n = samples.shape[-1]
+    if n == 0:
+        nan = numpy.full(samples.shape[:-1], numpy.nan)[()]
+        return ChannelStats(nan, nan, nan, nan, nan, nan)
+
+    mean = samples.sum(axis=-1) / n
+    meansq = numpy.einsum("...i,...i->...", samples, samples) / n
+    # two passes: meansq - mean**2 cancels away the AC part of a small signal on a large DC
+    ac = samples - mean[..., None]
+    acsq = numpy.einsum("...i,...i->...", ac, ac) / n
+    lo = samples.min(axis=-1)
+    hi = samples.max(axis=-1)
+    return ChannelStats(
+        mean[()],
+        numpy.sqrt(meansq)[()],
+        numpy.sqrt(acsq)[()],
+        lo[()],
+        hi[()],
+        (hi - lo)[()],
+    )
+
+
+def channel_scale(channels):
+    """(scale, offset) columns that turn (channels x samples) ADC codes into volts.
+
+    channels are dicts with "range" and "offset" as read back from the
+    device, e.g. AnalogInRecord.channel_settings(); the range read back
+    already includes the probe attenuation.
+    """
+    scale = numpy.array([channel["range"] / 65536.0 for channel in channels])[:, None]
+    offset = numpy.array([channel["offset"] for channel in channels])[:, None]
+    return scale, offset
+
+
+def to_volts(samples, channels):
+    """Scale raw int16 ADC codes of a (channels x samples) block to volts."""
+    scale, offset = channel_scale(channels)
+    return samples * scale + offset
+
+
+def to_codes(volts, channel):
+    """Voltage on one channel as a (fractional) ADC code, to compare levels with raw samples."""
+    return (volts - channel["offset"]) * 65536.0 / channel["range"]
+
+
+def stats_to_volts(stats, channels):
+    """ChannelStats of ADC codes, fields shaped (channels x ...), as volts."""
+    scale, offset = channel_scale(channels)
+    shape = (len(channels),) + (1,) * (numpy.ndim(stats.mean) - 1)
+    scale = scale.reshape(shape)
+    offset = offset.reshape(shape)
+    mean = stats.mean * scale + offset
+    acrms = stats.acrms * scale
+    return ChannelStats(
+        mean,
+        numpy.sqrt(acrms * acrms + mean * mean),
+        acrms,
+        stats.min * scale + offset,
+        stats.max * scale + offset,
+        stats.pkpk * scale,
+    )
@@ -0,0 +1,65 @@
+"""
+   DWFTime (sample-clock timestamps)
+   Revision:  2026-10-18
+
+   Requires:
+       Python 3.11
+   Description:
+   Anchors hardware sample 0 to one UTC/monotonic clock reading so that row
+   times are computed as plain floats, and renders local time only when rows
+   are written out.
+"""
+
+from datetime import datetime
+import time
+
+
+class SampleClock:
+    """UTC epoch timestamps from a single anchor plus sample index or monotonic delta."""
+
+    def __init__(self, hzSample=None):
+        self.hzSample = hzSample
+        self.start()
+
+    def start(self):
+        """Re-anchor; call right when the acquisition that defines sample 0 starts."""
+        self.tMono = time.monotonic()
+        self.tStart = time.time()
+
+    def anchor(self, iSample):
+        """Re-anchor so that hardware sample iSample is now; call right after a read ending there.
+
+        Long records re-anchor now and then, so the drift of the sample clock
+        against the wall clock (some ppm) does not add up over weeks.
+        """
+        self.tMono = time.monotonic()
+        self.tStart = time.time() - iSample / self.hzSample
+
+    def index_time(self, iSample):
+        """UTC epoch time of hardware sample iSample; works on numpy arrays too."""
+        return self.tStart + iSample / self.hzSample
+
+    def now(self):
+        """Current UTC epoch time, advanced on the monotonic clock since the anchor."""
+        return self.tStart + (time.monotonic() - self.tMono)
+
+
+class LocalTimeFormatter:
+    """Render UTC epoch floats as local time with microseconds.
+
+    The timezone conversion and strftime run once per distinct second; rows
+    inside the same second only format the microseconds.
+    """
+
+    def __init__(self, tz, fmt="%Y-%m-%d %H:%M:%S"):
+        self.tz = tz
+        self.fmt = fmt
+        self.second = None
+        self.text = ""
+
+    def __call__(self, t):
+        second, us = divmod(round(t * 1e6), 1000000)
+        if second != self.second:
+            self.second = second
+            self.text = datetime.fromtimestamp(second, self.tz).strftime(self.fmt)
+        return "%s.%06d" % (self.text, us)
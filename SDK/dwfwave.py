@@ -0,0 +1,111 @@
+"""
+   DWFWave (streaming RF64 WAV writer)
+   Revision:  2026-10-18
+
+   Requires:
+       Python 3.11, numpy
+   Description:
+   A RIFF WAV file ends at 4 GiB, about 7 hours of mono 16 bit at 80 kHz.
+   WaveWriter reserves the 28 bytes of an RF64 ds64 chunk as a JUNK chunk
+   behind the RIFF header and turns the file into RF64 once the data grows
+   past 4 GiB, so a multi-day capture is one file that readers of plain
+   WAV still open while it is small (EBU Tech 3306).
+   Frames are int16, interleaved for more than one channel, and go from the
+   caller's array to the file without a copy. The sizes in the header are
+   patched in place every secPatch seconds, so a file cut short by a crash
+   or power loss plays up to the last patch. With a dwfrotate
+   RotationPolicy the capture is split into numbered segment files instead.
+"""
+
+import os
+import struct
+import time
+import numpy
+
+_cbHeader = 80 # RIFF 12 + ds64/JUNK 36 + fmt 24 + data header 8
+_cbRiffMax = 0xFFFFFFFF
+
+
+def segment_path(path, iSegment):
+    """path for the first segment, "name.1.wav", "name.2.wav"... for the next ones."""
+    if iSegment == 0:
+        return path
+    root, ext = os.path.splitext(path)
+    return "%s.%d%s" % (root, iSegment, ext)
+
+
+class WaveWriter:
+    """int16 WAV file of cChannels at hz, written as RIFF and promoted to RF64 past 4 GiB.
+
+    writeframes() takes a (frames,) array for mono or a (frames x channels)
+    array, e.g. record.T of a (channels x samples) record; anything not
+    already C-contiguous int16 is converted first.
+    """
+
+    def __init__(self, path, hz, cChannels=1, secPatch=1.0, policy=None):
+        self.path = path
+        self.hz = int(round(hz))
+        self.cChannels = cChannels
+        self.cbFrame = 2 * cChannels
+        self.secPatch = secPatch
+        self.policy = policy
+        self.paths = []
+        self.cFramesTotal = 0
+        self.f = None
+        self._open()
+
+    def _open(self):
+        path = segment_path(self.path, len(self.paths))
+        self.paths.append(path)
+        self.f = open(path, "wb")
+        self.cFrames = 0
+        self.tOpen = time.monotonic()
+        self.tPatch = self.tOpen
+        self.f.write(self._header())
+
+    def _header(self):
+        cbData = self.cFrames * self.cbFrame
+        cbRiff = _cbHeader - 8 + cbData
+        if cbRiff > _cbRiffMax:
+            riff = struct.pack("<4sI4s", b"RF64", _cbRiffMax, b"WAVE")
+            ds64 = struct.pack("<4sIQQQI", b"ds64", 28, cbRiff, cbData, self.cFrames, 0)
+            data = struct.pack("<4sI", b"data", _cbRiffMax)
+        else:
+            riff = struct.pack("<4sI4s", b"RIFF", cbRiff, b"WAVE")
+            ds64 = struct.pack("<4sI28x", b"JUNK", 28)
+            data = struct.pack("<4sI", b"data", cbData)
+        fmt = struct.pack("<4sIHHIIHH", b"fmt ", 16, 1, self.cChannels, self.hz,
+                          self.hz * self.cbFrame, self.cbFrame, 16)
+        return riff + ds64 + fmt + data
+
+    def writeframes(self, frames):
+        frames = numpy.ascontiguousarray(frames, dtype=numpy.int16)
+        cFrames = frames.size // self.cChannels
+        self.f.write(frames)
+        self.cFrames += cFrames
+        self.cFramesTotal += cFrames
+        now = time.monotonic()
+        if self.policy is not None and self.policy.due(self.cFrames * self.cbFrame, now - self.tOpen):
+            self._close()
+            self._open()
+        elif now - self.tPatch >= self.secPatch:
+            self.patch()
+
+    def patch(self):
+        """Write the sizes of the frames so far into the header; the data goes to the OS first."""
+        self.f.flush()
+        self.f.seek(0)
+        self.f.write(self._header())
+        self.f.seek(0, os.SEEK_END)
+        self.f.flush()
+        self.tPatch = time.monotonic()
+
+    def _close(self):
+        self.patch()
+        self.f.close()
+
+    def close(self):
+        if self.f is None:
+            return
+        self._close()
+        self.f = None
@@ -0,0 +1,193 @@
+"""
+   DWFWriter (background batched CSV writer)
+   Revision:  2026-10-18
+
+   Requires:
+       Python 3.11
+   Description:
+   The acquisition loop only enqueues captured rows; a writer thread formats
+   them, writes them in batches and flushes on batch size or elapsed time.
+   ChunkWriter does the same for raw sample buffers of a dwfbuffers
+   BufferPool, so a slow disk flush never delays the next status poll.
+"""
+
+import csv
+import queue
+import threading
+import time
+
+try:
+    from SDK.dwfprofile import section
+except ImportError:
+    from dwfprofile import section
+
+_stop = object()
+
+
+class BatchedWriter:
+    """Bounded producer/consumer queue in front of a csv.writer.
+
+    format_row runs on the writer thread and turns a queued item into a csv
+    row, so timestamp formatting and console output stay off the acquisition
+    thread. put() blocks when maxQueue rows are waiting instead of dropping.
+    An exception from format_row or the file is raised by the next put() or
+    close(); the thread keeps draining the queue meanwhile, so neither hangs.
+    """
+
+    def __init__(self, f, format_row=None, maxQueue=10000, cBatch=256, secFlush=1.0):
+        self.f = f
+        self.writer = csv.writer(f)
+        self.format_row = format_row
+        self.cBatch = cBatch
+        self.secFlush = secFlush
+        self.queue = queue.Queue(maxQueue)
+        self.error = None
+        self.maxDepth = 0
+        self.cWritten = 0
+        self.thread = threading.Thread(target=self._run, name="BatchedWriter", daemon=True)
+        self.thread.start()
+
+    def put(self, row):
+        if self.error is not None:
+            raise self.error
+        self.queue.put(row)
+        depth = self.queue.qsize()
+        if depth > self.maxDepth:
+            self.maxDepth = depth
+
+    def depth(self):
+        """Number of rows waiting to be written."""
+        return self.queue.qsize()
+
+    def close(self):
+        """Write everything still queued and stop the writer thread."""
+        self.queue.put(_stop)
+        self.thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def _run(self):
+        batch = []
+        deadline = time.monotonic() + self.secFlush
+        fStop = False
+        while not fStop:
+            try:
+                row = self.queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                pass
+            else:
+                while row is not _stop:
+                    batch.append(row)
+                    if len(batch) >= self.cBatch:
+                        break
+                    try:
+                        row = self.queue.get_nowait()
+                    except queue.Empty:
+                        break
+                fStop = row is _stop
+
+            if fStop or len(batch) >= self.cBatch or time.monotonic() >= deadline:
+                try:
+                    if self.error is None:
+                        self._flush(batch)
+                except Exception as e:
+                    # raised on the acquisition thread by the next put() or close()
+                    self.error = e
+                batch = []
+                deadline = time.monotonic() + self.secFlush
+
+    def _flush(self, batch):
+        with section("BatchedWriter.flush"):
+            if batch:
+                if self.format_row is not None:
+                    batch = [self.format_row(row) for row in batch]
+                self.writer.writerows(batch)
+                self.cWritten += len(batch)
+            self.f.flush()
+
+
+class ChunkWriter:
+    """Writer thread for the buffers of a dwfbuffers.BufferPool.
+
+    The acquisition thread reads into a buffer from acquire(), hands it over
+    with put(buffer, cItems) and goes back to polling; the writer thread
+    calls write(array[:cItems]) and returns the buffer to the pool. When the
+    disk falls behind, all buffers end up queued and acquire() waits: that
+    back-pressure is counted, as is the most buffers queued at once, and
+    interval_stats() hands both out per reporting interval.
+    """
+
+    def __init__(self, write, pool):
+        self.write = write
+        self.pool = pool
+        self.queue = queue.Queue()
+        self.error = None
+        self.cWritten = 0
+        self.cBuffers = len(pool.buffers)
+        # per interval, reset by interval_stats()
+        self.maxQueued = 0
+        self.cWaits = 0
+        self.secWaited = 0.0
+        self.secWriteMax = 0.0
+        self.thread = threading.Thread(target=self._run, name="ChunkWriter", daemon=True)
+        self.thread.start()
+
+    def acquire(self):
+        """A free buffer; blocks, and counts it, while the writer is behind."""
+        if self.error is not None:
+            raise self.error
+        with self.pool.cond:
+            fFree = bool(self.pool.free)
+        if fFree:
+            return self.pool.acquire()
+        t = time.perf_counter()
+        buffer = self.pool.acquire()
+        self.cWaits += 1
+        self.secWaited += time.perf_counter() - t
+        return buffer
+
+    def put(self, buffer, cItems):
+        self.queue.put((buffer, cItems))
+        depth = self.queue.qsize()
+        if depth > self.maxQueued:
+            self.maxQueued = depth
+
+    def depth(self):
+        """Number of buffers waiting to be written."""
+        return self.queue.qsize()
+
+    def interval_stats(self):
+        """Queue high-water mark, back-pressure waits and slowest write since the last call."""
+        stats = {"maxQueued": self.maxQueued, "cBuffers": self.cBuffers, "cWaits": self.cWaits,
+                 "secWaited": self.secWaited, "secWriteMax": self.secWriteMax, "cWritten": self.cWritten}
+        self.maxQueued = self.queue.qsize()
+        self.cWaits = 0
+        self.secWaited = 0.0
+        self.secWriteMax = 0.0
+        return stats
+
+    def close(self):
+        """Write everything still queued and stop the writer thread."""
+        self.queue.put(_stop)
+        self.thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is _stop:
+                return
+            buffer, cItems = item
+            try:
+                if self.error is None:
+                    t = time.perf_counter()
+                    with section("ChunkWriter.write"):
+                        self.write(buffer.array[:cItems])
+                    self.secWriteMax = max(self.secWriteMax, time.perf_counter() - t)
+                    self.cWritten += cItems
+            except Exception as e:
+                # raised on the acquisition thread by the next acquire() or close()
+                self.error = e
+            finally:
+                self.pool.release(buffer)
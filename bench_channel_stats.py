@@ -0,0 +1,57 @@
+"""
+   Channel statistics micro-benchmark
+   Revision:  2026-10-18
+
+   Requires:
+       Python 3.11, numpy
+   Description:
+   Compares the per-sample Python loops the loggers used for DC, DC-RMS and
+   AC-RMS against SDK/dwfstats.py on a ctypes buffer, and prints samples/s.
+   Usage: py ./bench_channel_stats.py
+"""
+
+from ctypes import *
+from SDK.dwfstats import as_array, channel_stats
+import math
+import random
+import time
+
+def legacy_stats(rgdSamples, nSamples):
+    dc = 0
+    for i in range(nSamples):
+        dc += rgdSamples[i]
+    dc /= nSamples
+    dcrms = 0
+    acrms = 0
+    for i in range(nSamples):
+        dcrms += rgdSamples[i] ** 2
+        acrms += (rgdSamples[i]-dc) ** 2
+    dcrms = math.sqrt(dcrms / nSamples)
+    acrms = math.sqrt(acrms / nSamples)
+    return dc, dcrms, acrms
+
+def vectorized_stats(rgdSamples, nSamples):
+    return channel_stats(as_array(rgdSamples, nSamples))
+
+def samples_per_second(fn, rgdSamples, nSamples, secRun=0.5):
+    cRuns = 0
+    start = time.perf_counter()
+    while True:
+        fn(rgdSamples, nSamples)
+        cRuns += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= secRun:
+            return cRuns * nSamples / elapsed
+
+print(f"{'samples':>8} {'loop S/s':>14} {'numpy S/s':>14} {'speedup':>8}")
+for nSamples in (10, 100, 1000, 8000, 100000):
+    rgdSamples = (c_double*nSamples)(*(3.6 + random.gauss(0, 0.01) for _ in range(nSamples)))
+
+    before = legacy_stats(rgdSamples, nSamples)
+    after = vectorized_stats(rgdSamples, nSamples)
+    assert math.isclose(before[0], after.mean) and math.isclose(before[1], after.rms)
+    assert math.isclose(before[2], after.acrms, rel_tol=1e-6)
+
+    loop = samples_per_second(legacy_stats, rgdSamples, nSamples)
+    vec = samples_per_second(vectorized_stats, rgdSamples, nSamples)
+    print(f"{nSamples:>8} {loop:>14,.0f} {vec:>14,.0f} {vec/loop:>7.1f}x")
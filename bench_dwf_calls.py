@@ -0,0 +1,74 @@
+"""
+   FDwf per-call overhead micro-benchmark
+   Revision:  2026-10-18
+
+   Requires:
+       Python 3.11, WaveForms runtime
+   Description:
+   Times one record-loop poll (FDwfAnalogInStatus + FDwfAnalogInStatusRecord)
+   the way the scripts call it, with fresh c_int()/byref() objects, against
+   preallocated out-parameters on SDK/dwfbind.py's plain and prototyped
+   handles, and what SDK/dwfprofile.py adds to the plain handle when
+   DWF_PROFILE is set. No device is needed: with a closed handle the runtime returns at
+   once, so what is left is the binding overhead.
+   Usage: py ./bench_dwf_calls.py
+"""
+
+from ctypes import *
+from SDK.dwfbind import api, dwf
+from SDK.dwfprofile import Profiler
+import time
+
+hdwf = c_int(0) # no device opened; hdwfNone
+
+def legacy_poll(hdwf):
+    sts = c_byte()
+    cAvailable = c_int()
+    cLost = c_int()
+    cCorrupted = c_int()
+    dwf.FDwfAnalogInStatus(hdwf, c_int(1), byref(sts))
+    dwf.FDwfAnalogInStatusRecord(hdwf, byref(cAvailable), byref(cLost), byref(cCorrupted))
+
+sts = c_ubyte()
+cAvailable = c_int()
+cLost = c_int()
+cCorrupted = c_int()
+pSts = byref(sts)
+pAvailable = byref(cAvailable)
+pLost = byref(cLost)
+pCorrupted = byref(cCorrupted)
+
+def prototyped_poll(hdwf):
+    api.FDwfAnalogInStatus(hdwf, 1, pSts)
+    api.FDwfAnalogInStatusRecord(hdwf, pAvailable, pLost, pCorrupted)
+
+def preallocated_poll(hdwf):
+    # what dwfrecord.AnalogInRecord.read does
+    dwf.FDwfAnalogInStatus(hdwf, 1, pSts)
+    dwf.FDwfAnalogInStatusRecord(hdwf, pAvailable, pLost, pCorrupted)
+
+profiled = Profiler().wrap(dwf)
+
+def profiled_poll(hdwf):
+    profiled.FDwfAnalogInStatus(hdwf, 1, pSts)
+    profiled.FDwfAnalogInStatusRecord(hdwf, pAvailable, pLost, pCorrupted)
+
+def ns_per_call(fn, hdwf, secRun=1.0):
+    cRuns = 0
+    start = time.perf_counter()
+    while True:
+        for _ in range(1000):
+            fn(hdwf)
+        cRuns += 1000
+        elapsed = time.perf_counter() - start
+        if elapsed >= secRun:
+            return elapsed / cRuns * 1e9
+
+legacy = ns_per_call(legacy_poll, hdwf)
+print(f"{'poll':<28} {'ns/poll':>9} {'speedup':>8}")
+print(f"{'legacy c_int()/byref()':<28} {legacy:>9,.0f} {1:>7.1f}x")
+for name, fn in (("prototyped, preallocated", prototyped_poll),
+                 ("plain, preallocated", preallocated_poll),
+                 ("plain, profiled", profiled_poll)):
+    ns = ns_per_call(fn, hdwf.value)
+    print(f"{name:<28} {ns:>9,.0f} {legacy/ns:>7.1f}x")
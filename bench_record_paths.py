@@ -0,0 +1,214 @@
+"""
+   Record/stream path throughput benchmark
+   Revision:  2026-10-18
+
+   Requires:
+       Python 3.11, numpy, matplotlib
+   Description:
+   Runs the record and stream examples of SDK/ unchanged against the
+   simulated runtime (SDK/dwfsim.py) with realtime off, so every status poll
+   hands over a full chunk and the scripts go as fast as the host lets them.
+   For each path it reports host samples/s, CPU seconds per million samples
+   (the simulator's own sample generation taken out), peak RSS and the time
+   between chunks, and writes the results as JSON with the commit they were
+   measured on. Compare two result files to spot regressions.
+   A raw DigitalIn capture can be replayed instead of the generated pattern
+   with --replay (e.g. record.bin of DigitalDiscovery_RecordToFile16.py).
+   Usage: py ./bench_record_paths.py [--only NAME] [--repeat N] [--out FILE]
+          py ./bench_record_paths.py --compare OLD.json NEW.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:
+    # not on Windows, the simulator's own peak RSS is reported there
+    resource = None
+
+SDK = os.path.join(os.path.dirname(os.path.abspath(__file__)), "SDK")
+
+DIGITAL_DISCOVERY = {"name": "Digital Discovery", "serial": "SIM000000004", "devId": 4, "devRev": 1}
+
+# name: (script, simulator settings)
+BENCHMARKS = {
+    "AnalogIn_Record": ("AnalogIn_Record.py", {}),
+    "AnalogIn_Record_int16": ("AnalogIn_Record_int16.py", {}),
+    "AnalogIn_Record_Wave_Mono": ("AnalogIn_Record_Wave_Mono.py", {}),
+    "DigitalIn_Record": ("DigitalIn_Record.py", {}),
+    # records until the capture runs out, 2 x 20 MB
+    "DigitalDiscovery_RecordToFile16": ("DigitalDiscovery_RecordToFile16.py",
+        {"devices": [DIGITAL_DISCOVERY], "chunk": 1 << 20, "samplesMax": 20_000_000}),
+    # records until Ctrl+C, which the simulator sends when the capture runs out
+    "DigitalIn_Spi_Spy": ("DigitalIn_Spi_Spy.py",
+        {"digital": {"pattern": "spi", "spiBytes": 4}, "samplesMax": 2_000_000, "interrupt": True}),
+}
+
+# metrics compared between result files; True where higher is better
+METRICS = {
+    "samplesPerSec": True,
+    "cpuPerMS": False,
+    "peakRssMB": False,
+    "msChunkP50": False,
+    "msChunkP99": False,
+}
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(SDK),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_script(script, config, secTimeout):
+    """Run one script on the simulator in a scratch directory, return its measurements."""
+    with tempfile.TemporaryDirectory(prefix="bench_") as tmp:
+        config = dict(config, realtime=False, stats=os.path.join(tmp, "stats.json"))
+        env = dict(os.environ, DWF_BACKEND="sim", DWF_SIM=json.dumps(config), MPLBACKEND="Agg")
+        with open(os.path.join(tmp, "output.txt"), "w+") as log:
+            start = time.perf_counter()
+            proc = subprocess.Popen([sys.executable, os.path.join(SDK, script)], cwd=tmp, env=env,
+                                    stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT)
+            maxRss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss if resource else None
+            try:
+                proc.wait(secTimeout)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+            secTotal = time.perf_counter() - start
+            if resource:
+                # the maximum over all children only moves when this one peaked above the ones before
+                maxRssAfter = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+                maxRss = maxRssAfter if maxRssAfter > maxRss else None
+            log.seek(0)
+            output = log.read()
+
+        if proc.returncode != 0:
+            raise RuntimeError(script + " exited with " + str(proc.returncode) + ":\n" + output[-2000:])
+        try:
+            with open(config["stats"]) as f:
+                runs = json.load(f)["runs"]
+        except FileNotFoundError:
+            raise RuntimeError(script + " wrote no stats:\n" + output[-2000:])
+
+    # the record/stream acquisition is the one that moved the most samples
+    stats = max(runs, key=lambda run: run["cSamples"])
+    cSamples = stats["cSamples"]
+    secHost = stats["secWall"] - stats["secBackend"]
+    cpuHost = stats["secCpu"] - stats["cpuBackend"]
+    peakRss = maxRss * (1 if sys.platform == "darwin" else 1024) if maxRss else stats["peakRss"]
+    return {
+        "samples": cSamples,
+        "lost": stats["cLost"],
+        "corrupted": stats["cCorrupted"],
+        "chunks": stats["cChunks"],
+        "polls": stats["cPolls"],
+        "samplesPerSec": cSamples / secHost if secHost > 0 else None,
+        "cpuPerMS": cpuHost / cSamples * 1e6 if cSamples else None,
+        "backendShare": stats["secBackend"] / stats["secWall"] if stats["secWall"] > 0 else None,
+        "peakRssMB": peakRss / (1 << 20) if peakRss else None,
+        "msChunkMean": stats["secChunk"]["mean"] * 1e3 if stats["cChunks"] else None,
+        "msChunkP50": stats["secChunk"]["p50"] * 1e3 if stats["cChunks"] else None,
+        "msChunkP99": stats["secChunk"]["p99"] * 1e3 if stats["cChunks"] else None,
+        "msChunkMax": stats["secChunk"]["max"] * 1e3 if stats["cChunks"] else None,
+        "secAcquisition": stats["secWall"],
+        "secTotal": secTotal,
+    }
+
+def median_run(runs):
+    """Median of every metric over the repeats."""
+    result = {}
+    for key in runs[0]:
+        values = [run[key] for run in runs if run[key] is not None]
+        result[key] = statistics.median(values) if values else None
+    return result
+
+def run_benchmarks(names, repeat, replay, secTimeout):
+    results = {}
+    for name in names:
+        script, config = BENCHMARKS[name]
+        if replay and name != "DigitalIn_Spi_Spy":
+            config = dict(config, digital={"pattern": "replay", "path": os.path.abspath(replay["path"]), "bits": replay["bits"]})
+        print(f"{name}...", end="", flush=True)
+        try:
+            runs = [run_script(script, config, secTimeout) for _ in range(repeat)]
+        except RuntimeError as e:
+            print(" failed")
+            print(e)
+            results[name] = {"script": script, "error": str(e)}
+            continue
+        results[name] = dict(median_run(runs), script=script, runs=runs)
+        print(f" {results[name]['samplesPerSec']/1e6:.2f} MS/s")
+    return results
+
+def print_results(results):
+    print(f"{'path':<34} {'MS/s':>8} {'CPU s/MS':>9} {'RSS MB':>8} {'chunk p50':>10} {'p99 ms':>8} {'lost':>8}")
+    for name, result in results.items():
+        if "error" in result:
+            print(f"{name:<34} failed")
+            continue
+        print(f"{name:<34} {result['samplesPerSec']/1e6:>8.2f} {result['cpuPerMS']:>9.3f} "
+              f"{result['peakRssMB'] or 0:>8.0f} {result['msChunkP50']:>10.3f} {result['msChunkP99']:>8.3f} {result['lost']:>8.0f}")
+
+def compare(pathOld, pathNew, tolerance):
+    with open(pathOld) as f:
+        old = json.load(f)
+    with open(pathNew) as f:
+        new = json.load(f)
+    print(f"{old.get('commit')} -> {new.get('commit')}")
+    cRegressions = 0
+    for name, result in new["results"].items():
+        before = old["results"].get(name)
+        if before is None or "error" in before or "error" in result:
+            continue
+        for metric, fHigherBetter in METRICS.items():
+            a = before.get(metric)
+            b = result.get(metric)
+            if not a or b is None:
+                continue
+            change = b / a - 1
+            fWorse = change < -tolerance if fHigherBetter else change > tolerance
+            cRegressions += fWorse
+            print(f"{name:<34} {metric:<14} {a:>12.4g} {b:>12.4g} {change:>+8.1%}{'  REGRESSION' if fWorse else ''}")
+    return cRegressions
+
+parser = argparse.ArgumentParser(description="Throughput of the SDK record/stream examples on the simulated runtime.")
+parser.add_argument("--only", action="append", choices=sorted(BENCHMARKS), help="run only this path, may be repeated")
+parser.add_argument("--repeat", type=int, default=3, help="runs per path, the median is reported; the short paths need a few")
+parser.add_argument("--out", default="bench_record_paths.json", help="result file")
+parser.add_argument("--replay", metavar="FILE", help="raw DigitalIn capture to replay instead of the generated pattern")
+parser.add_argument("--bits", type=int, default=16, choices=(8, 16, 32), help="bits per sample of the --replay capture")
+parser.add_argument("--timeout", type=float, default=600, help="seconds before a script is killed")
+parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files instead of running")
+parser.add_argument("--tolerance", type=float, default=0.1, help="relative change reported as a regression")
+args = parser.parse_args()
+
+if args.compare:
+    sys.exit(1 if compare(*args.compare, args.tolerance) else 0)
+
+replay = {"path": args.replay, "bits": args.bits} if args.replay else None
+results = run_benchmarks(args.only or list(BENCHMARKS), args.repeat, replay, args.timeout)
+print_results(results)
+
+report = {
+    "commit": git_commit(),
+    "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    "python": platform.python_version(),
+    "platform": platform.platform(),
+    "machine": platform.machine(),
+    "cpus": os.cpu_count(),
+    "repeat": args.repeat,
+    "replay": replay,
+    "results": results,
+}
+with open(args.out, "w") as f:
+    json.dump(report, f, indent=1)
+print("results written to " + args.out)
@@ -0,0 +1,154 @@
+"""
+   Multi-device logger
+   Revision:  2026-10-18
+
+   Requires:
+       Python 3.11, numpy, pytz
+   Description:
+   Logs every connected Analog Discovery in parallel. Each device gets its own
+   worker process, opened by serial number, that records both channels at
+   hzAcq, averages nSamples per row and writes rotating session files to
+   ./data/<serial>/. The supervisor restarts workers that exit, e.g. after a
+   device was unplugged, and prints the aggregate throughput and lost-sample
+   counts, also kept in ./data/devices.json.
+   Usage: py ./log_multi_device.py [--serial 210321A5C2F1 --serial 210321A5C3E0]
+"""
+
+from ctypes import *
+from SDK.dwfbind import dwf
+from SDK.dwfdevices import WorkerSupervisor, enumerate_devices, open_by_serial, report
+from SDK.dwfrecord import AnalogInRecord, Decimator
+from SDK.dwfsession import session_header
+from SDK.dwfstats import stats_to_volts
+from SDK.dwfrotate import RotatingSession, RotationPolicy, SegmentCompressor
+from SDK.dwftime import SampleClock
+from datetime import datetime
+import argparse
+import json
+import os
+import pytz
+import sys
+import threading
+import time
+
+parser = argparse.ArgumentParser(description="Log several devices in parallel")
+parser.add_argument("--serial", action="append", help="serial number to log, default every free device; repeat for more")
+parser.add_argument("--worker", metavar="SERIAL", help=argparse.SUPPRESS)
+args = parser.parse_args()
+
+secLog = .001 # logging rate in seconds
+nSamples = 10 # hardware samples averaged into each logged row
+hzAcq = nSamples/secLog # hardware-clocked record rate per channel
+secReport = 1.0 # status interval of workers and supervisor
+secRestart = 5.0 # wait before starting an exited worker again
+
+tz_JKT = pytz.timezone('Asia/Jakarta')
+
+
+def run_worker(serial):
+    """Record one device until stdin is closed or Ctrl+C."""
+    hdwf = open_by_serial(dwf, serial)
+    directory = os.path.join('./data', serial)
+    os.makedirs(directory, exist_ok=True)
+
+    #set up acquisition
+    record = AnalogInRecord(dwf, hdwf, hzAcq, channels=(0, 1), fReuse=True) # chunks are views of one reused block
+    record.configure()
+    dwf.FDwfAnalogInChannelRangeSet(hdwf, c_int(0), c_double(5))
+    dwf.FDwfAnalogInChannelRangeSet(hdwf, c_int(1), c_double(5))
+
+    #wait at least 2 seconds for the offset to stabilize
+    time.sleep(2)
+
+    # the supervisor closes our stdin to stop us
+    stop = threading.Event()
+    def wait_stdin():
+        for line in sys.stdin:
+            pass
+        stop.set()
+    threading.Thread(target=wait_stdin, daemon=True).start()
+
+    compressor = SegmentCompressor(directory)
+    decimator = Decimator(nSamples, len(record.channels))
+
+    record.start()
+    clock = SampleClock(record.hzAcq)
+
+    header = session_header(record.hzAcq/nSamples, record.channel_settings(), tz=tz_JKT.zone, tStart=clock.tStart, hzAcq=record.hzAcq, serial=serial)
+    session = RotatingSession(directory, " batt_log.dwfs", header, RotationPolicy(256 << 20, 3600), tz_JKT, compressor)
+
+    cSamples = 0
+    cLost = 0
+    cCorrupted = 0
+    tReport = time.monotonic()
+
+    try:
+        while not stop.is_set():
+            chunk = record.read()
+
+            if chunk is None or (chunk.samples.shape[1] == 0 and not chunk.cLost):
+                time.sleep(secLog)
+                continue
+
+            cSamples += chunk.samples.shape[1]
+            cLost += chunk.cLost
+            cCorrupted += chunk.cCorrupted
+
+            # stats of the ADC codes, scaled to volts only for the averaged rows
+            iFirst, stats = decimator.push(chunk)
+            stats = stats_to_volts(stats, record.settings)
+            session.append(stats.mean, iFirst // nSamples)
+
+            if time.monotonic() - tReport >= secReport:
+                tReport = time.monotonic()
+                report(cSamples=cSamples, cLost=cLost, cCorrupted=cCorrupted)
+
+    except KeyboardInterrupt:
+        pass
+
+    record.stop()
+    session.close()
+    compressor.close()
+    report(cSamples=cSamples, cLost=cLost, cCorrupted=cCorrupted)
+    dwf.FDwfDeviceClose(hdwf)
+
+
+if args.worker:
+    run_worker(args.worker)
+    sys.exit(0)
+
+version = create_string_buffer(16)
+dwf.FDwfGetVersion(version)
+print("DWF Version: "+str(version.value))
+
+serials = args.serial
+if not serials:
+    serials = [device.serial for device in enumerate_devices(dwf) if not device.fInUse]
+if not serials:
+    print("no free device found")
+    sys.exit(1)
+
+for serial in serials:
+    print("Logging device " + serial)
+
+# one fresh interpreter per device, so no worker waits on another's GIL or USB calls
+supervisor = WorkerSupervisor(serials, lambda serial: [sys.executable, os.path.abspath(__file__), "--worker", serial], secRestart)
+
+try:
+    while True:
+        time.sleep(secReport)
+
+        stats = supervisor.poll()
+
+        print(str(datetime.now(tz_JKT).time())[:8] + f" {stats['cAlive']}/{len(serials)} devices {stats['hz']/1e3:.1f} kS/s lost:{stats['cLost']} corrupted:{stats['cCorrupted']}")
+
+        with open('./data/devices.json.part', "w") as f:
+            json.dump(stats, f, indent=1)
+        os.replace('./data/devices.json.part', './data/devices.json')
+
+except KeyboardInterrupt:
+    pass
+
+supervisor.close()
+
+print("end")
@@ -7,141 +7,155 @@ Code, Compile, Run and Debug online from anywhere in world.
 
 '''
 from ctypes import *
-import math
+from SDK.dwfbind import dwf
+from SDK.dwfrecord import AnalogInRecord, Decimator, clip_chunk
+from SDK.dwfschedule import WindowScheduler
+from SDK.dwfsession import SessionWriter, session_header
+from SDK.dwfstats import stats_to_volts
+from SDK.dwftime import SampleClock
+from SDK.dwfrotate import SegmentCompressor
 from datetime import datetime
+import os
 import time
 import pytz
 import matplotlib.pyplot as plt
 import sys
 import csv
 
-if sys.platform.startswith("win"):
-    dwf = cdll.dwf
-elif sys.platform.startswith("darwin"):
-    dwf = cdll.LoadLibrary("/Library/Frameworks/dwf.framework/dwf")
-else:
-    dwf = cdll.LoadLibrary("libdwf.so")
-    
 hdwf = c_int()
-sts = c_byte()
 secLog = .001 # logging rate in seconds
-nSamples = 10
-rgdSamples = (c_double*nSamples)()
-cValid = c_int(0)
+nSamples = 10 # hardware samples averaged into each logged row
+hzAcq = nSamples/secLog # hardware-clocked record rate per channel
+secWindow = 300 # length of one logging window in seconds
+scheduleSpec = "14,29,44,59 * * * *" # cron-like window starts: minute hour day month weekday
+secLead = 1.0 # stop draining this long before a window, the chunk that crosses its start is clipped
+secDrain = 0.1 # poll period between windows, well inside the device buffer
 
 version = create_string_buffer(16)
 dwf.FDwfGetVersion(version)
 print("DWF Version: "+str(version.value))
 
-print("Opening first device")
-dwf.FDwfDeviceOpen(c_int(-1), byref(hdwf))
+if os.environ.get("DWF_BROKER"):
+    # a running SDK/dwfbroker.py holds the device open and settled
+    from SDK.dwfbroker import BrokerClient
+    print("Leasing a device from the broker")
+    broker = BrokerClient()
+    record = broker.lease(hz=hzAcq, channels=(0, 1), ranges=5)
+    print("Device " + record.serial + " ready after " + str(round(record.secReady, 3)) + " s")
+else:
+    print("Opening first device")
+    dwf.FDwfDeviceOpen(c_int(-1), byref(hdwf))
+
+    if hdwf.value == 0:
+        szerr = create_string_buffer(512)
+        dwf.FDwfGetLastErrorMsg(szerr)
+        print(str(szerr.value))
+        print("failed to open device")
+        quit()
+
+    #set up acquisition
+    record = AnalogInRecord(dwf, hdwf, hzAcq, channels=(0, 1), fReuse=True) # chunks are views of one reused block
+    record.configure()
+    dwf.FDwfAnalogInChannelRangeSet(hdwf, c_int(0), c_double(5))
+    dwf.FDwfAnalogInChannelRangeSet(hdwf, c_int(1), c_double(5))
 
-if hdwf.value == 0:
-    szerr = create_string_buffer(512)
-    dwf.FDwfGetLastErrorMsg(szerr)
-    print(str(szerr.value))
-    print("failed to open device")
-    quit()
+    #wait at least 2 seconds for the offset to stabilize
+    time.sleep(1)
 
 print("Data logging in progress...")
 
-#set up acquisition
-dwf.FDwfAnalogInChannelEnableSet(hdwf, c_int(0), c_bool(True))
-dwf.FDwfAnalogInChannelRangeSet(hdwf, c_int(0), c_double(5))
-dwf.FDwfAnalogInAcquisitionModeSet(hdwf, c_int(1)) #acqmodeScanShift
-dwf.FDwfAnalogInFrequencySet(hdwf, c_double(nSamples/secLog))
-dwf.FDwfAnalogInBufferSizeSet(hdwf, c_int(nSamples))
+tz_JKT = pytz.timezone('Asia/Jakarta')
 
-#wait at least 2 seconds for the offset to stabilize
-time.sleep(1)
+schedule = WindowScheduler(scheduleSpec, secWindow, tz_JKT)
 
-#begin acquisition
-dwf.FDwfAnalogInConfigure(hdwf, c_int(0), c_int(1))
+# every window is one segment; closed ones are compressed by a worker process and listed in ./data/manifest.jsonl
+compressor = SegmentCompressor('./data')
 
-tz_JKT = pytz.timezone('Asia/Jakarta')
+#begin acquisition, the record keeps running between windows so none of them pays a start-up delay
+record.start()
+clock = SampleClock(record.hzAcq) # anchors hardware sample 0 to the wall clock
+session = None
 
 try:
-    # TODO: write code...
     while True:
         
-        init_time = datetime.now(tz_JKT)
-        # print(str(init_time) + "\n")
+        window = schedule.next_window()
+        
+        # the record keeps running between windows, drain it so the wait does not show up as lost samples;
+        # every read re-anchors the sample clock, so its drift against the wall clock does not add up over weeks
+        while time.time() < window.tStart - secLead:
+            record.read()
+            clock.anchor(record.iSample)
+            time.sleep(secDrain)
+        
+        # samples are selected by hardware index, so every full window holds exactly secWindow of data
+        iStart = round((window.tStart - clock.tStart) * record.hzAcq)
+        iEnd = round((window.tEnd - clock.tStart) * record.hzAcq)
+        
+        file_name = (str(datetime.fromtimestamp(window.tStart, tz_JKT))[:19] + ' batt_log' + '.dwfs').replace(":", "_")
+        
+        print("Start logging at " + str(datetime.now(tz_JKT).time())[:8] + (" (catching up a late window)" if window.fLate else ""))
         
-        time.sleep(1)
+        if schedule.cMissed:
+            print(str(schedule.cMissed) + " windows missed so far")
         
-        if datetime.now().minute == 14 or datetime.now().minute == 29 or datetime.now().minute == 44 or datetime.now().minute == 59:
+        cLost = 0
+        cCorrupted = 0
+        
+        decimator = Decimator(nSamples, len(record.channels), iStart)
+        
+        # one float32 column per channel, a row per nSamples hardware samples
+        # export to csv with: py ./session_to_csv.py ./data --start "<local time>" --end "<local time>"
+        header = session_header(record.hzAcq/nSamples, record.channel_settings(), tz=tz_JKT.zone, tStart=clock.index_time(iStart), hzAcq=record.hzAcq)
+        session = SessionWriter('./data/' + file_name, header)
+        
+        while record.iSample < iEnd:
+            chunk = record.read()
             
-            # open the file in the write mode
-            f = open('./data/' + (str(datetime.now(tz_JKT))[:19] + ' batt_log' + '.csv').replace(":", "_"), 'w', newline='')
-
-            # create the csv writer
-            writer = csv.writer(f)
+            if chunk is None or (chunk.samples.shape[1] == 0 and not chunk.cLost):
+                time.sleep(secLog)
+                continue
             
-            print("Start logging at " + str(datetime.now(tz_JKT).time())[:8])
+            # drop what was recorded before the window start and after its end
+            chunk = clip_chunk(chunk, iStart, iEnd)
+            if chunk is None:
+                continue
             
-            data_index = 0
+            cLost += chunk.cLost
+            cCorrupted += chunk.cCorrupted
             
-            while True:
-                data_array = []
-                
-                data_index += 1
-                data_array.append(f"{data_index}")
-                
-                current_time = datetime.now(tz_JKT)
-                # print(str(current_time) + "\n")
-                
-                time_delta = current_time - init_time
-                duration_in_s = time_delta.total_seconds()
+            # stats of the ADC codes, scaled to volts only for the averaged rows
+            iFirst, stats = decimator.push(chunk)
+            stats = stats_to_volts(stats, record.settings)
             
-                time.sleep(secLog)
-                
-                dwf.FDwfAnalogInStatus(hdwf, c_int(1), byref(sts))
-                dwf.FDwfAnalogInStatusSamplesValid(hdwf, byref(cValid))
-                
-                for iChannel in range(2):
-                    dwf.FDwfAnalogInStatusData(hdwf, c_int(iChannel), byref(rgdSamples), cValid) # get channel 1 data
-                    
-                    dc = 0
-                    
-                    for i in range(nSamples):
-                        dc += rgdSamples[i]
-                    
-                    dc /= nSamples
-                    
-                    dcrms = 0
-                    acrms = 0
-                    
-                    for i in range(nSamples):
-                        dcrms += rgdSamples[i] ** 2
-                        acrms += (rgdSamples[i]-dc) ** 2
-                    
-                    dcrms /= nSamples
-                    dcrms = math.sqrt(dcrms)
-                    
-                    acrms /= nSamples
-                    acrms = math.sqrt(acrms)
-                    
-                    # print(f"CH:{iChannel+1} DC:{dc:.3f}V DCRMS:{dcrms:.3f}V ACRMS:{acrms:.3f}V")
-                    
-                    # dc = dc * 10
-                    
-                    data_array.append(f"{dc:.3f}")
-                    
-                # write a row to the csv file
-                writer.writerow(data_array)
+            # print(f"DC:{stats.mean[:, -1]} DCRMS:{stats.rms[:, -1]} ACRMS:{stats.acrms[:, -1]}")
             
-                if duration_in_s > 300:
-                    print("Log saved at " + str(datetime.now(tz_JKT).time())[:8])                    
-                    
-                    # close the file
-                    f.close()
-                    
-                    break
+            # append the averaged rows to the session file
+            session.append(stats.mean, (iFirst - iStart) // nSamples)
+        
+        print("Log saved at " + str(datetime.now(tz_JKT).time())[:8])
+        
+        if cLost or cCorrupted:
+            print(f"Window had {cLost} lost and {cCorrupted} corrupted samples! Reduce frequency")
+        
+        # close the file and hand it to the compressor
+        session.close()
+        compressor.submit(session.path, *session.time_range())
+        session = None
     
 except KeyboardInterrupt:
     pass
 
-dwf.FDwfAnalogOutConfigure(hdwf, c_int(0), c_bool(False))
-dwf.FDwfDeviceCloseAll()
+finally:
+    # a window cut short is kept up to the last chunk instead of being left as .part
+    if session is not None:
+        session.close()
+        compressor.submit(session.path, *session.time_range())
+
+record.stop()
+compressor.close()
+if hdwf.value:
+    dwf.FDwfAnalogOutConfigure(hdwf, c_int(0), c_bool(False))
+    dwf.FDwfDeviceCloseAll()
 
-print("end")
+print("end")
\ No newline at end of file
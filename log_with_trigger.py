@@ -8,26 +8,29 @@
 """
 
 from ctypes import *
+from SDK.dwfbind import dwf
+from SDK.dwfconfig import device_config
 from SDK.dwfconstants import *
+from SDK.dwfstats import channel_stats, to_codes, to_volts
+from SDK.dwfwriter import BatchedWriter
+from SDK.dwfrecord import AnalogInRecord, ChannelFetch, channel_settings, place_trigger, trigger_tick
+from SDK.dwfsegments import SegmentCapture
+from SDK.dwfsession import session_header
+from SDK.dwfrotate import RotatingFile, RotatingSession, RotationPolicy, SegmentCompressor
+from SDK.dwftime import SampleClock, LocalTimeFormatter
 from datetime import datetime
 import math
+import os
 import time
 import sys
 import csv
 import pytz
 # import matplotlib.pyplot as plt
-# import numpy
+import numpy
 
 level_trigger_choosed = 0
 last_state = 0
 
-if sys.platform.startswith("win"):
-    dwf = cdll.dwf
-elif sys.platform.startswith("darwin"):
-    dwf = cdll.LoadLibrary("/Library/Frameworks/dwf.framework/dwf")
-else:
-    dwf = cdll.LoadLibrary("libdwf.so")
-
 print("####################### Log Data with Edge Trigger Type #####################")
 
 try:
@@ -37,6 +40,13 @@ except ValueError:
     print("Invalid Value, Exit")
     sys.exit(1)
 
+try:
+    hysteresis = input("Insert the trigger hysteresis in Volt (float number, Enter for 0.05):  ")
+    hysteresis = float(hysteresis) if hysteresis.strip() else 0.05
+except ValueError:
+    print("Invalid Value, Exit")
+    sys.exit(1)
+
 try:
     slopetype = int(input("Insert the desired slope type: \n \
                           0 - Rising Event \n \
@@ -51,19 +61,36 @@ if slopetype > 2 or slopetype < 0:
     print("Invalid Value, Exit")
     sys.exit(1)
 
+try:
+    capturemode = int(input("Insert the desired capture mode: \n \
+                          0 - One acquisition per hardware trigger \n \
+                          1 - Segmented, continuous record with software trigger \n \
+                          Value Choosed (0-1):  "))
+except ValueError:
+    print("Invalid Value, Exit")
+    sys.exit(1)
+
+if capturemode > 1 or capturemode < 0:
+    print("Invalid Value, Exit")
+    sys.exit(1)
+
 
 
 level_trigger_choosed = round(level_trigger_choosed, 2)
 
-print("Trigger level selcted: " + str(level_trigger_choosed) + "V")
+print("Trigger level selcted: " + str(level_trigger_choosed) + "V, hysteresis " + str(hysteresis) + "V")
 
 hdwf = c_int()
 sts = c_byte()
 secLog = .01 # logging rate in seconds
 nSamples = 10
-rgdSamples = (c_double*nSamples)()
 cValid = c_int(0)
 
+# segmented capture mode
+hzRecord = 100000 # continuous record rate per channel
+cPre = int(secLog*hzRecord) # samples saved before each trigger
+cPost = int(secLog*hzRecord) # samples saved after each trigger, averaged into the csv row
+
 version = create_string_buffer(16)
 dwf.FDwfGetVersion(version)
 print("DWF Version: "+str(version.value))
@@ -74,31 +101,54 @@ dwf.FDwfDeviceOpen(c_int(-1), byref(hdwf))
 #dwf.FDwfDeviceConfigOpen(c_int(-1), c_int(1), byref(hdwf)) 
 
 def power_off_device():
-    # close the file
-    f.close()
-    print("Log saved with name " + file_name + " at ./data folder")
-    dwf.FDwfAnalogOutConfigure(hdwf, c_int(0), c_bool(False))
-    dwf.FDwfDeviceCloseAll()
+    try:
+        # write the queued rows; a writer error is raised once everything below is closed
+        log_writer.close()
+    finally:
+        f.close()
+        if capturemode == 1:
+            session.close()
+            print("Segments saved, " + str(segments.cDropped) + " events dropped")
+        # wait for the last segments to be compressed
+        compressor.close()
+        dwf.FDwfAnalogOutConfigure(hdwf, c_int(0), c_bool(False))
+        dwf.FDwfDeviceCloseAll()
+    print("Rows written: " + str(log_writer.cWritten) + ", max queue depth: " + str(log_writer.maxDepth))
+    print("Log saved, segments are listed in ./data/manifest.jsonl")
 
 def start_logging():
-    data_array = []
-    meas_time = datetime.now(tz_JKT).strftime("%y/%m/%d %H:%M:%S")
-    data_array.append(f"{meas_time}")
+    # capture only: formatting, printing and writing happen on the writer thread
+    global clock
     
     dwf.FDwfAnalogInStatus(hdwf, c_int(1), byref(sts))
     dwf.FDwfAnalogInStatusSamplesValid(hdwf, byref(cValid))
     
-    for channel in range(2):
-        dwf.FDwfAnalogInStatusData(hdwf, channel, byref(rgdSamples), nSamples) # get value each channel
-        
-        dc = sum(rgdSamples)/len(rgdSamples)
-        dc = round(dc, 2)
+    # rows are stamped with the trigger on the device clock, not when the host got to them
+    iTick, hzTick = trigger_tick(dwf, hdwf)
+    if clock is None:
+        # the first capture anchors the device clock, it was done secLog after its trigger
+        clock = SampleClock(hzTick)
+        clock.anchor(iTick + round(secLog * hzTick))
+    meas_time = clock.index_time(iTick)
+    
+    # int16 codes of both channels in one block, scaled to volts on the writer thread
+    data_array = channel_stats(fetch.fetch(nSamples, iFetch)).mean.tolist()
+
+    log_writer.put((meas_time, data_array))
+
+def format_row(row):
+    meas_time, data_array = row
+    meas_time = format_time(meas_time)
+    csv_row = [f"{meas_time}"]
+    
+    # average ADC codes of each channel to volts
+    for channel, dc in enumerate(to_volts(numpy.array(data_array)[:, None], settings)[:, 0]):
+        dc = round(float(dc), 2)
 
         print("Acq ch" + str(channel) + " at "+str(meas_time)+" average: "+ str(dc) +"V")
-        # break
-        data_array.append(f"{dc}")
+        csv_row.append(f"{dc}")
 
-    writer.writerow(data_array)
+    return csv_row
 
 if hdwf.value == hdwfNone.value:
     szError = create_string_buffer(512)
@@ -117,79 +167,129 @@ dwf.FDwfAnalogOutNodeAmplitudeSet(hdwf, c_int(0), c_int(0), c_double(1.0))
 dwf.FDwfAnalogOutConfigure(hdwf, c_int(0), c_bool(True))
 '''
 
-#set up acquisition
-dwf.FDwfAnalogInFrequencySet(hdwf, c_double(nSamples/secLog))
-dwf.FDwfAnalogInBufferSizeSet(hdwf, c_int(nSamples))
+#set up acquisition, only the settings that differ from the device are sent
+cfg = device_config(dwf, hdwf)
 
 #channel 0
-dwf.FDwfAnalogInChannelEnableSet(hdwf, c_int(0), c_bool(True))
-dwf.FDwfAnalogInChannelRangeSet(hdwf, c_int(0), c_double(5))
-dwf.FDwfAnalogInChannelAttenuationSet(hdwf, c_int(0), c_double(10))
+cfg.channel(0, enable=1, range=5, attenuation=10)
 
 #channel 1
-dwf.FDwfAnalogInChannelEnableSet(hdwf, c_int(1), c_bool(True))
-dwf.FDwfAnalogInChannelRangeSet(hdwf, c_int(1), c_double(5))
-dwf.FDwfAnalogInChannelAttenuationSet(hdwf, c_int(1), c_double(10))
-
-######## Use the Analog In Trigger #################
-dwf.FDwfAnalogInTriggerSourceSet(hdwf, trigsrcDetectorAnalogIn) #one of the analog in channels
-
-########### or use trigger from other instruments or external trigger #############
-#dwf.FDwfAnalogInTriggerSourceSet(hdwf, trigsrcExternal1) 
-
-#set up tridwfgger
-dwf.FDwfAnalogInTriggerAutoTimeoutSet(hdwf, c_double(0)) #disable auto trigger
-dwf.FDwfAnalogInTriggerTypeSet(hdwf, trigtypeEdge)
-dwf.FDwfAnalogInTriggerChannelSet(hdwf, c_int(0)) # first channel
-
-dwf.FDwfAnalogInTriggerLevelSet(hdwf, c_double(level_trigger_choosed))
-dwf.FDwfAnalogInTriggerConditionSet(hdwf, c_int(slopetype))
-# dwf.FDwfAnalogInTriggerConditionSet(hdwf, DwfTriggerSlopeEither) 
+cfg.channel(1, enable=1, range=5, attenuation=10)
+
+if capturemode == 0:
+    # one nSamples capture per trigger; segmented mode keeps the device's record buffer
+    cfg.analog_in(frequency=nSamples/secLog, bufferSize=nSamples)
+
+    ######## Use the Analog In Trigger #################
+    cfg.analog_in(triggerSource=trigsrcDetectorAnalogIn) #one of the analog in channels
+
+    ########### or use trigger from other instruments or external trigger #############
+    #cfg.analog_in(triggerSource=trigsrcExternal1)
+
+    #set up tridwfgger
+    cfg.analog_in(triggerAutoTimeout=0, #disable auto trigger
+                  triggerType=trigtypeEdge,
+                  triggerChannel=0, # first channel
+                  triggerLevel=level_trigger_choosed,
+                  triggerHysteresis=hysteresis,
+                  triggerCondition=slopetype)
+    # cfg.analog_in(triggerCondition=DwfTriggerSlopeEither)
+
+    # the buffer holds at least 16 samples, rows average the nSamples that follow the trigger
+    iFetch = place_trigger(dwf, hdwf, cfg, nSamples)
+
+# range, offset and attenuation the ADC codes are scaled with, also stored in the session header
+settings = channel_settings(dwf, hdwf, (0, 1))
+fetch = ChannelFetch(dwf, hdwf, (0, 1), nSamples)
+
+if capturemode == 1:
+    # record both channels continuously and find the trigger crossings on the host
+    record = AnalogInRecord(dwf, hdwf, hzRecord, channels=(0, 1), fReuse=True) # chunks are views of one reused block
+    record.configure(cfg)
+    cfg.analog_in(triggerSource=trigsrcNone)
+    # the trigger compares ADC codes, so level and hysteresis are converted once
+    segments = SegmentCapture(2, 0, to_codes(level_trigger_choosed, settings[0]), slopetype,
+                              hysteresis * 65536 / settings[0]["range"], cPre, cPost)
 
 tz_JKT = pytz.timezone('Asia/Jakarta')
 
 init_time = datetime.now(tz_JKT)
 
-file_name = str(datetime.now(tz_JKT))[:19] + " batt_log.csv"
+# row times are floats from the sample clock, rendered as local time on the writer thread
+format_time = LocalTimeFormatter(tz_JKT, "%y/%m/%d %H:%M:%S")
 
-# open the file in the write mode
+# closed segments are compressed by a worker process and listed in ./data/manifest.jsonl
+compressor = SegmentCompressor('./data')
+
+# open the file in the write mode, a new segment is started every day or 64 MiB
 print("creating file...")
-f = open('./data/' + (file_name).replace(":", "_"), 'w', newline='')
+f = RotatingFile('./data', " batt_log.csv", RotationPolicy(maxBytes=64 << 20, secMax=86400), tz_JKT, compressor)
+file_name = os.path.basename(f.path)
 
 print("file created with name " + file_name + " at ./data folder")
-# create the csv writer
-writer = csv.writer(f)
+# create the batched csv writer, rows are written from a background thread
+log_writer = BatchedWriter(f, format_row)
 
 # wait at least 2 seconds with Analog Discovery for the offset to stabilize, before the first reading after device open or offset/range change
-time.sleep(2)
+# the time spent on setup since then counts
+cfg.settle()
 
-print("Starting repeated acquisitions")
-dwf.FDwfAnalogInConfigure(hdwf, c_bool(False), c_bool(True))
+if capturemode == 1:
+    print("Starting segmented record")
+    record.start()
+    clock = SampleClock(record.hzAcq) # anchors hardware sample 0 to the wall clock
 
-# new acquisition is started automatically after done state
-while True:
-    try:
-        while True:
-            dwf.FDwfAnalogInStatus(hdwf, c_int(1), byref(sts))
-
-            if sts.value == DwfStateDone.value:
-                # dwf.FDwfAnalogInTriggerAutoTimeoutSet(hdwf, c_double(0.001))
-                # dwf.FDwfAnalogInAcquisitionModeSet(hdwf, c_int(1)) #acqmodeScanShift
-                break
-            # continue
-            time.sleep(0.001)
+    # every event is stored as one (channels x cPre+cPost) chunk of ADC codes at its first sample index
+    # a new segment file is started every hour or 256 MiB
+    header = session_header(record.hzAcq, record.settings, dtype="int16", tz=tz_JKT.zone, tStart=clock.tStart, cPre=cPre, cPost=cPost)
+    session = RotatingSession('./data', " batt_segments.dwfs", header, RotationPolicy(maxBytes=256 << 20, secMax=3600), tz_JKT, compressor)
+    print("segments are saved as batt_segments.dwfs files at ./data folder")
+
+try:
+    while capturemode == 1:
+        try:
+            chunk = record.read()
+
+            if chunk is None or (chunk.samples.shape[1] == 0 and not chunk.cLost):
+                time.sleep(0.001)
+                continue
+
+            iTrigger, segment = segments.push(chunk)
+
+            for i in range(len(iTrigger)):
+                session.append(segment[i], int(iTrigger[i]) - cPre)
+                log_writer.put((clock.index_time(iTrigger[i]), segment[i, :, cPre:].mean(axis=1).tolist()))
+
+        except KeyboardInterrupt:
+            break
+
+    if capturemode == 0:
+        print("Starting repeated acquisitions")
+        dwf.FDwfAnalogInConfigure(hdwf, c_bool(False), c_bool(True))
+        clock = None # anchored by the first capture, see start_logging()
+
+    # new acquisition is started automatically after done state
+    while capturemode == 0:
+        try:
+            while True:
+                dwf.FDwfAnalogInStatus(hdwf, c_int(1), byref(sts))
+
+                if sts.value == DwfStateDone.value:
+                    # dwf.FDwfAnalogInTriggerAutoTimeoutSet(hdwf, c_double(0.001))
+                    # dwf.FDwfAnalogInAcquisitionModeSet(hdwf, c_int(1)) #acqmodeScanShift
+                    break
+                # continue
+                time.sleep(0.001)
         
-        start_logging()
+            start_logging()
         
 
-    except KeyboardInterrupt:
-        break
-        # pass
-
-    except dwfercInvalidParameter0:
-        break
-        # pass
+        except KeyboardInterrupt:
+            break
+            # pass
 
-power_off_device()
+finally:
+    # also after an error, e.g. a writer error raised by put()
+    power_off_device()
 
 
@@ -8,13 +8,22 @@
 """
 
 from ctypes import *
+from SDK.dwfbind import dwf
+from SDK.dwfconfig import device_config
+from SDK.dwfrecord import ChannelFetch, channel_settings, place_trigger, trigger_tick
 from SDK.dwfconstants import *
+from SDK.dwfstats import channel_stats, to_volts
+from SDK.dwfwriter import BatchedWriter
+from SDK.dwftime import SampleClock, LocalTimeFormatter
+from SDK.dwfrotate import RotatingFile, RotationPolicy, SegmentCompressor
 from datetime import datetime
 import math
+import os
 import time
 import sys
 import csv
 import pytz
+import numpy
 from termcolor import colored
 
 ########################## VAR DECLARATIONS ############################
@@ -23,12 +32,10 @@ last_state = 0
 dio_used = 0
 pin_masking_bit = 1
 is_triggered = 0
-dwRead = c_uint32()
 hdwf = c_int()
 sts = c_byte()
 secLog = .01 # logging rate in seconds
 nSamples = 10
-rgdSamples = (c_double*nSamples)()
 cValid = c_int(0)
 
 ########################################################################
@@ -36,13 +43,6 @@ cValid = c_int(0)
 
 ################# ANALOG DISCOVERY INITIALIZATION ####################
 
-if sys.platform.startswith("win"):
-    dwf = cdll.dwf
-elif sys.platform.startswith("darwin"):
-    dwf = cdll.LoadLibrary("/Library/Frameworks/dwf.framework/dwf")
-else:
-    dwf = cdll.LoadLibrary("libdwf.so")
-
 print("####################### Log Data with DIO Trigger #####################")
 
 
@@ -98,20 +98,35 @@ print(colored("DIO pin " + str(dio_used) + " is selected with " + \
 
 ########################## DWF CONFIG ###############################
 
-#set up acquisition
-dwf.FDwfAnalogInFrequencySet(hdwf, c_double(nSamples/secLog))
-dwf.FDwfAnalogInBufferSizeSet(hdwf, c_int(nSamples))
-dwf.FDwfAnalogInAcquisitionModeSet(hdwf, c_int(1)) #acqmodeScanShift
+#set up acquisition, one nSamples capture per DIO edge; only the settings that differ from the device are sent
+cfg = device_config(dwf, hdwf)
+cfg.analog_in(frequency=nSamples/secLog, bufferSize=nSamples, acquisitionMode=acqmodeSingle)
 
 #channel 0
-dwf.FDwfAnalogInChannelEnableSet(hdwf, c_int(0), c_bool(True))
-dwf.FDwfAnalogInChannelRangeSet(hdwf, c_int(0), c_double(5))
-dwf.FDwfAnalogInChannelAttenuationSet(hdwf, c_int(0), c_double(10))
+cfg.channel(0, enable=1, range=5, attenuation=10)
 
 #channel 1
-dwf.FDwfAnalogInChannelEnableSet(hdwf, c_int(1), c_bool(True))
-dwf.FDwfAnalogInChannelRangeSet(hdwf, c_int(1), c_double(5))
-dwf.FDwfAnalogInChannelAttenuationSet(hdwf, c_int(1), c_double(10))
+cfg.channel(1, enable=1, range=5, attenuation=10)
+
+######## Use the DigitalIn edge detector as the AnalogIn trigger #################
+# the device watches the pin, so captures start on the real edge and the host only waits for done
+if slopetype == 0: # rising event
+    dwf.FDwfDigitalInTriggerSet(hdwf, c_int(0), c_int(0), c_int(pin_masking_bit), c_int(0))
+else: # falling event
+    dwf.FDwfDigitalInTriggerSet(hdwf, c_int(0), c_int(0), c_int(0), c_int(pin_masking_bit))
+
+# apply the detector settings without starting a DigitalIn acquisition
+dwf.FDwfDigitalInConfigure(hdwf, c_bool(True), c_bool(False))
+
+cfg.analog_in(triggerSource=trigsrcDetectorDigitalIn,
+              triggerAutoTimeout=0) #disable auto trigger
+
+# the buffer holds at least 16 samples, rows average the nSamples that follow the edge
+iFetch = place_trigger(dwf, hdwf, cfg, nSamples)
+
+# range, offset and attenuation the ADC codes are scaled with
+settings = channel_settings(dwf, hdwf, (0, 1))
+fetch = ChannelFetch(dwf, hdwf, (0, 1), nSamples)
 
 ######################################################################
 
@@ -122,88 +137,98 @@ tz_JKT = pytz.timezone('Asia/Jakarta')
 
 init_time = datetime.now(tz_JKT)
 
-file_name = str(init_time)[:19] + " batt_log.csv"
+# row times are floats from the sample clock, rendered as local time on the writer thread
+format_time = LocalTimeFormatter(tz_JKT, "%y/%m/%d %H:%M:%S")
+
+# closed segments are compressed by a worker process and listed in ./data/manifest.jsonl
+compressor = SegmentCompressor('./data')
 
-# open the file in the write mode
+# open the file in the write mode, a new segment is started every day or 64 MiB
 print("creating file...")
-f = open('./data/' + (file_name).replace(":", "_"), 'w', newline='')
+f = RotatingFile('./data', " batt_log.csv", RotationPolicy(maxBytes=64 << 20, secMax=86400), tz_JKT, compressor)
+file_name = os.path.basename(f.path)
 
 print(colored("file created with name " + file_name + " at ./data folder", "green", "on_white"))
-# create the csv writer
-writer = csv.writer(f)
 
 #######################################################################
 
 def power_off_device():
-    # close the file
-    f.close()
-    print(colored("Log saved with name " + file_name + " at ./data folder", "green", "on_white"))
-    dwf.FDwfAnalogOutConfigure(hdwf, c_int(0), c_bool(False))
-    dwf.FDwfDeviceCloseAll()
+    try:
+        # write the queued rows; a writer error is raised once everything below is closed
+        log_writer.close()
+    finally:
+        f.close()
+        # wait for the last segments to be compressed
+        compressor.close()
+        dwf.FDwfAnalogOutConfigure(hdwf, c_int(0), c_bool(False))
+        dwf.FDwfDeviceCloseAll()
+    print("Rows written: " + str(log_writer.cWritten) + ", max queue depth: " + str(log_writer.maxDepth))
+    print(colored("Log saved, segments are listed in ./data/manifest.jsonl", "green", "on_white"))
 
 def start_logging():
-    data_array = []
-    meas_time = datetime.now(tz_JKT).strftime("%H:%M:%S")
-    data_array.append(f"{meas_time}")
+    # capture only: formatting, printing and writing happen on the writer thread
+    global clock
     
     dwf.FDwfAnalogInStatus(hdwf, c_int(1), byref(sts))
     dwf.FDwfAnalogInStatusSamplesValid(hdwf, byref(cValid))
     
-    for channel in range(2):
-        dwf.FDwfAnalogInStatusData(hdwf, channel, byref(rgdSamples), nSamples) # get value each channel
-        
-        dc = sum(rgdSamples)/len(rgdSamples)
-        dc = round(dc, 2)
-
-        print("Acq ch" + str(channel) + " at "+str(meas_time)+" average: "+ str(dc) +"V")
-        # break
-        data_array.append(f"{dc}")
+    # rows are stamped with the trigger on the device clock, not when the host got to them
+    iTick, hzTick = trigger_tick(dwf, hdwf)
+    if clock is None:
+        # the first capture anchors the device clock, it was done secLog after its trigger
+        clock = SampleClock(hzTick)
+        clock.anchor(iTick + round(secLog * hzTick))
+    meas_time = clock.index_time(iTick)
+    
+    # int16 codes of both channels in one block, scaled to volts on the writer thread
+    data_array = channel_stats(fetch.fetch(nSamples, iFetch)).mean.tolist()
 
-    writer.writerow(data_array)
-    time.sleep(0.5)
+    log_writer.put((meas_time, data_array))
 
-# wait at least 2 seconds with Analog Discovery for the offset to stabilize, before the first reading after device open or offset/range change
-time.sleep(2)
+def format_row(row):
+    meas_time, data_array = row
+    meas_time = format_time(meas_time)
+    csv_row = [f"{meas_time}"]
+    
+    # average ADC codes of each channel to volts
+    for channel, dc in enumerate(to_volts(numpy.array(data_array)[:, None], settings)[:, 0]):
+        dc = round(float(dc), 2)
 
-print("Starting repeated acquisitions")
-dwf.FDwfAnalogInConfigure(hdwf, c_bool(False), c_bool(True))
+        print("Acq ch" + str(channel) + " at "+str(meas_time)+" average: "+ str(dc) +"V")
+        csv_row.append(f"{dc}")
 
-# enable output/mask on 8 LSB IO pins, from DIO 0 to 7
-# dwf.FDwfDigitalIOOutputEnableSet(hdwf, c_int(0xFF))
+    return csv_row
 
-# set value on enabled IO pins
-# dwf.FDwfDigitalIOOutputSet(hdwf, c_int(0x0))
+# create the batched csv writer, rows are written from a background thread
+log_writer = BatchedWriter(f, format_row)
 
-while True:
-    try:
-        while True:
-            # fetch digital IO information from the device 
-            dwf.FDwfDigitalIOStatus(hdwf) 
+# wait at least 2 seconds with Analog Discovery for the offset to stabilize, before the first reading after device open or offset/range change
+# the time spent on setup since then counts
+cfg.settle()
 
-            # read state of all pins, regardless of output enable
-            dwf.FDwfDigitalIOInputStatus(hdwf, byref(dwRead))
+try:
+    print("Starting repeated acquisitions")
+    dwf.FDwfAnalogInConfigure(hdwf, c_bool(False), c_bool(True))
+    clock = None # anchored by the first capture, see start_logging()
 
-            if slopetype == 0: # rising event
+    # new acquisition is started automatically after done state
+    while True:
+        try:
+            while True:
+                dwf.FDwfAnalogInStatus(hdwf, c_int(1), byref(sts))
 
-                # start logging if pin input is high
-                if dwRead.value & pin_masking_bit == 1:
+                if sts.value == DwfStateDone.value:
                     break
 
-            else: # falling event
-                
-                # start logging if pin input is low
-                if dwRead.value & pin_masking_bit == 0:
-                    break
+                time.sleep(0.001)
         
-        # print("Digital IO Pins: ", bin(dwRead.value)[2:].zfill(16))
-        start_logging()
+            start_logging()
         
-    except KeyboardInterrupt:
-        break
-
-    except dwfercInvalidParameter0:
-        break
+        except KeyboardInterrupt:
+            break
 
-power_off_device()
+finally:
+    # also after an error, e.g. a writer error raised by put()
+    power_off_device()
 
 
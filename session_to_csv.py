@@ -0,0 +1,101 @@
+"""
+   Session to CSV converter
+   Revision:  2026-10-18
+
+   Requires:
+       Python 3.11, numpy, pytz
+   Description:
+   Exports a binary session file from ./data to CSV, optionally limited to a
+   time range given in the session's own timezone. Given a directory, the
+   range is exported from the session segments its manifest lists for it,
+   compressed or not, without opening the others. Segments are grouped by
+   the base name they were logged under, e.g. batt_log or batt_segments,
+   and each kind goes to its own CSV file, or only the one given by --kind.
+   Indexes go on across the segments of a kind, counted on the sample grid
+   from the start of the first one exported.
+   Usage: py ./session_to_csv.py "./data/2024-04-26 10_59_02 batt_log.dwfs" [--start "2024-04-26 11:00:00"] [--end "2024-04-26 11:01:00"]
+          py ./session_to_csv.py ./data --start "2024-04-26 11:00:00" --end "2024-04-26 12:00:00" --kind batt_log -o span.csv
+"""
+
+from SDK.dwfsession import SessionReader, export_csv
+from SDK.dwfrotate import read_manifest
+from datetime import datetime
+import argparse
+import os
+import pytz
+import re
+import sys
+
+parser = argparse.ArgumentParser(description="Export a DWF session file to CSV")
+parser.add_argument("session", help="path of the .dwfs session file, or a directory with a manifest")
+parser.add_argument("-o", "--output", help="CSV file to write, defaults to the session name with .csv")
+parser.add_argument("--start", help="first time to export, e.g. \"2024-04-26 11:00:00\"")
+parser.add_argument("--end", help="time to stop exporting at")
+parser.add_argument("--kind", help="base name of the sessions to export from a directory, e.g. batt_log")
+parser.add_argument("--decimals", type=int, default=3, help="decimals kept per value")
+parser.add_argument("--no-time", action="store_true", help="leave out the time column, like the old logger CSV files")
+args = parser.parse_args()
+
+def parse_time(text, tz):
+    if text is None:
+        return None
+    t = datetime.fromisoformat(text)
+    if t.tzinfo is None:
+        t = tz.localize(t)
+    return t.timestamp()
+
+def session_kind(file):
+    """Base name a segment was logged under, "batt_log" for "2024-04-26 10_59_02.1 batt_log.dwfs.xz"."""
+    match = re.match(r"\d{4}-\d\d-\d\d \d\d_\d\d_\d\d(?:\.\d+)? (.*)\.dwfs", file)
+    return match.group(1) if match else None
+
+def segment_paths(entries):
+    """Segment paths of the manifest entries per session kind, oldest first."""
+    kinds = {}
+    for entry in entries:
+        kind = session_kind(entry["file"])
+        if kind is not None and (args.kind is None or kind == args.kind):
+            kinds.setdefault(kind, []).append(os.path.join(args.session, entry["file"]))
+    return kinds
+
+if os.path.isdir(args.session):
+    kinds = segment_paths(read_manifest(args.session))
+    if not kinds:
+        print("no " + (args.kind + " " if args.kind else "") + "session segments listed in the manifest of " + args.session)
+        sys.exit(1)
+    first = next(iter(kinds.values()))[0]
+else:
+    kinds = None
+    first = args.session
+
+with SessionReader(first) as reader:
+    tz = pytz.timezone(reader.header.get("tz", "UTC"))
+tBegin = parse_time(args.start, tz)
+tEnd = parse_time(args.end, tz)
+
+if kinds is None:
+    outputs = {args.output or os.path.splitext(args.session)[0] + ".csv": [args.session]}
+else:
+    # only the segments overlapping the span are opened and decompressed
+    kinds = segment_paths(read_manifest(args.session, tBegin, tEnd))
+    output = args.output or os.path.join(args.session, "export.csv")
+    if len(kinds) <= 1:
+        outputs = {output: next(iter(kinds.values()), [])}
+    else:
+        # one file per kind, their rows have different rates and channels
+        stem, ext = os.path.splitext(output)
+        outputs = {stem + " " + kind + ext: paths for kind, paths in kinds.items()}
+
+for output, paths in outputs.items():
+    cRows = 0
+    tOrigin = None
+    with open(output, "w", newline="") as f:
+        for path in paths:
+            with SessionReader(path) as reader:
+                # scheduled windows are sessions of their own, each counting from 0
+                if tOrigin is None:
+                    tOrigin = reader.tStart
+                iOffset = round((reader.tStart - tOrigin) * reader.hzSample)
+                cRows += export_csv(reader, f, tBegin, tEnd, args.decimals, not args.no_time, iOffset)
+
+    print(str(cRows) + " rows exported to " + output)
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# the tests import SDK.dwf* like the loggers at the top of the repository do
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# modules that load the runtime get the simulator, no device is needed
+os.environ["DWF_BACKEND"] = "sim"
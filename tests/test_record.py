@@ -0,0 +1,82 @@
+import numpy
+
+from SDK.dwfrecord import Decimator, RecordChunk, clip_chunk
+
+
+def chunk(iFirst, cSamples, cLost=0, cCorrupted=0):
+    """Chunk of one channel whose samples are their own indexes."""
+    samples = numpy.arange(iFirst, iFirst + cSamples, dtype=numpy.float64)[None, :]
+    return RecordChunk(iFirst, samples, cLost, cCorrupted)
+
+
+def rows(decimator, chunks):
+    """{row number: mean} of every row the chunks reduce to."""
+    out = {}
+    for c in chunks:
+        iFirst, stats = decimator.push(c)
+        for k, mean in enumerate(stats.mean[0]):
+            out[(iFirst - decimator.iOrigin) // decimator.factor + k] = mean
+    return out
+
+
+def test_decimator_groups_across_chunks():
+    decimator = Decimator(5, 1)
+    chunks = [chunk(i, min(7, 30 - i)) for i in range(0, 30, 7)]
+    assert rows(decimator, chunks) == {k: 5 * k + 2 for k in range(6)}
+
+
+def test_decimator_drops_partial_group_before_gap():
+    decimator = Decimator(5, 1)
+    # 10 and 11 cannot fill a group, 12..15 are lost, grouping resumes on the grid at 20
+    assert rows(decimator, [chunk(0, 12), chunk(16, 12, cLost=4)]) == {0: 2, 1: 7, 4: 22}
+
+
+def test_decimator_gap_on_grid_keeps_numbering():
+    decimator = Decimator(5, 1)
+    assert rows(decimator, [chunk(0, 10), chunk(15, 10, cLost=5)]) == {0: 2, 1: 7, 3: 17, 4: 22}
+
+
+def test_decimator_aligns_to_origin():
+    decimator = Decimator(5, 1, iOrigin=3)
+    assert rows(decimator, [chunk(0, 13)]) == {0: 5, 1: 10}
+
+
+def test_decimator_stats_per_channel():
+    decimator = Decimator(4, 2)
+    samples = numpy.vstack((numpy.arange(8.0), numpy.full(8, -1.0)))
+    iFirst, stats = decimator.push(RecordChunk(0, samples, 0, 0))
+    assert iFirst == 0
+    numpy.testing.assert_array_equal(stats.mean, [[1.5, 5.5], [-1, -1]])
+
+
+def test_clip_chunk_inside_keeps_chunk():
+    c = chunk(10, 10, cLost=3)
+    clipped = clip_chunk(c, 0, 100)
+    assert clipped.samples is c.samples
+    assert clipped.cLost == 3
+
+
+def test_clip_chunk_cuts_both_ends():
+    clipped = clip_chunk(chunk(10, 10, cCorrupted=2), 12, 15)
+    assert clipped.iFirst == 12
+    numpy.testing.assert_array_equal(clipped.samples[0], [12, 13, 14])
+    assert clipped.cLost == 0
+    assert clipped.cCorrupted == 2
+
+
+def test_clip_chunk_keeps_only_gap_inside_range():
+    # samples 5..9 were lost before the chunk
+    assert clip_chunk(chunk(10, 10, cLost=5), 8, 12).cLost == 2
+    assert clip_chunk(chunk(10, 10, cLost=5), 12, 15).cLost == 0
+
+
+def test_clip_chunk_gap_without_samples():
+    clipped = clip_chunk(chunk(10, 10, cLost=5), 6, 9)
+    assert clipped.samples.shape[1] == 0
+    assert clipped.cLost == 3
+    assert clipped.cCorrupted == 0
+
+
+def test_clip_chunk_outside_range():
+    assert clip_chunk(chunk(10, 10), 20, 30) is None
+    assert clip_chunk(chunk(10, 10), 0, 10) is None
@@ -0,0 +1,94 @@
+import pytest
+import pytz
+
+from SDK.dwfschedule import CronSpec, WindowScheduler
+
+SUNDAY = 1792281600 # 2026-10-18 00:00:00 UTC, a Sunday
+HOUR = 3600
+DAY = 86400
+
+
+def test_parse_fields():
+    cron = CronSpec("*/15 8-17 * * 1-5", pytz.utc)
+    assert cron.minutes == {0, 15, 30, 45}
+    assert cron.hours == set(range(8, 18))
+    assert cron.weekdays == {1, 2, 3, 4, 5}
+    assert CronSpec("5/20 * * * *", pytz.utc).minutes == {5, 25, 45}
+
+
+@pytest.mark.parametrize("spec", ["* * * *", "60 * * * *", "* 24 * * *", "0 0 0 * *", "30-10 * * * *"])
+def test_parse_rejects(spec):
+    with pytest.raises(ValueError):
+        CronSpec(spec, pytz.utc)
+
+
+def test_next_after_is_strictly_after():
+    cron = CronSpec("14,29,44,59 * * * *", pytz.utc)
+    assert cron.next_after(SUNDAY) == SUNDAY + 14 * 60
+    assert cron.next_after(SUNDAY + 14 * 60) == SUNDAY + 29 * 60
+    assert cron.next_after(SUNDAY + 59 * 60 + 30) == SUNDAY + HOUR + 14 * 60
+
+
+def test_next_after_in_local_time():
+    # 09:00 in Jakarta is 02:00 UTC
+    cron = CronSpec("0 9 * * *", pytz.timezone("Asia/Jakarta"))
+    assert cron.next_after(SUNDAY) == SUNDAY + 2 * HOUR
+
+
+def test_next_after_skips_to_weekday():
+    cron = CronSpec("0 9 * * 1", pytz.utc)
+    assert cron.next_after(SUNDAY) == SUNDAY + DAY + 9 * HOUR
+
+
+def test_next_after_never_matches():
+    with pytest.raises(ValueError):
+        CronSpec("0 0 31 2 *", pytz.utc).next_after(SUNDAY)
+
+
+@pytest.mark.parametrize("spec, secGap", [
+    ("* * * * *", 60),
+    ("14,29,44,59 * * * *", 15 * 60),
+    ("0 9,17 * * *", 8 * HOUR),
+    ("0 9 * * *", DAY),
+    ("0 9 * * 1", 7 * DAY),
+    ("0 0 1 * *", 28 * DAY),
+])
+def test_min_gap(spec, secGap):
+    assert CronSpec(spec, pytz.utc).min_gap() == secGap
+
+
+def test_rejects_overlapping_windows():
+    with pytest.raises(ValueError):
+        WindowScheduler("14,29,44,59 * * * *", 15 * 60 + 1, pytz.utc)
+    WindowScheduler("14,29,44,59 * * * *", 15 * 60, pytz.utc)
+
+
+def test_next_window_ahead():
+    scheduler = WindowScheduler("14,29,44,59 * * * *", 300, pytz.utc)
+    window = scheduler.next_window(SUNDAY + 5 * 60)
+    assert window == (SUNDAY + 14 * 60, SUNDAY + 19 * 60, False)
+    assert scheduler.next_window(window.tEnd) == (SUNDAY + 29 * 60, SUNDAY + 34 * 60, False)
+    assert scheduler.cMissed == 0
+
+
+def test_next_window_catches_up():
+    scheduler = WindowScheduler("14,29,44,59 * * * *", 300, pytz.utc)
+    now = SUNDAY + 16 * 60
+    assert scheduler.next_window(now) == (now, SUNDAY + 19 * 60, True)
+
+
+def test_next_window_counts_missed():
+    scheduler = WindowScheduler("14,29,44,59 * * * *", 300, pytz.utc)
+    scheduler.next_window(SUNDAY + 5 * 60)
+    # the 29, 44 and 59 windows ended before the logger got back
+    window = scheduler.next_window(SUNDAY + HOUR + 5 * 60)
+    assert window == (SUNDAY + HOUR + 14 * 60, SUNDAY + HOUR + 19 * 60, False)
+    assert scheduler.cMissed == 3
+
+
+def test_back_to_back_windows_do_not_overlap():
+    scheduler = WindowScheduler("* * * * *", 60, pytz.utc)
+    first = scheduler.next_window(SUNDAY + 30)
+    second = scheduler.next_window(first.tEnd - 1)
+    assert first == (SUNDAY + 30, SUNDAY + 60, True)
+    assert second == (SUNDAY + 60, SUNDAY + 120, False)
@@ -0,0 +1,56 @@
+import numpy
+
+from SDK.dwfrecord import RecordChunk
+from SDK.dwfsegments import SegmentCapture, slopeFall, slopeRise
+
+
+def chunk(iFirst, x, cLost=0):
+    """Chunk of the signal x on channel 0 and the sample indexes on channel 1."""
+    x = numpy.asarray(x, dtype=numpy.float64)
+    return RecordChunk(iFirst, numpy.vstack((x, numpy.arange(iFirst, iFirst + len(x)))), cLost, 0)
+
+
+def triggers(capture, chunks):
+    found = []
+    for c in chunks:
+        iTrigger, segments = capture.push(c)
+        for i, segment in zip(iTrigger, segments):
+            # channel 1 holds the indexes, so every segment is cut around its trigger
+            numpy.testing.assert_array_equal(segment[1], numpy.arange(i - capture.cPre, i + capture.cPost))
+        found.extend(int(i) for i in iTrigger)
+    return found
+
+
+# wobbles around the level of 1.0 after the first crossing, then a real second edge
+RISING = [0, 0, 0, 0, 1.0, 0.95, 1.0, 0.95, 1.0, 0.5, 0.5, 1.2, 1.2, 1.2, 1.2, 1.2]
+
+
+def test_hysteresis_ignores_wobble():
+    capture = SegmentCapture(2, 0, 1.0, slopeRise, 0.1, 2, 3)
+    assert triggers(capture, [chunk(0, RISING)]) == [4, 11]
+
+
+def test_without_hysteresis_wobble_triggers():
+    capture = SegmentCapture(2, 0, 1.0, slopeRise, 0.0, 2, 3)
+    assert triggers(capture, [chunk(0, RISING)]) == [4, 6, 8, 11]
+
+
+def test_state_carries_across_chunks():
+    capture = SegmentCapture(2, 0, 1.0, slopeRise, 0.1, 2, 3)
+    assert triggers(capture, [chunk(i, RISING[i:i + 1]) for i in range(len(RISING))]) == [4, 11]
+    assert capture.cDropped == 0
+
+
+def test_falling_slope():
+    capture = SegmentCapture(2, 0, 1.0, slopeFall, 0.1, 2, 2)
+    x = [1.2, 1.2, 1.2, 1.0, 1.05, 1.0, 1.5, 0, 0, 0, 0]
+    assert triggers(capture, [chunk(0, x)]) == [3, 7]
+
+
+def test_events_across_gap_are_dropped():
+    capture = SegmentCapture(2, 0, 1.0, slopeRise, 0.1, 2, 3)
+    # the event at 4 needs samples up to 6, the chunk after the gap starts at 7
+    assert triggers(capture, [chunk(0, [0, 0, 0, 0, 1.2])]) == []
+    # the event at 8 has no pre-trigger samples after the gap
+    assert triggers(capture, [chunk(7, [0, 1.2, 1.2, 1.2, 0, 0, 1.2, 1.2, 1.2], cLost=2)]) == [13]
+    assert capture.cDropped == 2
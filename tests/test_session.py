@@ -0,0 +1,130 @@
+import io
+import os
+
+import numpy
+import pytest
+
+from SDK.dwfgaps import GapIndex, GapWriter
+from SDK.dwfrecord import RecordChunk
+from SDK.dwfrotate import compress_segment
+from SDK.dwfsession import SessionReader, SessionWriter, export_csv, session_header
+
+CHANNELS = [{"index": 0, "range": 5.0, "offset": 0.0, "attenuation": 1.0},
+            {"index": 1, "range": 50.0, "offset": 1.0, "attenuation": 10.0}]
+
+
+def write_session(path, dtype, chunks, hz=1000.0, tStart=1792281600.0):
+    with SessionWriter(path, session_header(hz, CHANNELS, dtype=dtype, tz="UTC", tStart=tStart)) as writer:
+        for iFirst, samples in chunks:
+            writer.append(samples, iFirst)
+    return writer
+
+
+def read_all(path):
+    with SessionReader(path) as reader:
+        return reader.header, [(iFirst, block.copy()) for iFirst, block in reader.read()]
+
+
+@pytest.fixture
+def chunks():
+    rng = numpy.random.default_rng(1)
+    # a gap of 50 samples between the second and the third chunk
+    return [(0, rng.normal(size=(2, 100)).astype(numpy.float32)),
+            (100, rng.normal(size=(2, 30)).astype(numpy.float32)),
+            (180, rng.normal(size=(2, 70)).astype(numpy.float32))]
+
+
+def test_session_round_trip(tmp_path, chunks):
+    path = str(tmp_path / "a.dwfs")
+    writer = write_session(path, "float32", chunks)
+    assert not os.path.exists(path + ".part")
+    assert writer.time_range() == (1792281600.0, 1792281600.25)
+
+    header, read = read_all(path)
+    assert header["channels"] == CHANNELS
+    assert [iFirst for iFirst, _ in read] == [0, 100, 180]
+    for (_, expected), (_, block) in zip(chunks, read):
+        numpy.testing.assert_array_equal(block, expected)
+
+
+def test_session_read_range(tmp_path, chunks):
+    path = str(tmp_path / "a.dwfs")
+    write_session(path, "float32", chunks)
+    with SessionReader(path) as reader:
+        assert reader.index_of(reader.time_of(120)) == 120
+        read = [(iFirst, block.shape[1]) for iFirst, block in reader.read(90, 200)]
+    assert read == [(90, 10), (100, 30), (180, 20)]
+
+
+def test_session_ignores_cut_chunk(tmp_path, chunks):
+    path = str(tmp_path / "a.dwfs")
+    write_session(path, "float32", chunks)
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 4)
+    _, read = read_all(path)
+    assert [iFirst for iFirst, _ in read] == [0, 100]
+
+
+@pytest.mark.parametrize("method, suffix", [("lzma", ".xz"), ("zlib", ".zz")])
+@pytest.mark.parametrize("dtype", ["float32", "int16"])
+def test_compressed_round_trip(tmp_path, chunks, method, suffix, dtype):
+    if dtype == "int16":
+        chunks = [(iFirst, (samples * 8000).astype(numpy.int16)) for iFirst, samples in chunks]
+    path = str(tmp_path / "a.dwfs")
+    write_session(path, dtype, chunks)
+    _, expected = read_all(path)
+
+    out = compress_segment(path, method)
+    assert out == path + suffix
+    assert not os.path.exists(path)
+    _, read = read_all(out)
+    assert [iFirst for iFirst, _ in read] == [iFirst for iFirst, _ in expected]
+    for (_, a), (_, b) in zip(expected, read):
+        assert a.tobytes() == b.tobytes()
+
+
+def test_export_csv_offsets_indexes(tmp_path):
+    path = str(tmp_path / "a.dwfs")
+    write_session(path, "float32", [(0, numpy.ones((2, 3), numpy.float32))], hz=1.0)
+    out = io.StringIO()
+    with SessionReader(path) as reader:
+        assert export_csv(reader, out, fTime=False, iOffset=60) == 3
+    assert out.getvalue().split() == ["61,1.0,1.0", "62,1.0,1.0", "63,1.0,1.0"]
+
+
+def test_gaps_round_trip(tmp_path):
+    path = str(tmp_path / "a.bin")
+    writer = GapWriter(path, fFilled=False, hzSample=1000)
+    writer.add_chunk(RecordChunk(0, numpy.zeros((1, 10)), 0, 0))
+    writer.add_chunk(RecordChunk(15, numpy.zeros((1, 10)), 5, 2))
+    writer.add(30, 10, 3, 0)
+    writer.close()
+    assert (writer.cLost, writer.cCorrupted, writer.cEntries) == (8, 2, 2)
+
+    index = GapIndex(path + ".gaps")
+    assert index.header["hzSample"] == 1000
+    assert (index.cLost, index.cCorrupted) == (8, 2)
+    assert index.query(0, 12)["iFirst"].tolist() == [15]
+    assert index.query(20).tolist() == [(30, 10, 3, 0, 0)]
+
+    # 10..14 lost, 15..16 corrupted, 27..29 lost
+    begins, ends = index.bad_ranges()
+    assert (begins.tolist(), ends.tolist()) == ([10, 27], [17, 30])
+    assert numpy.flatnonzero(~index.mask(8, 32)).tolist() == [i - 8 for i in (10, 11, 12, 13, 14, 15, 16, 27, 28, 29)]
+
+
+def test_gaps_timeline_puts_stored_samples_back(tmp_path):
+    path = str(tmp_path / "a.bin")
+    writer = GapWriter(path, fFilled=False)
+    writer.add(4, 4, 2, 1)
+    writer.close()
+    index = GapIndex(path)
+
+    # the file holds samples 0..1 and 4..7, 2..3 were lost and 4 is corrupted
+    stored = numpy.array([0.0, 1.0, 4.0, 5.0, 6.0, 7.0])
+    assert index.positions(len(stored)).tolist() == [0, 1, 4, 5, 6, 7]
+    iFirst, values = index.timeline(stored)
+    assert iFirst == 0
+    numpy.testing.assert_array_equal(values, [0, 1, numpy.nan, numpy.nan, numpy.nan, 5, 6, 7])
+    _, values = index.timeline(stored, fill="interp")
+    numpy.testing.assert_array_equal(values, numpy.arange(8.0))
@@ -0,0 +1,59 @@
+from ctypes import *
+
+import numpy
+
+from SDK.dwfconfig import device_config
+from SDK.dwfconstants import *
+from SDK.dwfrecord import ChannelFetch, place_trigger, trigger_tick
+from SDK.dwfsim import SimDwf
+
+nSamples = 10
+hzAcq = 1000.0
+
+
+def open_single(frequency):
+    """Simulated device set up for single captures on a rising 0.5 V edge of a sine on channel 0."""
+    dwf = SimDwf({"realtime": False, "analog": [{"func": "sine", "frequency": frequency, "amplitude": 1, "offset": 0}]})
+    hdwf = c_int()
+    dwf.FDwfDeviceOpen(c_int(-1), byref(hdwf))
+    cfg = device_config(dwf, hdwf)
+    cfg.analog_in(frequency=hzAcq, bufferSize=nSamples, triggerSource=trigsrcDetectorAnalogIn,
+                  triggerAutoTimeout=0, triggerType=trigtypeEdge, triggerChannel=0,
+                  triggerLevel=0.5, triggerCondition=DwfTriggerSlopeRise)
+    iFetch = place_trigger(dwf, hdwf, cfg, nSamples)
+    dwf.FDwfAnalogInConfigure(hdwf, c_int(0), c_int(1))
+    return dwf, hdwf, iFetch
+
+
+def capture(dwf, hdwf):
+    sts = c_byte()
+    while True:
+        dwf.FDwfAnalogInStatus(hdwf, c_int(1), byref(sts))
+        if sts.value == DwfStateDone.value:
+            return
+
+
+def test_fetch_follows_trigger():
+    dwf, hdwf, iFetch = open_single(3)
+    cBuffer = c_int()
+    dwf.FDwfAnalogInBufferSizeGet(hdwf, byref(cBuffer))
+    # the buffer is longer than the nSamples asked for
+    assert cBuffer.value > nSamples
+    assert iFetch == cBuffer.value - nSamples
+
+    capture(dwf, hdwf)
+    samples = ChannelFetch(dwf, hdwf, (0,), cBuffer.value, dtype=numpy.float64).fetch(cBuffer.value)[0]
+    # the last pre-trigger sample is below the level, everything fetched is the rising edge from it on
+    assert samples[iFetch - 1] < 0.5 <= samples[iFetch]
+    assert (numpy.diff(samples[iFetch:]) > 0).all()
+
+
+def test_trigger_tick_counts_device_clock():
+    dwf, hdwf, _ = open_single(4)
+    iTicks = []
+    for _ in range(3):
+        capture(dwf, hdwf)
+        iTick, hzTick = trigger_tick(dwf, hdwf)
+        iTicks.append(iTick)
+    # one rising edge per period of the 4 Hz sine, to the sample
+    numpy.testing.assert_allclose(numpy.diff(iTicks) / hzTick, 0.25, atol=1 / hzAcq)